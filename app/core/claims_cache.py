@@ -0,0 +1,54 @@
+# core/claims_cache.py
+from typing import Any, Dict
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Profile fields carried by "full" access tokens; "minimal" tokens only carry
+# sub, user_id and exp and get these hydrated from the claims cache instead.
+PROFILE_CLAIMS = (
+    "email",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "company_name",
+    "company_address",
+    "company_phone_number",
+    "company_email",
+    "company_website",
+    "is_verified",
+)
+
+
+def is_minimal_profile() -> bool:
+    return settings.ACCESS_TOKEN_PROFILE.lower() == "minimal"
+
+
+def user_profile_claims(user) -> Dict[str, Any]:
+    """Server-side profile for a user, as returned by /user-info"""
+    return {
+        "id": str(user.id),
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "last_login": user.last_login,
+        "last_ip": user.last_ip,
+        "last_device": user.last_device,
+        "is_verified": user.is_verified,
+        "phone_number": user.phone_number,
+        "company_name": user.company_name,
+        "company_address": user.company_address,
+        "company_phone_number": user.company_phone_number,
+        "company_email": user.company_email,
+        "company_website": user.company_website,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+    }
+
+
+# Profiles keyed by user_id; invalidated whenever the user document changes
+claims_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    max_size=settings.CLAIMS_CACHE_MAX_SIZE,
+    ttl_seconds=settings.CLAIMS_CACHE_TTL_SECONDS,
+)
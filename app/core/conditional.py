@@ -0,0 +1,49 @@
+# core/conditional.py
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+from app.core.responses import dumps
+
+# Only safe methods may be answered with 304
+CONDITIONAL_METHODS = ("GET", "HEAD")
+
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag from the rendered body"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """Whether the client's cached copy is current (weak comparison, as for If-None-Match)"""
+    if request.method not in CONDITIONAL_METHODS:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def tagged_json(request: Request, content: Any, cache_control: str, etag: Optional[str] = None) -> Response:
+    """
+    JSON response carrying ETag and Cache-Control, or 304 when If-None-Match
+    already names it. Without an etag (no version to go by) the body is
+    rendered and hashed.
+    """
+    body = dumps(content)
+    etag = etag or content_etag(body)
+    if if_none_match(request, etag):
+        return not_modified(etag, cache_control)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -1,19 +1,16 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, field_validator
-from typing import Optional
+from typing import Dict, Optional
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Get the directory containing this file
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Load only the app-level .env once (so Pydantic picks it up)
+# App-level .env; read by pydantic-settings (model_config below), so importing
+# this module neither prints nor rewrites os.environ
 APP_ENV_FILE = BASE_DIR / ".env"
-if APP_ENV_FILE.exists():
-    print(f"Loading env file: {APP_ENV_FILE}")
-    load_dotenv(dotenv_path=APP_ENV_FILE, override=True)
 
 
 class Settings(BaseSettings):
@@ -22,11 +19,34 @@ class Settings(BaseSettings):
         default_factory=lambda: os.getenv("MONGODB_URL", ""), env="MONGODB_URL"
     )
     database_name: str = Field(default="rostila_db", env="DATABASE_NAME")
+    # Do not crash the app if the DB is unavailable (dev)
+    ALLOW_START_WITHOUT_DB: bool = Field(default=True, env="ALLOW_START_WITHOUT_DB")
 
     # Connection pool settings
     mongodb_max_connections: int = Field(default=10, env="MONGODB_MAX_CONNECTIONS")
     mongodb_min_connections: int = Field(default=1, env="MONGODB_MIN_CONNECTIONS")
     mongodb_max_idle_time_ms: int = Field(default=30000, env="MONGODB_MAX_IDLE_TIME_MS")
+    # How long a request waits for a free connection before failing
+    mongodb_wait_queue_timeout_ms: int = Field(default=5000, env="MONGODB_WAIT_QUEUE_TIMEOUT_MS")
+    mongodb_server_selection_timeout_ms: int = Field(
+        default=5000, env="MONGODB_SERVER_SELECTION_TIMEOUT_MS"
+    )
+
+    # Read routing: catalog/listing reads may go to secondaries within the staleness
+    # bound (MongoDB minimum is 90 s); auth reads always use the primary
+    CATALOG_READ_PREFERENCE: str = Field(default="secondaryPreferred", env="CATALOG_READ_PREFERENCE")
+    CATALOG_MAX_STALENESS_SECONDS: int = Field(default=90, env="CATALOG_MAX_STALENESS_SECONDS")
+    # Per-method overrides as JSON, e.g. {"CoffeeRepository.get_coffee_by_id": "primary"}
+    READ_PREFERENCE_OVERRIDES: Dict[str, str] = Field(default={}, env="READ_PREFERENCE_OVERRIDES")
+
+    # Index audit: explain repository queries at startup, flag scans and wasteful plans
+    INDEX_AUDIT_ON_STARTUP: bool = Field(default=True, env="INDEX_AUDIT_ON_STARTUP")
+    INDEX_AUDIT_MAX_EXAMINED_RATIO: float = Field(default=10.0, env="INDEX_AUDIT_MAX_EXAMINED_RATIO")
+
+    # Commands slower than this are logged with their redacted filter shape
+    SLOW_COMMAND_THRESHOLD_MS: float = Field(default=100.0, env="SLOW_COMMAND_THRESHOLD_MS")
+    # INFO logs one line per request that touched Mongo; WARNING keeps only slow commands
+    DB_LOG_LEVEL: str = Field(default="INFO", env="DB_LOG_LEVEL")
 
     # JWT Settings - Fixed the environment variable names
     SECRET_KEY: str = Field(
@@ -41,6 +61,63 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    # Bearer token for internal and admin endpoints (/api/internal/*, user
+    # page and export); unset, those endpoints answer 404
+    INTERNAL_API_TOKEN: Optional[str] = Field(default=None, env="INTERNAL_API_TOKEN")
+
+    # Password hashing pool (bcrypt runs outside the event loop)
+    PASSWORD_HASH_WORKERS: int = Field(default=2, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64, env="PASSWORD_HASH_MAX_PENDING")
+
+    # Verified access-token cache
+    TOKEN_CACHE_MAX_SIZE: int = Field(default=10000, env="TOKEN_CACHE_MAX_SIZE")
+    TOKEN_CACHE_TTL_SECONDS: int = Field(default=300, env="TOKEN_CACHE_TTL_SECONDS")
+
+    # Access-token claims profile: "full" embeds the user profile in the token,
+    # "minimal" carries only sub, user_id and exp and hydrates the rest server-side
+    ACCESS_TOKEN_PROFILE: str = Field(default="full", env="ACCESS_TOKEN_PROFILE")
+    CLAIMS_CACHE_MAX_SIZE: int = Field(default=10000, env="CLAIMS_CACHE_MAX_SIZE")
+    CLAIMS_CACHE_TTL_SECONDS: int = Field(default=300, env="CLAIMS_CACHE_TTL_SECONDS")
+
+    # Write-behind buffer for last-login tracking
+    LAST_LOGIN_FLUSH_INTERVAL_SECONDS: float = Field(
+        default=5.0, env="LAST_LOGIN_FLUSH_INTERVAL_SECONDS"
+    )
+    LAST_LOGIN_FLUSH_MAX_PENDING: int = Field(
+        default=500, env="LAST_LOGIN_FLUSH_MAX_PENDING"
+    )
+    # Hard cap while MongoDB is unreachable; the oldest updates are dropped beyond it
+    LAST_LOGIN_BUFFER_MAX_USERS: int = Field(
+        default=10000, env="LAST_LOGIN_BUFFER_MAX_USERS"
+    )
+    # Failed flushes are retried after flush interval, doubling up to this
+    LAST_LOGIN_FLUSH_MAX_BACKOFF_SECONDS: float = Field(
+        default=60.0, env="LAST_LOGIN_FLUSH_MAX_BACKOFF_SECONDS"
+    )
+
+    # Streaming exports: documents fetched per cursor round trip
+    EXPORT_BATCH_SIZE: int = Field(default=500, env="EXPORT_BATCH_SIZE")
+
+    # In-process coffee catalog cache, invalidated through a change stream on
+    # coffees; without change streams (standalone) a cheap fingerprint is polled
+    CATALOG_CACHE_ENABLED: bool = Field(default=True, env="CATALOG_CACHE_ENABLED")
+    CATALOG_CACHE_POLL_SECONDS: float = Field(default=5.0, env="CATALOG_CACHE_POLL_SECONDS")
+    # While polling, how often to try opening the change stream again
+    CATALOG_CACHE_STREAM_RETRY_SECONDS: float = Field(
+        default=60.0, env="CATALOG_CACHE_STREAM_RETRY_SECONDS"
+    )
+
+    # Full coffee listing, rendered and compressed once per catalog version
+    CATALOG_SNAPSHOT_GZIP_LEVEL: int = Field(default=9, env="CATALOG_SNAPSHOT_GZIP_LEVEL")
+    CATALOG_SNAPSHOT_BROTLI_QUALITY: int = Field(default=11, env="CATALOG_SNAPSHOT_BROTLI_QUALITY")
+
+    # Cache-Control per route family; clients revalidate with If-None-Match
+    CATALOG_CACHE_CONTROL: str = Field(default="public, max-age=60", env="CATALOG_CACHE_CONTROL")
+    PROFILE_CACHE_CONTROL: str = Field(default="private, no-cache", env="PROFILE_CACHE_CONTROL")
+
+    # Bulk writes: operations per bulk_write round trip
+    BULK_WRITE_CHUNK_SIZE: int = Field(default=1000, env="BULK_WRITE_CHUNK_SIZE")
+
     # Email (for password reset)
     SMTP_HOST: Optional[str] = Field(default=None, env="SMTP_HOST")
     SMTP_PORT: Optional[int] = Field(default=None, env="SMTP_PORT")
@@ -54,6 +131,12 @@ class Settings(BaseSettings):
     FRONTEND_URL: str = Field(default="http://localhost:3000", env="FRONTEND_URL")
     BACKEND_URL: str = Field(default="http://localhost:8000", env="BACKEND_URL")
     
+    # Sign in with Apple
+    APPLE_CLIENT_ID: str = Field(default="com.rosti.app", env="APPLE_CLIENT_ID")
+    APPLE_KEYS_URL: str = Field(
+        default="https://appleid.apple.com/auth/keys", env="APPLE_KEYS_URL"
+    )
+
     # Google AI API Key
     GOOGLE_API_KEY: Optional[str] = Field(default=None, env="Google_AI_API", alias="Google_AI_API")
     
@@ -0,0 +1,35 @@
+# core/container.py
+from typing import Optional
+
+from app.repositories.coffee_repository import CoffeeRepository
+from app.repositories.user_repository import UserRepository
+from app.services.auth_service import AuthService
+from app.services.coffee_service import CoffeeService
+from app.services.email_service import EmailService
+from app.services.genai_service import GenaiService
+from app.services.user_service import UserService
+
+
+class ServiceContainer:
+    """
+    App-scoped services and repositories, built once by the lifespan and kept
+    on app.state.services. None of them hold per-request state: request data
+    is passed as arguments, and per-request DB accounting lives in a context
+    variable (app.core.db_accounting).
+    """
+
+    def __init__(self):
+        self.user_repository = UserRepository()
+        self.coffee_repository = CoffeeRepository()
+        self.email_service = EmailService()
+        self.user_service = UserService(self.user_repository, self.email_service)
+        self.auth_service = AuthService(self.user_service)
+        self.coffee_service = CoffeeService(self.coffee_repository)
+        self._genai_service: Optional[GenaiService] = None
+
+    @property
+    def genai_service(self) -> GenaiService:
+        # Built on first use: without GOOGLE_API_KEY it raises, which fails only the genai route
+        if self._genai_service is None:
+            self._genai_service = GenaiService()
+        return self._genai_service
@@ -0,0 +1,194 @@
+# core/db_accounting.py
+import asyncio
+import json
+import logging
+import threading
+import time
+from contextvars import Context, ContextVar
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db")
+if not logger.handlers:
+    # One JSON object per line, whatever the server's own logging setup is
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(settings.DB_LOG_LEVEL)
+    logger.propagate = False
+
+# Where each command keeps its filter, for the slow-command log
+FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+
+class RequestDbStats:
+    """Mongo commands issued while serving one request"""
+
+    __slots__ = ("method", "path", "commands", "duration_ms", "slowest_command", "slowest_ms", "_lock")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.commands = 0
+        self.duration_ms = 0.0
+        self.slowest_command: Optional[str] = None
+        self.slowest_ms = 0.0
+        # Commands of one request can finish on several executor threads
+        self._lock = threading.Lock()
+
+    def add(self, command_name: str, duration_ms: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.duration_ms += duration_ms
+            if duration_ms >= self.slowest_ms:
+                self.slowest_ms = duration_ms
+                self.slowest_command = command_name
+
+    def server_timing(self) -> str:
+        timing = f'db;dur={self.duration_ms:.2f};desc="{self.commands} commands"'
+        if self.slowest_command:
+            timing += f', db-slowest;dur={self.slowest_ms:.2f};desc="{self.slowest_command}"'
+        return timing
+
+    def as_log_record(self, status_code: Optional[int], elapsed_ms: float) -> Dict[str, Any]:
+        return {
+            "event": "request_db_usage",
+            "method": self.method,
+            "path": self.path,
+            "status": status_code,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "db_commands": self.commands,
+            "db_ms": round(self.duration_ms, 2),
+            "slowest_command": self.slowest_command,
+            "slowest_ms": round(self.slowest_ms, 2),
+        }
+
+
+# Set per request by DbAccountingMiddleware; Motor copies the context into its
+# executor threads, so the command listener sees the request it runs for.
+current_request_db: ContextVar[Optional[RequestDbStats]] = ContextVar(
+    "current_request_db", default=None
+)
+
+
+def background_task(coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+    """
+    Start a task that outlives or is shared beyond the request that starts
+    it, in a fresh context: its commands are not charged to that request.
+    """
+    return Context().run(asyncio.create_task, coro)
+
+
+def redact(value: Any) -> Any:
+    """Keep field names and operators, replace every value with '?'"""
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if any(isinstance(item, (dict, list, tuple)) for item in value):
+            return [redact(item) for item in value]
+        return ["?"]
+    return "?"
+
+
+def filter_shape(command_name: str, command: Dict[str, Any]) -> Any:
+    field = FILTER_FIELDS.get(command_name)
+    if field is None or field not in command:
+        return None
+    if command_name in ("update", "delete"):
+        return [redact(statement.get("q", {})) for statement in command[field]]
+    return redact(command[field])
+
+
+class CommandAccounting(monitoring.CommandListener):
+    """
+    Adds every command's server round-trip time to the current request's
+    RequestDbStats, and logs commands slower than slow_threshold_ms with their
+    redacted filter shape.
+    """
+
+    def __init__(self, slow_threshold_ms: float):
+        self.slow_threshold_ms = slow_threshold_ms
+        # Command documents by (connection, request id) until the reply arrives
+        self._in_flight: Dict[Tuple[Any, int], Dict[str, Any]] = {}
+        self.slow_commands = 0
+
+    def started(self, event):
+        self._in_flight[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event) -> None:
+        command = self._in_flight.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+
+        stats = current_request_db.get()
+        if stats is not None:
+            stats.add(event.command_name, duration_ms)
+
+        if duration_ms >= self.slow_threshold_ms:
+            self.slow_commands += 1
+            record = {
+                "event": "slow_command",
+                "command": event.command_name,
+                "duration_ms": round(duration_ms, 2),
+                "collection": command.get(event.command_name) if command else None,
+                "filter": filter_shape(event.command_name, command) if command else None,
+                "path": stats.path if stats else None,
+            }
+            logger.warning(json.dumps(record, default=str))
+
+
+class DbAccountingMiddleware:
+    """
+    ASGI middleware that opens a RequestDbStats per HTTP request, adds a
+    Server-Timing header and writes one structured log line per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestDbStats(scope["method"], scope["path"])
+        token = current_request_db.set(stats)
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Streaming responses keep querying after this; the log line has the full count
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request_db.reset(token)
+            if stats.commands:
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                logger.info(json.dumps(stats.as_log_record(status_code, elapsed_ms)))
+
+
+db_accounting = CommandAccounting(slow_threshold_ms=settings.SLOW_COMMAND_THRESHOLD_MS)
@@ -1 +1,55 @@
 # FastAPI dependencies
+import hmac
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.services.auth_service import AuthService
+from app.services.coffee_service import CoffeeService
+from app.services.email_service import EmailService
+from app.services.genai_service import GenaiService
+from app.services.user_service import UserService
+
+# async def so FastAPI resolves them inline instead of on the threadpool
+
+
+async def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
+
+
+async def get_auth_service(request: Request) -> AuthService:
+    return request.app.state.services.auth_service
+
+
+async def get_user_service(request: Request) -> UserService:
+    return request.app.state.services.user_service
+
+
+async def get_coffee_service(request: Request) -> CoffeeService:
+    return request.app.state.services.coffee_service
+
+
+async def get_email_service(request: Request) -> EmailService:
+    return request.app.state.services.email_service
+
+
+async def get_genai_service(request: Request) -> GenaiService:
+    return request.app.state.services.genai_service
+
+
+async def require_internal_token(
+    credential: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+) -> None:
+    """Internal and admin endpoints expose runtime details and user data; off unless a token is configured"""
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credential is None or not hmac.compare_digest(credential.credentials.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
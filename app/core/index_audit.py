@@ -0,0 +1,194 @@
+"""
+Index audit: creates declared indexes that are missing and explains every
+repository query shape, flagging collection scans and queries that examine
+many more documents than they return.
+
+Runs in the background at startup (INDEX_AUDIT_ON_STARTUP) and as a CLI that
+exits non-zero when something is flagged:
+    python -m app.core.index_audit
+"""
+import asyncio
+import json
+import logging
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from beanie import Document
+from bson import ObjectId
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+
+logger = logging.getLogger("app.db")
+
+AUDITED_MODELS: List[Type[Document]] = [User, RefreshToken, PasswordResetToken, Coffee]
+
+
+class QueryShape(NamedTuple):
+    name: str
+    model: Type[Document]
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+    limit: int = 0
+    # Full listings scan by design; they are reported but not flagged
+    allow_collscan: bool = False
+
+
+def query_shapes() -> List[QueryShape]:
+    """The filters and sorts the repositories and services actually send"""
+    now = datetime.utcnow()
+    some_id = ObjectId()
+    newest_first = [("created_at", -1), ("_id", -1)]
+    return [
+        # Users / auth
+        QueryShape("UserRepository.get_user_for_login", User, {"$or": [{"username": "u"}, {"email": "u@example.com"}]}, limit=2),
+        QueryShape("UserRepository.email_exists", User, {"email": "u@example.com"}, limit=1),
+        QueryShape("UserRepository.username_exists", User, {"username": "u"}, limit=1),
+        QueryShape("UserRepository.find_by_ID", User, {"_id": some_id}, limit=1),
+        QueryShape("UserRepository.get_users_page", User, {}, sort=newest_first, limit=21),
+        QueryShape("AuthService.verify_email", User, {"verification_token": "t", "is_verified": False}, limit=1),
+        QueryShape("AuthService.verify_email (already verified)", User, {"verification_token": "t"}, limit=1),
+        QueryShape(
+            "AuthService.rotate_refresh_token",
+            RefreshToken,
+            {"token_hash": "h", "user_id": str(some_id), "is_active": True, "expires_at": {"$gt": now}},
+            limit=1,
+        ),
+        QueryShape("AuthService.logout_user", RefreshToken, {"token_hash": "h"}, limit=1),
+        QueryShape("UserService.revoke_user_refresh_tokens", RefreshToken, {"user_id": str(some_id)}),
+        QueryShape("PasswordResetToken by token_hash", PasswordResetToken, {"token_hash": "h"}, limit=1),
+        QueryShape("PasswordResetToken by user_id", PasswordResetToken, {"user_id": str(some_id)}),
+        # Catalog
+        QueryShape("CoffeeRepository.find_by_ID", Coffee, {"_id": some_id}, limit=1),
+        QueryShape("CoffeeRepository.get_coffee_by_name", Coffee, {"name": "n"}, limit=1),
+        QueryShape("CoffeeRepository.get_coffees_by_origin", Coffee, {"origin": "o"}, limit=100),
+        QueryShape("CoffeeRepository.get_coffees_by_region", Coffee, {"region": "r"}, limit=100),
+        QueryShape("CoffeeRepository.get_coffees_page", Coffee, {}, sort=newest_first, limit=21),
+        QueryShape("CoffeeRepository.upsert_coffees_by_sku", Coffee, {"sku": "s"}, limit=1),
+        QueryShape("CoffeeRepository.get_all_coffees", Coffee, {}, limit=100, allow_collscan=True),
+        # Search: the designed filter + sort pairs (app/test/search_plan_test.py covers the rest)
+        QueryShape("CoffeeRepository.search_coffees (origin, newest)", Coffee, {"origin": "o"}, sort=newest_first, limit=20),
+        QueryShape(
+            "CoffeeRepository.search_coffees (price range, cheapest)",
+            Coffee,
+            {"price": {"$gte": 1.0, "$lte": 10.0}},
+            sort=[("price", 1), ("_id", 1)],
+            limit=20,
+        ),
+        QueryShape("CoffeeRepository.search_coffees (featured, newest)", Coffee, {"is_featured": True}, sort=newest_first, limit=20),
+        QueryShape("CoffeeRepository.count_search_matches (origin)", Coffee, {"origin": "o"}),
+        QueryShape("CatalogCache fingerprint (newest)", Coffee, {}, sort=newest_first, limit=1),
+        QueryShape("CatalogCache fingerprint (updated)", Coffee, {}, sort=[("updated_at", -1)], limit=1),
+    ]
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "?")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def ensure_indexes(models: List[Type[Document]] = AUDITED_MODELS) -> Dict[str, List[str]]:
+    """Create declared indexes that do not exist yet; returns the created index names per collection"""
+    created: Dict[str, List[str]] = {}
+    for model in models:
+        collection = model.get_motor_collection()
+        existing = await collection.index_information()
+        existing_keys = {tuple(info["key"]) for info in existing.values()}
+        # Text indexes are listed by their _fts/_ftsx keys, so those match on name
+        missing = [
+            index
+            for index in getattr(model.Settings, "indexes", [])
+            if hasattr(index, "document")
+            and index.document["name"] not in existing
+            and tuple(index.document["key"].items()) not in existing_keys
+        ]
+        if missing:
+            created[collection.name] = await collection.create_indexes(missing)
+    return created
+
+
+async def explain_shape(shape: QueryShape) -> Dict[str, Any]:
+    cursor = shape.model.get_motor_collection().find(shape.filter)
+    if shape.sort:
+        cursor = cursor.sort(shape.sort)
+    if shape.limit:
+        cursor = cursor.limit(shape.limit)
+    return analyze_explain(shape, await cursor.explain())
+
+
+def analyze_explain(shape: QueryShape, explained: Dict[str, Any]) -> Dict[str, Any]:
+    stages = _plan_stages(explained["queryPlanner"]["winningPlan"])
+    stats = explained.get("executionStats", {})
+    examined = stats.get("totalDocsExamined", 0)
+    returned = stats.get("nReturned", 0)
+    ratio = examined / max(returned, 1)
+
+    problems = []
+    if "COLLSCAN" in stages and not shape.allow_collscan:
+        problems.append("COLLSCAN")
+    if "SORT" in stages:
+        problems.append("in-memory SORT")
+    if ratio > settings.INDEX_AUDIT_MAX_EXAMINED_RATIO:
+        problems.append(f"examined/returned {ratio:.0f}x")
+    return {
+        "query": shape.name,
+        "model": shape.model.__name__,
+        "plan": " <- ".join(stages),
+        "docs_examined": examined,
+        "returned": returned,
+        "problems": problems,
+    }
+
+
+async def run_index_audit(create_missing: bool = True) -> List[Dict[str, Any]]:
+    """Ensure indexes, explain every query shape and log what needs attention"""
+    if create_missing:
+        for collection, names in (await ensure_indexes()).items():
+            logger.warning(json.dumps({"event": "index_created", "collection": collection, "indexes": names}))
+
+    results = []
+    for shape in query_shapes():
+        result = await explain_shape(shape)
+        results.append(result)
+        if result["problems"]:
+            logger.warning(json.dumps({"event": "query_plan_problem", **result}))
+    return results
+
+
+async def audit_in_background() -> None:
+    """Startup hook: never lets an audit failure take the app down"""
+    try:
+        await run_index_audit()
+    except Exception as e:
+        logger.warning(json.dumps({"event": "index_audit_failed", "error": str(e)}))
+
+
+async def main() -> int:
+    from app.database import close_database, init_database
+
+    await init_database()
+    try:
+        results = await run_index_audit()
+    finally:
+        await close_database()
+
+    print(f"🔎 Index audit ({len(results)} query shapes)")
+    for result in results:
+        mark = "❌" if result["problems"] else "✅"
+        detail = f"  [{', '.join(result['problems'])}]" if result["problems"] else ""
+        print(f"{mark} {result['query']:<48}{result['plan']}{detail}")
+    flagged = sum(1 for result in results if result["problems"])
+    print(f"\n{flagged} flagged")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,126 @@
+# core/password_hasher.py
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+# One CryptContext per worker process, built lazily on the first job
+_pwd_context: Optional[CryptContext] = None
+
+
+def _get_pwd_context() -> CryptContext:
+    global _pwd_context
+    if _pwd_context is None:
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+def _hash_password(plain_password: str) -> str:
+    return _get_pwd_context().hash(plain_password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _get_pwd_context().verify(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded process pool so hashing never blocks the event loop"""
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        # Metrics (only touched from the event loop thread)
+        self._pending = 0
+        self._peak_pending = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    def start(self) -> None:
+        """Start the worker pool (called from the app lifespan)"""
+        if self._executor is None:
+            # spawn keeps the workers free of the parent's Motor threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, dropping jobs that have not started yet"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def hash(self, plain_password: str) -> str:
+        """Hash password off the event loop"""
+        return await self._run(_hash_password, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify password against hash off the event loop"""
+        return await self._run(_verify_password, plain_password, hashed_password)
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Backpressure: fail fast instead of letting the queue grow without bound
+        if self._pending >= self.max_pending:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        self.start()
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, fn, *args)
+        except BaseException:
+            # Errors, a broken pool or a cancelled request: not completed work
+            self._failed += 1
+            raise
+        finally:
+            self._pending -= 1
+        # Latency covers completed jobs only
+        elapsed = time.perf_counter() - started
+        self._completed += 1
+        self._total_latency += elapsed
+        self._max_latency = max(self._max_latency, elapsed)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and latency metrics"""
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "in_flight": min(self._pending, self.max_workers),
+            "queued": max(0, self._pending - self.max_workers),
+            "peak_pending": self._peak_pending,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "avg_latency_ms": (
+                round(self._total_latency / self._completed * 1000, 2)
+                if self._completed
+                else 0.0
+            ),
+            "max_latency_ms": round(self._max_latency * 1000, 2),
+        }
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,112 @@
+# core/pool_monitor.py
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from pymongo import monitoring
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """
+    Connection pool metrics from PyMongo CMAP events: pool size, connections
+    in use, checkout wait time and checkout timeouts, summed over all servers.
+
+    Motor runs PyMongo calls on executor threads and a checkout starts and ends
+    on the same thread, so the wait is timed with a thread-local start time.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits_ms: Deque[float] = deque(maxlen=max_samples)
+        self.max_pool_size = None
+
+        # Metrics
+        self.pool_size = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.timeouts = 0
+        self.pool_clears = 0
+        self.max_wait_ms = 0.0
+
+    # Pool lifecycle
+    def pool_created(self, event):
+        self.max_pool_size = event.options.get("maxPoolSize", self.max_pool_size)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # Connection lifecycle
+    def connection_created(self, event):
+        with self._lock:
+            self.pool_size += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.pool_size = max(0, self.pool_size - 1)
+
+    # Checkouts
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait_ms = self._elapsed_ms()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self._waits_ms.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def connection_check_out_failed(self, event):
+        self._elapsed_ms()
+        with self._lock:
+            self.checkout_failures += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.timeouts += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def _elapsed_ms(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        if started is None:
+            return 0.0
+        return (time.perf_counter() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            return {
+                "max_pool_size": self.max_pool_size,
+                "pool_size": self.pool_size,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "timeouts": self.timeouts,
+                "pool_clears": self.pool_clears,
+                "wait_ms": {
+                    "avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                    "p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0,
+                    "max": round(self.max_wait_ms, 3),
+                },
+            }
+
+
+pool_monitor = PoolMonitor()
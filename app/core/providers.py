@@ -0,0 +1,88 @@
+# core/providers.py
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, Optional, Set, TypeVar
+
+T = TypeVar("T")
+
+
+class LazyProvider(Generic[T]):
+    """
+    Builds an expensive object (SDK client, parsed data file) on first use
+    instead of at import time. Creation runs once, also when several threads
+    ask at the same moment; a failed creation is retried on the next get().
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.init_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def get(self) -> T:
+        if self._ready:
+            return self._value
+        with self._lock:
+            if not self._ready:
+                started = time.perf_counter()
+                try:
+                    self._value = self._factory()
+                except Exception as e:
+                    self.last_error = str(e)
+                    raise
+                self.init_seconds = time.perf_counter() - started
+                self.last_error = None
+                self._ready = True
+        return self._value
+
+    async def warm(self) -> bool:
+        """Create the object on a worker thread; never raises"""
+        try:
+            await asyncio.to_thread(self.get)
+            return True
+        except Exception:
+            return False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+            self._ready = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self._ready,
+            "init_ms": round(self.init_seconds * 1000, 1) if self.init_seconds is not None else None,
+            "last_error": self.last_error,
+        }
+
+
+# Every provider by name, and the ones the lifespan creates in the background
+registry: Dict[str, LazyProvider] = {}
+_warm_up_names: Set[str] = set()
+
+
+def register(provider: LazyProvider, warm_up: bool = True) -> LazyProvider:
+    registry[provider.name] = provider
+    if warm_up:
+        _warm_up_names.add(provider.name)
+    return provider
+
+
+async def warm_up() -> None:
+    """Startup hook: create the warm-up providers off the request path, one after another"""
+    for name in sorted(_warm_up_names):
+        await registry[name].warm()
+
+
+def stats() -> Dict[str, Any]:
+    return {name: provider.stats() for name, provider in registry.items()}
@@ -0,0 +1,31 @@
+# core/raw_documents.py
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Type, TypeVar
+
+from pydantic import BaseModel
+
+ResponseType = TypeVar("ResponseType", bound=BaseModel)
+
+
+def response_projection(schema: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection with exactly the fields a response schema renders (id comes from _id)"""
+    return {name: 1 for name in schema.model_fields if name != "id"}
+
+
+@lru_cache(maxsize=None)
+def _required_fields(schema: Type[BaseModel]) -> FrozenSet[str]:
+    return frozenset(name for name, field in schema.model_fields.items() if field.is_required())
+
+
+def construct_response(schema: Type[ResponseType], document: Dict[str, Any]) -> ResponseType:
+    """
+    Build a response straight from a raw BSON document, skipping validation.
+    Only for documents written through the validated models: the values are
+    trusted as stored and missing optional fields take their defaults. A
+    document missing a required field goes through model_validate instead,
+    so it is rejected rather than rendered without that field.
+    """
+    document["id"] = str(document.pop("_id"))
+    if _required_fields(schema) <= document.keys():
+        return schema.model_construct(**document)
+    return schema.model_validate(document)
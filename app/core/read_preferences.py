@@ -0,0 +1,50 @@
+# core/read_preferences.py
+from typing import Optional
+
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred,
+    _ServerMode,
+)
+
+from app.core.config import settings
+
+MODES = {
+    "primary": Primary,
+    "primarypreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondarypreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def read_preference(mode: str, max_staleness_seconds: int = -1) -> _ServerMode:
+    """
+    Build a PyMongo read preference from its name. max_staleness_seconds
+    (MongoDB minimum: 90) bounds how far behind a secondary may be; -1 means
+    no bound. It is ignored for "primary".
+    """
+    try:
+        mode_class = MODES[mode.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode_class is Primary:
+        return Primary()
+    return mode_class(max_staleness=max_staleness_seconds)
+
+
+# Catalog and listing reads may lag the primary by up to the staleness bound
+CATALOG_READ_PREFERENCE = read_preference(
+    settings.CATALOG_READ_PREFERENCE, settings.CATALOG_MAX_STALENESS_SECONDS
+)
+
+
+def read_preference_override(repository: str, method: str) -> Optional[_ServerMode]:
+    """Per-method override from READ_PREFERENCE_OVERRIDES, e.g. {"CoffeeRepository.get_coffee_by_id": "primary"}"""
+    mode = settings.READ_PREFERENCE_OVERRIDES.get(f"{repository}.{method}")
+    if mode is None:
+        return None
+    return read_preference(mode, settings.CATALOG_MAX_STALENESS_SECONDS)
@@ -0,0 +1,36 @@
+# core/responses.py
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+# Non-string dict keys become strings, as with json.dumps
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    # Pydantic's own JSON mode, so model datetimes keep their format (UTC as "Z");
+    # plain datetimes are encoded by orjson as isoformat, like jsonable_encoder
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json", by_alias=True)
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return to_jsonable_python(obj)
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    App-wide response class rendered with orjson. Routes that return it
+    directly (listings of CoffeeResponse/UserResponse) also skip FastAPI's
+    jsonable_encoder pass, which otherwise walks the whole payload first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,12 +1,20 @@
 # core/security.py
 from datetime import datetime, timedelta, timezone  # Fixed: removed duplicate datetime
 from typing import Optional, Dict, Any
+import hashlib
+import secrets
 from jose import JWTError, jwt , ExpiredSignatureError, JWSError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from app.core.config import settings
-import requests
+from app.core.password_hasher import password_hasher
+from app.core.cache import TTLCache
+from app.services.apple_auth_service import apple_verifier
 import time
+import logging
+
+# Never logs keys, tokens or claims
+logger = logging.getLogger("app.security")
 
 
 class SecurityManager:
@@ -17,6 +25,11 @@ class SecurityManager:
         self.access_token_expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
         self.refresh_token_expire_days = settings.REFRESH_TOKEN_EXPIRE_DAYS
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Verified access-token payloads, keyed by token digest
+        self.token_cache: TTLCache[Dict[str, Any]] = TTLCache(
+            max_size=settings.TOKEN_CACHE_MAX_SIZE,
+            ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+        )
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify password against hash"""
@@ -26,6 +39,16 @@ class SecurityManager:
         """Hash password"""
         return self.pwd_context.hash(plain_password)
 
+    async def verify_password_async(
+        self, plain_password: str, hashed_password: str
+    ) -> bool:
+        """Verify password against hash without blocking the event loop"""
+        return await password_hasher.verify(plain_password, hashed_password)
+
+    async def get_password_hash_async(self, plain_password: str) -> str:
+        """Hash password without blocking the event loop"""
+        return await password_hasher.hash(plain_password)
+
     def create_access_token(
         self, data: dict, expires_delta: Optional[timedelta] = None
     ) -> str:
@@ -39,9 +62,6 @@ class SecurityManager:
             )
 
         to_encode.update({"exp": int(expire.timestamp())})
-        print(f"to_encode: {to_encode}")
-        print(f"self.secret_key: {self.secret_key}")
-        print(f"self.algorithm: {self.algorithm}")
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
@@ -52,79 +72,90 @@ class SecurityManager:
             days=self.refresh_token_expire_days
         )
         to_encode.update({"exp": expire})  # Fixed: added expiration
+        # Unique id, so two tokens issued in the same second never share a hash
+        to_encode.setdefault("jti", secrets.token_urlsafe(16))
         encoded_jwt = jwt.encode(to_encode, self.refresh_key, algorithm=self.algorithm)
         return encoded_jwt
 
+    @staticmethod
+    def token_digest(token: str) -> str:
+        """Fixed-length digest used to store, index and cache a token"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _decode_access_token(self, token: str) -> Dict[str, Any]:
+        """Decode access token, reusing the payload of an already verified token"""
+        key = self.token_digest(token)
+        payload = self.token_cache.get(key)
+        if payload is None:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            # Never keep an entry past the token's own expiry
+            exp = payload.get("exp")
+            self.token_cache.set(
+                key, payload, expires_at=exp if isinstance(exp, (int, float)) else None
+            )
+        return dict(payload)
+
+    def revoke_token(self, token: str) -> None:
+        """Purge a single token from the verified-token cache"""
+        self.token_cache.pop(self.token_digest(token))
+
+    def revoke_user_tokens(self, user_id: str) -> int:
+        """Purge every cached token issued to the user (by user_id or username)"""
+        return self.token_cache.discard_where(
+            lambda payload: user_id in (payload.get("user_id"), payload.get("sub"))
+        )
+
     def verify_token(self, token: str) -> Optional[str]:
         """Verify JWT token and return username"""
-        print(f"token: {token}")
-        print(f"self.secret_key: {self.secret_key}")
-        print(f"self.algorithm: {self.algorithm}")
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = self._decode_access_token(token)
             username: Optional[str] = payload.get("sub")
             if username is None:
                 return None
             return username
         except JWTError:
             return None
-    def verify_apple_token(identity_token: str, client_id: str) -> Optional[str]:
-        try:
-            # Fetch Apple's public keys
-            apple_key_url = "https://appleid.apple.com/auth/keys"
-            response = requests.get(apple_key_url)
-            response.raise_for_status()
-            jwks = response.json()
-
-            header = jwt.get_unverified_header(identity_token)
-            kid = header.get("kid")
-            alg = header.get("alg")
-    
-            key =next((k for k in jwks if k["id"] == kid ), None)
-
-            if key is None:
-                print("No matching key found")
-                return None
-            
-            public_key = jwt.construct_rsa_key(key)
-
 
-    
-            # Decode the token using Apple's key
-            payload = jwt.decode(
-               identity_token,
-                public_key,
-                algorithms=[alg],
-                audience=client_id,
+    async def verify_apple_token(
+        self, identity_token: str, client_id: str
+    ) -> Optional[str]:
+        """Verify Apple identity token and return the Apple user ID (sub)"""
+        try:
+            payload = await apple_verifier.verify_identity_token(
+                identity_token, client_id
             )
-    
             return payload.get("sub")  # unique user ID
-            
         except Exception as e:
-            print("Apple token verification failed:", e)
+            logger.warning("Apple token verification failed: %s", type(e).__name__)
             return None
+
     def decode_token(self, token: str) -> Dict[str, Any]:
         """Decode JWT token and return payload"""
-        print(f"user_token_to_decode: {token}")
-        print(f"decoding_secret_key: {self.secret_key}")
-        print(f"decoding_algorithm: {self.algorithm}")
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            print(f"payload: {payload}")
+            payload = self._decode_access_token(token)
             return {"success": True, "payload": payload}
         except ExpiredSignatureError:
             message = "Token has expired"
-            print(f"message: {message}")
+            logger.debug("Access token rejected: %s", message)
             return {"success": False, "message": message}
         except JWSError as e:
             message = f"JWT Error: {e}"
-            print(f"message: {message}")
+            logger.debug("Access token rejected: %s", message)
             return {"success": False, "message": message}
         except Exception as e:
             message = f"JWT Error: {e}"
-            print(f"message: {message}")
+            logger.debug("Access token rejected: %s", message)
             return {"success": False, "message": message}
 
+    def decode_refresh_token(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+        """Verify refresh token signature and expiry and return its payload"""
+        try:
+            return jwt.decode(
+                refresh_token, self.refresh_key, algorithms=[self.algorithm]
+            )
+        except JWTError:
+            return None
+
     def refresh_access_token(self, refresh_token: str) -> str:
         """Create new access token from refresh token"""
         try:
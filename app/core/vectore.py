@@ -1,21 +1,41 @@
-from pinecone import Pinecone
 from app.core.config import settings
+from app.core.providers import LazyProvider, register
 from typing import List, Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _connect_pinecone():
+    """Initialize Pinecone vector store connection"""
+    # Imported here so importing this module stays cheap
+    from pinecone import Pinecone
+
+    try:
+        client = Pinecone(api_key=settings.PINECONE_API_KEY)
+        index = client.Index(settings.PINECONE_INDEX_NAME)
+        logger.info("Pinecone vector store initialized successfully")
+        return client, index
+    except Exception as e:
+        logger.error(f"Error initializing Pinecone: {e}")
+        raise e
+
+
 class VectorStore:
     def __init__(self):
-        """Initialize Pinecone vector store connection"""
-        try:
-            self.pinecone = Pinecone(api_key=settings.PINECONE_API_KEY)
-            self.index = self.pinecone.Index(settings.PINECONE_INDEX_NAME)
-            logger.info("Pinecone vector store initialized successfully")
-        except Exception as e:
-            logger.error(f"Error initializing Pinecone: {e}")
-            raise e
+        # Connected on first use (or by the startup warm-up when configured)
+        self._connection = register(
+            LazyProvider("pinecone", _connect_pinecone),
+            warm_up=bool(settings.PINECONE_API_KEY and settings.PINECONE_INDEX_NAME),
+        )
+
+    @property
+    def pinecone(self):
+        return self._connection.get()[0]
+
+    @property
+    def index(self):
+        return self._connection.get()[1]
     
     def init_pinecone(self):
         """Initialize and return Pinecone client"""
@@ -1,13 +1,14 @@
 # app/database.py
 import motor.motor_asyncio
 from beanie import init_beanie
-import os
 
 # from dotenv import load_dotenv
 from app.models.users import User
 from app.models.auth import RefreshToken, PasswordResetToken
 from app.models.coffee import Coffee
 from app.core.config import settings
+from app.core.pool_monitor import pool_monitor
+from app.core.db_accounting import db_accounting
 import certifi
 
 # Load environment variables from .env file
@@ -17,14 +18,6 @@ import certifi
 MONGODB_URL = settings.mongodb_url
 DATABASE_NAME = settings.database_name
 
-print(
-    f"My mongo URL: [redacted] (scheme: {'mongodb+srv' if MONGODB_URL.startswith('mongodb+srv') else 'mongodb'})"
-)
-print(f"Database name: {DATABASE_NAME}")
-
-if not MONGODB_URL:
-    print("⚠️  MONGODB_URL is not set; skipping database initialization.")
-
 client = None
 
 
@@ -32,10 +25,22 @@ async def init_database():
     """Initialize MongoDB connection with ALL collections"""
     global client
 
+    print(
+        f"My mongo URL: [redacted] (scheme: {'mongodb+srv' if MONGODB_URL.startswith('mongodb+srv') else 'mongodb'})"
+    )
+    print(f"Database name: {DATABASE_NAME}")
+
     try:
         # Create motor client
         client = motor.motor_asyncio.AsyncIOMotorClient(
-            MONGODB_URL, tlsCAFile=certifi.where()
+            MONGODB_URL,
+            tlsCAFile=certifi.where(),
+            maxPoolSize=settings.mongodb_max_connections,
+            minPoolSize=settings.mongodb_min_connections,
+            maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+            waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,
+            serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+            event_listeners=[pool_monitor, db_accounting],
         )
 
         # Test connection
@@ -54,12 +59,7 @@ async def init_database():
     except Exception as e:
         print(f"❌ Failed to connect to MongoDB Atlas: {e}")
         # Do not crash the app if DB is unavailable in dev
-        if os.getenv("ALLOW_START_WITHOUT_DB", "true").lower() in (
-            "1",
-            "true",
-            "yes",
-            "on",
-        ):
+        if settings.ALLOW_START_WITHOUT_DB:
             print(
                 "🚧 Continuing without database connection (ALLOW_START_WITHOUT_DB=true)"
             )
@@ -1,19 +1,56 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.core.index_audit import audit_in_background
+from app.core import providers
 from app.database import init_database, close_database
+from app.core.db_accounting import DbAccountingMiddleware
+from app.core.responses import FastJSONResponse
+from app.core.password_hasher import password_hasher
+from app.services.apple_auth_service import apple_verifier
+from app.services.last_login_buffer import last_login_buffer
+from app.services.catalog_cache import catalog_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Connect to MongoDB
     await init_database()
+    # Startup: app-scoped services and repositories shared by every request
+    app.state.services = ServiceContainer()
+    # Startup: create missing indexes and explain query shapes, off the startup path
+    index_audit = asyncio.create_task(audit_in_background()) if settings.INDEX_AUDIT_ON_STARTUP else None
+    # Startup: build external clients (Gemini, Pinecone) in the background instead of on import
+    warm_up = asyncio.create_task(providers.warm_up())
+    # Startup: bcrypt worker pool
+    password_hasher.start()
+    # Startup: periodic flush of buffered last-login updates
+    last_login_buffer.start()
+    # Startup: catalog cache invalidation (change stream, or polling)
+    catalog_cache.start()
     yield
+    # Shutdown: stop watching the catalog
+    await catalog_cache.stop()
+    # Shutdown: stop an audit or warm-up that is still running
+    if index_audit is not None and not index_audit.done():
+        index_audit.cancel()
+    if not warm_up.done():
+        warm_up.cancel()
+    # Shutdown: write buffered last-login updates while the DB is still open
+    await last_login_buffer.drain()
+    # Shutdown: Stop bcrypt worker pool and pooled HTTP clients
+    # (on a worker thread: it waits for in-flight hashes and would block the loop)
+    await asyncio.to_thread(password_hasher.shutdown)
+    await apple_verifier.aclose()
     # Shutdown: Close MongoDB connection
     await close_database()
 
 
-app = FastAPI(lifespan=lifespan)
+# orjson rendering for every JSON response
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -24,14 +61,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request Mongo command count and time (Server-Timing header + log line)
+app.add_middleware(DbAccountingMiddleware)
+
 # routes
 from app.routers import users
 from app.routers import auth
 from app.routers import genai
 from app.routers import coffee
+from app.routers import internal
 
 
 app.include_router(users.router, tags=["users"], prefix="/api/users")
 app.include_router(auth.router, tags=["auth"], prefix="/api/auth")
 app.include_router(genai.router, tags=["genai"], prefix="/api/genai")
 app.include_router(coffee.router, tags=["coffee"], prefix="/api/coffee")
+app.include_router(internal.router, tags=["internal"], prefix="/api/internal")
@@ -3,13 +3,14 @@ from beanie import Document
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
+from pymongo import IndexModel
 
 
 class RefreshToken(Document):
     """Refresh token model for database storage"""
 
     user_id: str  # Reference to User
-    token: str
+    token_hash: str  # SHA-256 hex digest; the raw token is never stored
     expires_at: datetime
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_active: bool = True
@@ -19,15 +20,30 @@ class RefreshToken(Document):
     class Settings:
         collection = "refresh_tokens"
 
+        indexes = [
+            # sparse: legacy rows that still carry the raw token have no hash
+            IndexModel("token_hash", unique=True, sparse=True),
+            # Per-user revocation
+            IndexModel("user_id"),
+            # MongoDB removes rows as soon as they expire
+            IndexModel("expires_at", expireAfterSeconds=0),
+        ]
+
 
 class PasswordResetToken(Document):
     """Password reset token model"""
 
     user_id: str
-    token: str
+    token_hash: str  # SHA-256 hex digest; the raw token is never stored
     expires_at: datetime
     created_at: datetime = Field(default_factory=datetime.utcnow)
     is_used: bool = False
 
     class Settings:
         collection = "password_reset_tokens"
+
+        indexes = [
+            IndexModel("token_hash", unique=True, sparse=True),
+            IndexModel("user_id"),
+            IndexModel("expires_at", expireAfterSeconds=0),
+        ]
@@ -17,6 +17,9 @@ class Coffee(Document):
     origin: Optional[str] = None
     region: Optional[str] = None
 
+    # Supplier stock-keeping unit; natural key for bulk upserts
+    sku: Optional[str] = None
+
     # Producer details
     producer_id: Optional[str] = None
     producer_name: Optional[str] = None
@@ -72,9 +75,39 @@ class Coffee(Document):
         # Indexes for optimization
         indexes = [
             IndexModel("name"),
-            IndexModel("origin"),
             IndexModel("region"),
             IndexModel("producer_id"),
-            IndexModel("availability"),
-            IndexModel("created_at"),
+            # Unique only where a SKU is set; catalog imports upsert on it
+            IndexModel(
+                "sku",
+                unique=True,
+                partialFilterExpression={"sku": {"$type": "string"}},
+            ),
+            # Keyset pagination: newest first, ties broken by _id
+            IndexModel([("created_at", -1), ("_id", -1)]),
+            # Catalog cache polling: latest update without a scan
+            IndexModel([("updated_at", -1)]),
+            # Search (POST /api/coffee/search): equality fields first, then the
+            # sort (ties broken by _id), so the common filter + sort pairs read
+            # in index order with no in-memory sort. The origin and availability
+            # prefixes also serve the plain equality lookups.
+            IndexModel([("origin", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("origin", 1), ("price", 1), ("_id", 1)]),
+            IndexModel([("availability", 1), ("price", 1), ("_id", 1)]),
+            IndexModel([("is_featured", 1), ("created_at", -1), ("_id", -1)]),
+            # Sort (and range) with no equality filter
+            IndexModel([("price", 1), ("_id", 1)]),
+            IndexModel([("rating", -1), ("_id", -1)]),
+            # Free-text query; a collection has at most one text index
+            IndexModel(
+                [
+                    ("name", "text"),
+                    ("flavor_notes", "text"),
+                    ("origin", "text"),
+                    ("region", "text"),
+                    ("description", "text"),
+                ],
+                name="coffee_text_search",
+                weights={"name": 10, "flavor_notes": 5, "origin": 3, "region": 3},
+            ),
         ]
@@ -1,6 +1,6 @@
 # models/user.py
-from beanie import Document, Indexed
-from pydantic import EmailStr, Field
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Optional
 from pymongo import IndexModel
@@ -40,8 +40,81 @@ class User(Document):
         indexes = [
             IndexModel("email", unique=True),
             IndexModel("username", unique=True),
-            "created_at",
+            # verify_email looks users up by token. Verification sets it to
+            # null (and new users are written with null), so only string
+            # tokens are indexed; sparse would still index every null
+            IndexModel(
+                "verification_token",
+                name="verification_token_pending",
+                partialFilterExpression={"verification_token": {"$type": "string"}},
+            ),
+            # Keyset pagination: newest first, ties broken by _id
+            IndexModel([("created_at", -1), ("_id", -1)]),
         ]
 
     def full_name(self) -> str:
         return f"{self.first_name} {self.last_name}"
+
+
+class UserAuthView(BaseModel):
+    """
+    Projection of User used by login: credentials plus the profile fields
+    returned in the login response (no verification token or login history)
+    """
+
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    username: str
+    hashed_password: str
+    first_name: str
+    last_name: str
+    phone_number: Optional[str] = None
+    company_name: Optional[str] = None
+    company_address: Optional[str] = None
+    company_phone_number: Optional[str] = None
+    company_email: Optional[str] = None
+    company_website: Optional[str] = None
+    is_active: bool = True
+    is_verified: bool = False
+    created_at: datetime
+
+
+class UserPublicView(BaseModel):
+    """
+    Projection of User for listings and profile hydration: everything a
+    client may see, without the password hash or verification token
+    """
+
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    username: str
+    first_name: str
+    last_name: str
+    phone_number: Optional[str] = None
+    company_name: Optional[str] = None
+    company_address: Optional[str] = None
+    company_phone_number: Optional[str] = None
+    company_email: Optional[str] = None
+    company_website: Optional[str] = None
+    is_active: bool = True
+    is_verified: bool = False
+    last_login: Optional[datetime] = None
+    last_ip: Optional[str] = None
+    last_device: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+
+class UserIdentityView(BaseModel):
+    """Projection of User for the signup conflict check: who holds an email or username"""
+
+    id: PydanticObjectId = Field(alias="_id")
+    email: str
+    username: str
+    is_verified: bool = False
+
+
+class UserVerificationView(UserPublicView):
+    """Public profile plus the pending verification token, for resending the link"""
+
+    verification_token: Optional[str] = None
@@ -1,12 +1,29 @@
-from typing import TypeVar, Generic, Optional, List, Dict, Any
-from beanie import Document, PydanticObjectId
-from pymongo.errors import DuplicateKeyError, OperationFailure
+from typing import TypeVar, Generic, Optional, List, Dict, Any, AsyncIterator, Tuple, Union
+import base64
+from bson import json_util
+from beanie import Document, PydanticObjectId, UpdateResponse
+from pydantic import BaseModel
+from beanie.odm.utils.dump import get_dict
+from beanie.odm.utils.parsing import parse_obj
+from beanie.odm.utils.projection import get_projection
+from pymongo import InsertOne, UpdateOne
+from pymongo.read_preferences import _ServerMode
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+
+from app.core.read_preferences import read_preference_override
 
 
 DocumentType = TypeVar("DocumentType", bound=Document)
 
+# A read model class (returns model instances) or a Mongo projection
+# document such as {"email": 1} (returns raw dicts)
+Projection = Optional[Union[type[BaseModel], Dict[str, Any]]]
+
 
 class BaseRepository(Generic[DocumentType]):
+    # Per-method read preferences, keyed by method name; unlisted reads use the primary
+    read_preferences: Dict[str, _ServerMode] = {}
+
     def __init__(self, model: type[Document]):
         self.model = model
 
@@ -20,47 +37,385 @@ class BaseRepository(Generic[DocumentType]):
             raise ValueError(f"Duplicate value error : {e}")
 
     # findOne
-    async def find_one(self, **filter) -> Optional[DocumentType]:
-        return await self.model.find_one(filter)
+    async def find_one(
+        self,
+        projection: Projection = None,
+        read_preference: Optional[_ServerMode] = None,
+        **filter,
+    ) -> Optional[Union[DocumentType, BaseModel, Dict[str, Any]]]:
+        if read_preference is not None:
+            rows = await self._find_on(read_preference, filter, projection, limit=1)
+            return rows[0] if rows else None
+        if projection is None:
+            return await self.model.find_one(filter)
+        if isinstance(projection, type):
+            return await self.model.find_one(filter).project(projection)
+        return await self.model.get_motor_collection().find_one(filter, projection)
+
+    # exists: fetches only _id
+    async def exists(self, **filter) -> bool:
+        return await self.find_one(projection={"_id": 1}, **filter) is not None
 
     # findByID
-    async def find_by_ID(self, Object_id: str) -> Optional[DocumentType]:
-        try:
-            return await self.model.get(PydanticObjectId(Object_id))
-        except Exception:
+    async def find_by_ID(
+        self,
+        Object_id: str,
+        projection: Projection = None,
+        read_preference: Optional[_ServerMode] = None,
+    ) -> Optional[Union[DocumentType, BaseModel, Dict[str, Any]]]:
+        object_id = self._object_id(Object_id)
+        if object_id is None:
             return None
+        if projection is None and read_preference is None:
+            return await self.model.get(object_id)
+        return await self.find_one(
+            projection=projection, read_preference=read_preference, _id=object_id
+        )
 
     # findMany
     async def find_many(
-        self, filters: Dict[str, Any], skip: int = 0, limit: int = 100
-    ) -> List[DocumentType]:
-        return await self.model.find(filters).skip(skip).limit(limit).to_list()
+        self,
+        filters: Dict[str, Any],
+        skip: int = 0,
+        limit: int = 100,
+        projection: Projection = None,
+        read_preference: Optional[_ServerMode] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+    ) -> List[Union[DocumentType, BaseModel, Dict[str, Any]]]:
+        if read_preference is not None:
+            return await self._find_on(
+                read_preference, filters, projection, sort=sort, skip=skip, limit=limit
+            )
+        if projection is None or isinstance(projection, type):
+            query = self.model.find(filters)
+            if sort:
+                query = query.sort(sort)
+            if projection is not None:
+                query = query.project(projection)
+            return await query.skip(skip).limit(limit).to_list()
+        cursor = self.model.get_motor_collection().find(filters, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.skip(skip).limit(limit).to_list(length=limit)
 
     # FindALL
-    async def find_all(self, skip: int = 0, limit: int = 100) -> List[DocumentType]:
-        return await self.model.find_all().skip(skip).limit(limit).to_list()
+    async def find_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        projection: Projection = None,
+        read_preference: Optional[_ServerMode] = None,
+    ) -> List[Union[DocumentType, BaseModel, Dict[str, Any]]]:
+        return await self.find_many(
+            {},
+            skip=skip,
+            limit=limit,
+            projection=projection,
+            read_preference=read_preference,
+        )
+
+    # Streaming iteration over one server-side cursor
+    async def iterate(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        projection: Projection = None,
+        batch_size: int = 500,
+        sort: Optional[List[Tuple[str, int]]] = None,
+    ) -> AsyncIterator[Union[DocumentType, BaseModel, Dict[str, Any]]]:
+        """
+        Yields documents as they come off the cursor; only one batch of
+        batch_size documents is held in memory at a time.
+        """
+        sort = sort or [("_id", 1)]
+        if projection is None or isinstance(projection, type):
+            query = self.model.find(
+                filters or {},
+                projection_model=projection,
+                sort=sort,
+                batch_size=batch_size,
+            )
+        else:
+            query = (
+                self.model.get_motor_collection()
+                .find(filters or {}, projection, batch_size=batch_size)
+                .sort(sort)
+            )
+        async for document in query:
+            yield document
+
+    # Keyset (cursor) pagination on an indexed sort key, ties broken by _id
+    async def find_page(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        sort_key: str = "created_at",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        descending: bool = True,
+        projection: Projection = None,
+        read_preference: Optional[_ServerMode] = None,
+    ) -> Tuple[List[Union[DocumentType, BaseModel, Dict[str, Any]]], Optional[str]]:
+        """
+        Returns one page and the cursor for the next one (None on the last page).
+        Each page is a range scan starting after the cursor, so its cost does
+        not grow with depth the way skip() does. sort_key must never be null.
+        """
+        query: Dict[str, Any] = dict(filters or {})
+        direction = -1 if descending else 1
+        if cursor:
+            value, last_id = self._decode_cursor(cursor, sort_key)
+            op = "$lt" if descending else "$gt"
+            if sort_key == "_id":
+                after = {"_id": {op: last_id}}
+            else:
+                after = {
+                    "$or": [
+                        {sort_key: {op: value}},
+                        {sort_key: value, "_id": {op: last_id}},
+                    ]
+                }
+            query = {"$and": [query, after]} if query else after
+
+        sort = [(sort_key, direction)]
+        if sort_key != "_id":
+            sort.append(("_id", direction))
+
+        # One extra row tells us whether there is a next page
+        if read_preference is not None:
+            if isinstance(projection, dict):
+                projection = {**projection, sort_key: 1}
+            rows = await self._find_on(
+                read_preference, query, projection, sort=sort, limit=limit + 1
+            )
+        elif projection is None or isinstance(projection, type):
+            find_query = self.model.find(query).sort(sort).limit(limit + 1)
+            if projection is not None:
+                find_query = find_query.project(projection)
+            rows = await find_query.to_list()
+        else:
+            fields = {**projection, sort_key: 1}
+            rows = (
+                await self.model.get_motor_collection()
+                .find(query, fields)
+                .sort(sort)
+                .limit(limit + 1)
+                .to_list(length=limit + 1)
+            )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1], sort_key)
+        return rows, next_cursor
+
+    # countDocuments: exact number of matches (an index scan at best)
+    async def count(
+        self, filters: Dict[str, Any], read_preference: Optional[_ServerMode] = None
+    ) -> int:
+        return await self._collection(read_preference).count_documents(filters)
+
+    # Cheap collection size from metadata (no scan)
+    async def estimated_count(self, read_preference: Optional[_ServerMode] = None) -> int:
+        return await self._collection(read_preference).estimated_document_count()
+
+    # Read preference configured for a repository method (None: the client default, primary)
+    def read_preference_for(self, method: str) -> Optional[_ServerMode]:
+        override = read_preference_override(type(self).__name__, method)
+        return override or self.read_preferences.get(method)
+
+    def _collection(self, read_preference: Optional[_ServerMode] = None):
+        collection = self.model.get_motor_collection()
+        if read_preference is not None:
+            collection = collection.with_options(read_preference=read_preference)
+        return collection
+
+    # Beanie queries cannot carry a read preference, so routed reads go
+    # through the Motor collection and are parsed like Beanie would
+    async def _find_on(
+        self,
+        read_preference: _ServerMode,
+        filters: Dict[str, Any],
+        projection: Projection = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> List[Union[DocumentType, BaseModel, Dict[str, Any]]]:
+        fields = get_projection(projection) if isinstance(projection, type) else projection
+        cursor = self._collection(read_preference).find(filters, fields)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        rows = await cursor.to_list(length=limit or None)
+        if isinstance(projection, dict):
+            return rows
+        return [parse_obj(projection or self.model, row) for row in rows]
+
+    @staticmethod
+    def _encode_cursor(row: Any, sort_key: str) -> str:
+        if isinstance(row, dict):
+            value, last_id = row.get(sort_key), row["_id"]
+        else:
+            last_id = row.id
+            value = last_id if sort_key == "_id" else getattr(row, sort_key)
+        payload = json_util.dumps({"k": sort_key, "v": value, "id": last_id})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str, sort_key: str) -> Tuple[Any, Any]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json_util.loads(base64.urlsafe_b64decode(padded).decode())
+            if payload["k"] != sort_key:
+                raise ValueError("cursor belongs to another sort order")
+            return payload["v"], payload["id"]
+        except Exception:
+            raise ValueError("Invalid pagination cursor")
+
+    # ObjectId from string (None when malformed)
+    @staticmethod
+    def _object_id(Object_id: str) -> Optional[PydanticObjectId]:
+        try:
+            return PydanticObjectId(Object_id)
+        except Exception:
+            return None
+
+    # findOneAndUpdate: apply update and return the document in one round trip
+    async def find_one_and_update(
+        self,
+        filters: Dict[str, Any],
+        update: Dict[str, Any],
+        upsert: bool = False,
+        return_new: bool = True,
+    ) -> Optional[DocumentType]:
+        try:
+            return await self.model.find_one(filters).update(
+                update,
+                response_type=(
+                    UpdateResponse.NEW_DOCUMENT
+                    if return_new
+                    else UpdateResponse.OLD_DOCUMENT
+                ),
+                upsert=upsert,
+            )
+        except DuplicateKeyError as e:
+            raise ValueError(f"Duplicate value error : {e}")
+        except OperationFailure as e:
+            raise RuntimeError(f"Upate Opration faild {e}")
 
     # UpdateByID
     async def update_one(
         self, Object_id: str, update_data: Dict[str, Any]
     ) -> Optional[DocumentType]:
-        try:
-            data = await self.find_by_ID(Object_id)
-            if not data:
-                return None
+        object_id = self._object_id(Object_id)
+        if object_id is None:
+            return None
+        return await self.find_one_and_update(
+            {"_id": object_id}, {"$set": update_data}
+        )
 
-            await data.update({"$set": update_data})
+    # insertMany: unordered bulk_write in chunks, errors reported per input index
+    async def create_many(
+        self, items: List[Dict[str, Any]], chunk_size: int = 1000
+    ) -> Dict[str, Any]:
+        operations: List[InsertOne] = []
+        positions: List[int] = []
+        report = self._bulk_report()
+        for index, data in enumerate(items):
+            try:
+                document = get_dict(self.model(**data), to_db=True)
+            except ValueError as e:
+                report["errors"].append({"index": index, "error": str(e)})
+                continue
+            operations.append(InsertOne(document))
+            positions.append(index)
+        return await self._bulk_write(operations, positions, chunk_size, report)
 
-            updated_data = await self.find_by_ID(Object_id)
-            return updated_data
+    # upsertMany: one UpdateOne(upsert=True) per item, matched on key_fields
+    async def upsert_many(
+        self,
+        items: List[Dict[str, Any]],
+        key_fields: List[str],
+        chunk_size: int = 1000,
+        on_insert_fields: Tuple[str, ...] = ("created_at",),
+        server_time_fields: Tuple[str, ...] = (),
+    ) -> Dict[str, Any]:
+        operations: List[UpdateOne] = []
+        positions: List[int] = []
+        report = self._bulk_report()
+        for index, data in enumerate(items):
+            try:
+                document = get_dict(self.model(**data), to_db=True)
+            except ValueError as e:
+                report["errors"].append({"index": index, "error": str(e)})
+                continue
+            filters = {field: document.get(field) for field in key_fields}
+            if any(value is None for value in filters.values()):
+                report["errors"].append(
+                    {"index": index, "error": f"Missing key field(s): {', '.join(key_fields)}"}
+                )
+                continue
+            document.pop("_id", None)
+            # Set from the server clock on every write, whatever the caller sent
+            for field in server_time_fields:
+                document.pop(field, None)
+            # Existing documents only get the fields the caller sent; model
+            # defaults (and on_insert_fields) are written on insert only
+            changes = {
+                field: value
+                for field, value in document.items()
+                if field in data and field not in on_insert_fields
+            }
+            update: Dict[str, Any] = {
+                "$setOnInsert": {
+                    field: value
+                    for field, value in document.items()
+                    if field not in changes
+                }
+            }
+            if changes:
+                update["$set"] = changes
+            if server_time_fields:
+                update["$currentDate"] = {field: True for field in server_time_fields}
+            operations.append(UpdateOne(filters, update, upsert=True))
+            positions.append(index)
+        return await self._bulk_write(operations, positions, chunk_size, report)
 
-        except OperationFailure as e:
-            raise RuntimeError(f"Upate Opration faild {e}")
+    @staticmethod
+    def _bulk_report() -> Dict[str, Any]:
+        return {"inserted": 0, "upserted": 0, "matched": 0, "modified": 0, "errors": []}
+
+    async def _bulk_write(
+        self,
+        operations: List[Any],
+        positions: List[int],
+        chunk_size: int,
+        report: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        collection = self.model.get_motor_collection()
+        for start in range(0, len(operations), chunk_size):
+            chunk = operations[start : start + chunk_size]
+            try:
+                details = (await collection.bulk_write(chunk, ordered=False)).bulk_api_result
+            except BulkWriteError as e:
+                # Unordered: the rest of the chunk was still written
+                details = e.details
+                for error in details.get("writeErrors", []):
+                    report["errors"].append(
+                        {"index": positions[start + error["index"]], "error": error["errmsg"]}
+                    )
+            report["inserted"] += details.get("nInserted", 0)
+            report["upserted"] += details.get("nUpserted", 0)
+            report["matched"] += details.get("nMatched", 0)
+            report["modified"] += details.get("nModified", 0)
+        report["errors"].sort(key=lambda error: error["index"])
+        return report
 
     # DeleteBYID
     async def delete_By_ID(self, Object_id: str) -> bool:
-        data = await self.find_by_ID(Object_id)
-        if data:
-            await data.delete()
-            return True
-        return False
+        object_id = self._object_id(Object_id)
+        if object_id is None:
+            return False
+        result = await self.model.find_one({"_id": object_id}).delete()
+        return bool(result and result.deleted_count)
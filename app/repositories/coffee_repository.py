@@ -1,32 +1,123 @@
-from app.repositories.base_repository import BaseRepository
+from app.repositories.base_repository import BaseRepository, Projection
+from app.core.raw_documents import response_projection
+from app.core.read_preferences import CATALOG_READ_PREFERENCE
 from app.models.coffee import Coffee
-from app.schemas.coffee_schema import CoffeeCreate, CoffeeUpdate
-from typing import List
+from app.schemas.coffee_schema import CoffeeCreate, CoffeeResponse, CoffeeSearchRequest, CoffeeUpdate
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Read-only endpoints and the catalog cache fetch exactly these fields as raw
+# BSON and build the response without validating a Coffee document first
+COFFEE_RESPONSE_FIELDS = response_projection(CoffeeResponse)
 
 class CoffeeRepository(BaseRepository):
+    # Catalog reads that may be served by a secondary; writes and unlisted reads use the primary
+    read_preferences = {
+        "get_coffee_by_id": CATALOG_READ_PREFERENCE,
+        "get_coffee_by_name": CATALOG_READ_PREFERENCE,
+        "get_all_coffees": CATALOG_READ_PREFERENCE,
+        "get_coffees_page": CATALOG_READ_PREFERENCE,
+        "count_coffees": CATALOG_READ_PREFERENCE,
+        "get_coffees_by_origin": CATALOG_READ_PREFERENCE,
+        "get_coffees_by_region": CATALOG_READ_PREFERENCE,
+        "search_coffees": CATALOG_READ_PREFERENCE,
+        "count_search_matches": CATALOG_READ_PREFERENCE,
+    }
+
+    # Search filters compared for equality; the rest are ranges or the text query
+    SEARCH_EQUALITY_FIELDS = ("origin", "region", "processing", "availability", "is_featured", "is_verified")
+
     def __init__(self):
         super().__init__(Coffee)
 
     async def create_coffee(self, coffee: CoffeeCreate) -> Coffee:
         return await self.create(coffee.model_dump())
     
-    async def update_coffee(self, coffee_id: str, coffee: CoffeeUpdate) -> Coffee:
-        return await self.update_one(coffee_id, coffee.model_dump())
+    async def update_coffee(self, coffee_id: str, coffee: CoffeeUpdate) -> Optional[Coffee]:
+        # Only the fields sent by the client, so omitted fields are not reset to None
+        update_data = coffee.model_dump(exclude_unset=True)
+        object_id = self._object_id(coffee_id)
+        if object_id is None:
+            return None
+        # Server clock: the catalog cache's fingerprint relies on every edit moving max(updated_at)
+        return await self.find_one_and_update(
+            {"_id": object_id}, {"$set": update_data, "$currentDate": {"updated_at": True}}
+        )
     
     async def delete_coffee(self, coffee_id: str) -> bool:
         return await self.delete_By_ID(coffee_id)
     
-    async def get_coffee_by_id(self, coffee_id: str) -> Coffee:
-        return await self.find_by_ID(coffee_id)
+    # Reads take an optional projection; a projection dict returns raw documents
+    async def get_coffee_by_id(self, coffee_id: str, projection: Projection = None) -> Coffee:
+        return await self.find_by_ID(coffee_id, projection=projection, read_preference=self.read_preference_for("get_coffee_by_id"))
+    
+    async def get_coffee_by_name(self, coffee_name: str, projection: Projection = None) -> Coffee:
+        return await self.find_one(projection=projection, read_preference=self.read_preference_for("get_coffee_by_name"), name=coffee_name)
+    
+    async def get_all_coffees(self, projection: Projection = None) -> List[Coffee]:
+        return await self.find_all(projection=projection, read_preference=self.read_preference_for("get_all_coffees"))
+    
+    async def get_coffees_page(self, limit: int = 20, cursor: Optional[str] = None, projection: Projection = None) -> Tuple[List[Coffee], Optional[str]]:
+        return await self.find_page(limit=limit, cursor=cursor, projection=projection, read_preference=self.read_preference_for("get_coffees_page"))
+    
+    async def count_coffees(self) -> int:
+        return await self.estimated_count(read_preference=self.read_preference_for("count_coffees"))
+    
+    def iterate_coffees(self, batch_size: int = 500, projection: Projection = None) -> AsyncIterator[Coffee]:
+        return self.iterate(projection=projection, batch_size=batch_size)
+    
+    async def create_coffees(self, items: List[Dict[str, Any]], chunk_size: int = 1000) -> Dict[str, Any]:
+        return await self.create_many(items, chunk_size=chunk_size)
+    
+    async def upsert_coffees_by_sku(self, items: List[Dict[str, Any]], chunk_size: int = 1000) -> Dict[str, Any]:
+        return await self.upsert_many(
+            items,
+            key_fields=["sku"],
+            chunk_size=chunk_size,
+            server_time_fields=("updated_at",),
+        )
+    
+    async def get_coffees_by_origin(self, origin: str, projection: Projection = None) -> List[Coffee]:
+        return await self.find_many({"origin": origin}, projection=projection, read_preference=self.read_preference_for("get_coffees_by_origin"))
+    
+    async def get_coffees_by_region(self, region: str, projection: Projection = None) -> List[Coffee]:
+        return await self.find_many({"region": region}, projection=projection, read_preference=self.read_preference_for("get_coffees_by_region"))
     
-    async def get_coffee_by_name(self, coffee_name: str) -> Coffee:
-        return await self.find_one(name=coffee_name)
+    @classmethod
+    def search_filter(cls, search: CoffeeSearchRequest) -> Dict[str, Any]:
+        """One Mongo filter for every criterion the search request sets"""
+        query: Dict[str, Any] = {}
+        if search.query:
+            query["$text"] = {"$search": search.query}
+        for field in cls.SEARCH_EQUALITY_FIELDS:
+            value = getattr(search, field)
+            if value is not None:
+                query[field] = value
+        price: Dict[str, float] = {}
+        if search.min_price is not None:
+            price["$gte"] = search.min_price
+        if search.max_price is not None:
+            price["$lte"] = search.max_price
+        if price:
+            query["price"] = price
+        if search.min_rating is not None:
+            query["rating"] = {"$gte": search.min_rating}
+        return query
     
-    async def get_all_coffees(self) -> List[Coffee]:
-        return await self.find_all()
+    @staticmethod
+    def search_sort(search: CoffeeSearchRequest) -> List[Tuple[str, int]]:
+        # _id breaks ties so pages neither repeat nor skip rows
+        direction = -1 if search.sort_order == "desc" else 1
+        return [(search.sort_by, direction), ("_id", direction)]
     
-    async def get_coffees_by_origin(self, origin: str) -> List[Coffee]:
-        return await self.find_one(origin=origin)
+    async def search_coffees(self, search: CoffeeSearchRequest, projection: Projection = None) -> List[Coffee]:
+        return await self.find_many(
+            self.search_filter(search),
+            skip=(search.page - 1) * search.size,
+            limit=search.size,
+            projection=projection,
+            read_preference=self.read_preference_for("search_coffees"),
+            sort=self.search_sort(search),
+        )
     
-    async def get_coffees_by_region(self, region: str) -> List[Coffee]:
-        return await self.find_one(region=region)
+    async def count_search_matches(self, search: CoffeeSearchRequest) -> int:
+        return await self.count(self.search_filter(search), read_preference=self.read_preference_for("count_search_matches"))
@@ -1,7 +1,7 @@
-from ..models.users import User
+from ..models.users import User, UserAuthView, UserIdentityView, UserPublicView, UserVerificationView
 from ..schemas.user_schema import UserCreate
-from ..repositories.base_repository import BaseRepository
-from typing import Optional, List, Dict
+from ..repositories.base_repository import BaseRepository, Projection
+from typing import Optional, List, Dict, AsyncIterator, Tuple
 from beanie import PydanticObjectId
 from pymongo.errors import DuplicateKeyError
 import secrets
@@ -38,8 +38,76 @@ class UserRepository(BaseRepository):
 
         return await self.find_one(username=username)
 
-    async def get_all_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        return await self.find_all(skip, limit)
+    async def get_user_for_login(self, identifier: str) -> Optional[UserAuthView]:
+        """Find a user by username or email in one query (both fields are uniquely indexed)"""
+        matches = (
+            await self.model.find(
+                {"$or": [{"username": identifier}, {"email": identifier}]}
+            )
+            .project(UserAuthView)
+            .limit(2)
+            .to_list()
+        )
+        # A username match wins over an email match, as with the old two-step lookup
+        for user in matches:
+            if user.username == identifier:
+                return user
+        return matches[0] if matches else None
+
+    async def find_identity_conflicts(
+        self, email: str, username: str
+    ) -> Dict[str, Optional[UserIdentityView]]:
+        """Check email and username availability in one query; returns who holds each (identity fields only)"""
+        matches = await self.find_many(
+            {"$or": [{"email": email}, {"username": username}]},
+            limit=2,
+            projection=UserIdentityView,
+        )
+        return {
+            "email": next((user for user in matches if user.email == email), None),
+            "username": next(
+                (user for user in matches if user.username == username), None
+            ),
+        }
+
+    # Public reads default to the UserPublicView read model; a projection
+    # dict of public fields returns raw documents instead
+    async def get_all_users(
+        self, skip: int = 0, limit: int = 100, projection: Projection = UserPublicView
+    ) -> List[UserPublicView]:
+        return await self.find_all(skip, limit, projection=projection)
+
+    async def get_users_page(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        projection: Projection = UserPublicView,
+    ) -> Tuple[List[UserPublicView], Optional[str]]:
+        return await self.find_page(limit=limit, cursor=cursor, projection=projection)
+
+    def iterate_public_users(
+        self, batch_size: int = 500, projection: Projection = UserPublicView
+    ) -> AsyncIterator[UserPublicView]:
+        return self.iterate(projection=projection, batch_size=batch_size)
+
+    async def get_public_user_by_id(
+        self, user_id: str, projection: Projection = UserPublicView
+    ) -> Optional[UserPublicView]:
+        return await self.find_by_ID(user_id, projection=projection)
+
+    async def get_public_user_by_username(
+        self, username: str, projection: Projection = UserPublicView
+    ) -> Optional[UserPublicView]:
+        return await self.find_one(projection=projection, username=username)
+
+    async def get_public_user_by_email(
+        self, email: str, projection: Projection = UserPublicView
+    ) -> Optional[UserPublicView]:
+        return await self.find_one(projection=projection, email=email)
+
+    async def get_verification_status(self, email: str) -> Optional[Dict]:
+        """Only the verification flag, for existence/verification checks"""
+        return await self.find_one(projection={"is_verified": 1}, email=email)
 
     async def update_user_by_id(self, user_id: str, user_data) -> User:
         result = await self.update_one(user_id, user_data)
@@ -56,3 +124,11 @@ class UserRepository(BaseRepository):
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         return await self.find_by_ID(user_id)
+
+    async def get_user_for_verification(self, user_id: str) -> Optional[UserVerificationView]:
+        return await self.find_by_ID(user_id, projection=UserVerificationView)
+
+    async def user_id_exists(self, user_id: str) -> bool:
+        """_id-only lookup (served by the _id index, no document fetched)"""
+        object_id = self._object_id(user_id)
+        return object_id is not None and await self.exists(_id=object_id)
@@ -1,23 +1,20 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status,Form ,Request
 from app.services.auth_service import AuthService
-from app.schemas.auth_schema import LoginRequest, ResendVerificationEmailRequest
-from app.services.email_service import EmailService
-from app.services.apple_auth_service import AppleJWTVerifier
+from app.schemas.auth_schema import (
+    LoginRequest,
+    RefreshTokenRequest,
+    ResendVerificationEmailRequest,
+)
 from app.core.security import security_manager
+from app.core.config import settings
+from app.core.dependencies import get_auth_service
+from app.core.conditional import tagged_json
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 router = APIRouter()
 security = HTTPBearer()
 
 
-def get_auth_service() -> AuthService:
-    return AuthService()
-
-
-def get_email_service() -> EmailService:
-    return EmailService()
-
-
 @router.post("/login")
 async def login(
     client_info: Request,
@@ -31,6 +28,27 @@ async def login(
     return response
 
 
+@router.post("/refresh")
+async def refresh_tokens(
+    client_info: Request,
+    refresh_request: RefreshTokenRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    """Rotate a refresh token: the old one is consumed, a new pair is issued"""
+    return await auth_service.rotate_refresh_token(
+        refresh_request.refresh_token, client_info
+    )
+
+
+@router.post("/logout")
+async def logout(
+    refresh_request: RefreshTokenRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+):
+    await auth_service.logout_user(refresh_request.refresh_token)
+    return {"message": "Logged out successfully"}
+
+
 @router.get("/verify-email")
 async def verify_email(
     token: str = Query(...), auth_service: AuthService = Depends(get_auth_service)
@@ -51,12 +69,22 @@ async def resend_verification_email(
 
 @router.post("/login/apple")
 async def login_with_apple(token:str):
-    user_sub = AppleJWTVerifier.verify_identity_token(token,client_id="com.rosti.app")
+    user_sub = await security_manager.verify_apple_token(
+        token, client_id=settings.APPLE_CLIENT_ID
+    )
+    if user_sub is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Apple identity token",
+        )
     return {"apple_sub":user_sub}
 
 
+# GET supports If-None-Match; POST is kept for existing clients
+@router.get("/user-info")
 @router.post("/user-info")
 async def find_user(
+    request: Request,
     credential: HTTPAuthorizationCredentials = Depends(security),
     auth_service: AuthService = Depends(get_auth_service)
 ):
@@ -66,7 +94,9 @@ async def find_user(
     
     try:
         user_data = await auth_service.find_user(token)
-        return user_data
+        # Users have no reliable version field, so the ETag hashes the profile
+        # (which comes from the claims cache, not MongoDB)
+        return tagged_json(request, user_data, settings.PROFILE_CACHE_CONTROL)
     except HTTPException:
         # Re-raise HTTP exceptions (like 401, 404) as they are
         raise
@@ -108,38 +138,7 @@ async def get_token_info(
     token = credential.credentials
     
     try:
-        # Decode the token to get all the information
-        response = security_manager.decode_token(token)
-        payload = response.get("payload")
-        
-        if not payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token"
-            )
-        
-        return {
-            "success": True,
-            "token_info": {
-                "username": payload.get("sub"),
-                "user_id": payload.get("user_id"),
-                "email": payload.get("email"),
-                "first_name": payload.get("first_name"),
-                "last_name": payload.get("last_name"),
-                "phone_number": payload.get("phone_number"),
-                "company_name": payload.get("company_name"),
-                "company_address": payload.get("company_address"),
-                "company_phone_number": payload.get("company_phone_number"),
-                "company_email": payload.get("company_email"),
-                "company_website": payload.get("company_website"),
-                "is_verified": payload.get("is_verified"),
-                "last_ip": payload.get("last_ip"),
-                "last_device": payload.get("last_device"),
-                "login_time": payload.get("login_time"),
-                "expires_at": payload.get("exp"),
-                "issued_at": payload.get("iat")
-            }
-        }
+        return await auth_service.get_token_info(token)
     except Exception as e:
         print(f"Error decoding token: {str(e)}")
         raise HTTPException(
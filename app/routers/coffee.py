@@ -1,32 +1,95 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Awaitable, Callable, Optional
+from app.core.conditional import if_none_match, not_modified, tagged_json
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.services.coffee_service import CoffeeService
-from app.schemas.coffee_schema import CoffeeCreate, CoffeeUpdate, CoffeeResponse
+from app.core.dependencies import get_coffee_service
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_snapshot import negotiate_encoding
+from app.schemas.coffee_schema import CoffeeBulkRequest, CoffeeBulkResponse, CoffeeCreate, CoffeeSearchRequest, CoffeeUpdate, CoffeeResponse
 
 router = APIRouter()
 
-def get_coffee_service() -> CoffeeService:
-    return CoffeeService()
+async def catalog_response(request: Request, load: Callable[[], Awaitable]):
+    """
+    Conditional GET for catalog reads. While the catalog cache is active the
+    snapshot's content hash is the ETag, so a current client gets 304 without
+    MongoDB or serialization; otherwise the ETag is a hash of the body.
+    """
+    # Read before loading: the content served is never older than this tag
+    etag = await catalog_cache.etag()
+    if etag and if_none_match(request, etag):
+        return not_modified(etag, settings.CATALOG_CACHE_CONTROL)
+    return tagged_json(request, await load(), settings.CATALOG_CACHE_CONTROL, etag)
 
 @router.post("/create-coffee")
 async def create_coffee(coffee: CoffeeCreate, coffee_service: CoffeeService = Depends(get_coffee_service)):
     return await coffee_service.create_coffee(coffee)
 
+@router.post("/bulk", response_model=CoffeeBulkResponse)
+async def bulk_import_coffees(request: CoffeeBulkRequest, coffee_service: CoffeeService = Depends(get_coffee_service)):
+    return await coffee_service.bulk_import(request)
+
+# Read routes return FastJSONResponse directly so the response models are
+# serialized once, without a jsonable_encoder pass first
 @router.get("/")
-async def get_all_coffees(coffee_service: CoffeeService = Depends(get_coffee_service)):
-    return await coffee_service.get_all_coffees()
+async def get_all_coffees(request: Request, coffee_service: CoffeeService = Depends(get_coffee_service)):
+    etag = await catalog_cache.etag()
+    if etag is None:
+        return await catalog_response(request, coffee_service.get_all_coffees)
+
+    # Served from precompressed buffers; each encoding is its own representation, with its own ETag
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    etag = etag if encoding == "identity" else f'{etag[:-1]}-{encoding}"'
+    headers = {"ETag": etag, "Cache-Control": settings.CATALOG_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    rendered = await coffee_service.get_all_coffees_rendered()
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=rendered.bodies[encoding], media_type="application/json", headers=headers)
+
+@router.get("/page")
+async def get_coffees_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
+    coffee_service: CoffeeService = Depends(get_coffee_service),
+):
+    return FastJSONResponse(await coffee_service.list_coffees(limit=limit, cursor=cursor, include_total=include_total))
+
+@router.post("/search")
+async def search_coffees(search: CoffeeSearchRequest, coffee_service: CoffeeService = Depends(get_coffee_service)):
+    return FastJSONResponse(await coffee_service.search_coffees(search))
+
+@router.get("/export")
+async def export_coffees(coffee_service: CoffeeService = Depends(get_coffee_service)):
+    return StreamingResponse(
+        coffee_service.export_coffees(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="coffees.ndjson"'},
+    )
 
 @router.get("/{coffee_id}")
-async def get_coffee_by_id(coffee_id: str, coffee_service: CoffeeService = Depends(get_coffee_service)):
-    return await coffee_service.get_coffee_by_id(coffee_id)
+async def get_coffee_by_id(coffee_id: str, request: Request, coffee_service: CoffeeService = Depends(get_coffee_service)):
+    async def load():
+        coffee = await coffee_service.get_coffee_by_id(coffee_id)
+        # A plain 404: the catalog's public cache headers must not be put on a miss
+        if coffee is None:
+            raise HTTPException(status_code=404, detail="Coffee not found")
+        return coffee
+    return await catalog_response(request, load)
 
 @router.get("/name/{coffee_name}")
 async def get_coffee_by_name(coffee_name: str, coffee_service: CoffeeService = Depends(get_coffee_service)):
-    return await coffee_service.get_coffee_by_name(coffee_name)
+    return FastJSONResponse(await coffee_service.get_coffee_by_name(coffee_name))
 
 @router.get("/origin/{origin}")
 async def get_coffees_by_origin(origin: str, coffee_service: CoffeeService = Depends(get_coffee_service)):
-    return await coffee_service.get_coffees_by_origin(origin)
+    return FastJSONResponse(await coffee_service.get_coffees_by_origin(origin))
 
 @router.get("/region/{region}")
 async def get_coffees_by_region(region: str, coffee_service: CoffeeService = Depends(get_coffee_service)):
-    return await coffee_service.get_coffees_by_region(region)
+    return FastJSONResponse(await coffee_service.get_coffees_by_region(region))
@@ -1,15 +1,14 @@
 import fastapi
 from fastapi import Depends
 from app.services.genai_service import GenaiService
+from app.core.dependencies import get_genai_service
 from app.schemas.genai_schema import GenaiRequest, GenaiResponse
 
 router = fastapi.APIRouter()
 
-def get_genai_service() -> GenaiService:
-    return GenaiService()
-
+# Plain def: the Gemini SDK call blocks, so FastAPI runs it in the threadpool
 @router.post("/generate-response")
-async def generate_response(
+def generate_response(
     request: GenaiRequest,
     genai_service: GenaiService = Depends(get_genai_service)
     ):
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends
+from app.core.dependencies import require_internal_token
+from app.core.password_hasher import password_hasher
+from app.core.security import security_manager
+from app.core.claims_cache import claims_cache
+from app.core.pool_monitor import pool_monitor
+from app.core import providers
+from app.utils.helpers import Helpers
+from app.services.last_login_buffer import last_login_buffer
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_snapshot import catalog_listing
+
+router = APIRouter(dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/stats")
+async def get_stats():
+    """Internal runtime metrics used to size caches and pools"""
+    return {
+        "password_hasher": password_hasher.stats(),
+        "token_cache": security_manager.token_cache.stats(),
+        "claims_cache": claims_cache.stats(),
+        "device_info_cache": Helpers.device_info_cache_stats(),
+        "last_login_buffer": last_login_buffer.stats(),
+        "mongodb_pool": pool_monitor.stats(),
+        "providers": providers.stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "catalog_snapshot": catalog_listing.stats(),
+    }
@@ -1,18 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from app.core.responses import FastJSONResponse
 from app.services.user_service import UserService
+from app.core.dependencies import get_user_service, require_internal_token
 from app.schemas.user_schema import UserCreate
 import traceback
 
 router = APIRouter()
 
 
-def get_user_service() -> UserService:
-    return UserService()
-
-
+# UserResponse reads are rendered straight to JSON (see app.core.responses)
 @router.get("/")
 async def get_users(user_service: UserService = Depends(get_user_service)):
-    return await user_service.get_all_users()
+    return FastJSONResponse(await user_service.get_all_users())
+
+
+# Admin listings: every user's contact details, so behind the internal token
+@router.get("/page", dependencies=[Depends(require_internal_token)])
+async def get_users_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
+    user_service: UserService = Depends(get_user_service),
+):
+    return FastJSONResponse(
+        await user_service.list_users(
+            limit=limit, cursor=cursor, include_total=include_total
+        )
+    )
+
+
+@router.get("/export", dependencies=[Depends(require_internal_token)])
+async def export_users(user_service: UserService = Depends(get_user_service)):
+    return StreamingResponse(
+        user_service.export_users(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'},
+    )
 
 
 @router.post("/signup")
@@ -34,6 +59,9 @@ async def create_user(
         result = await user_service.create_user(user_data, client_ip, user_agent)
         print(f"User created successfully: {result}")
         return result
+    except HTTPException:
+        # Re-raise HTTP exceptions (like 400, 503) as they are
+        raise
     except Exception as e:
         print(f"Error creating user: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
@@ -61,4 +89,4 @@ async def getUser_byemail(
     email: str, user_service: UserService = Depends(get_user_service)
 ):
     print("find Function invoked")
-    return await user_service.get_user_by_email(email)
+    return FastJSONResponse(await user_service.get_user_by_email(email))
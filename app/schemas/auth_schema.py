@@ -1,6 +1,6 @@
 # schemas/user.py
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, NamedTuple
 from datetime import datetime
 
 
@@ -69,7 +69,9 @@ class ChangePasswordRequest(BaseModel):
     current_password: str
     new_password: str
 
-class DeviceInfo(BaseModel):
+class DeviceInfo(NamedTuple):
+    """Parsed user agent; immutable so cached instances can be shared"""
+
     os: str
     os_version: str
     browser: str
@@ -131,6 +133,7 @@ class ResendVerificationEmailRequest(BaseModel):
 
 class LoginResponse(BaseModel):
     token:str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     expires_at: datetime
     user: UserProfile
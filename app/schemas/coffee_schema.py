@@ -1,6 +1,6 @@
 # schemas/coffee_schema.py
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 
@@ -9,6 +9,7 @@ class CoffeeBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=200, description="Coffee name")
     origin: Optional[str] = Field(None, max_length=100, description="Country of origin")
     region: Optional[str] = Field(None, max_length=100, description="Region within the country")
+    sku: Optional[str] = Field(None, max_length=100, description="Supplier stock-keeping unit")
     producer_id: Optional[str] = Field(None, max_length=100, description="Producer identifier")
     producer_name: Optional[str] = Field(None, max_length=200, description="Producer name")
     price: float = Field(..., gt=0, description="Price in the specified currency")
@@ -63,6 +64,7 @@ class CoffeeUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     origin: Optional[str] = Field(None, max_length=100)
     region: Optional[str] = Field(None, max_length=100)
+    sku: Optional[str] = Field(None, max_length=100)
     producer_id: Optional[str] = Field(None, max_length=100)
     producer_name: Optional[str] = Field(None, max_length=200)
     price: Optional[float] = Field(None, gt=0)
@@ -122,10 +124,35 @@ class CoffeeResponse(CoffeeBase):
 class CoffeeListResponse(BaseModel):
     """Schema for paginated coffee list response"""
     coffees: List[CoffeeResponse] = Field(..., description="List of coffees")
-    total: int = Field(..., description="Total number of coffees")
-    page: int = Field(..., ge=1, description="Current page number")
+    total: Optional[int] = Field(None, description="Total number of coffees (estimated for cursor pages)")
+    page: Optional[int] = Field(None, ge=1, description="Current page number (page-numbered listings)")
     size: int = Field(..., ge=1, description="Page size")
-    pages: int = Field(..., ge=1, description="Total number of pages")
+    pages: Optional[int] = Field(None, ge=1, description="Total number of pages (page-numbered listings)")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page, null on the last page")
+
+
+class CoffeeBulkRequest(BaseModel):
+    """Schema for a bulk catalog import"""
+    # Plain dicts so one invalid row is reported instead of rejecting the whole batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=10000, description="Coffees to import")
+    upsert: bool = Field(default=False, description="Update existing coffees matched by SKU instead of inserting")
+
+
+class BulkItemError(BaseModel):
+    """Schema for one rejected row of a bulk import"""
+    index: int = Field(..., ge=0, description="Position of the row in the request")
+    error: str = Field(..., description="Why the row was not written")
+
+
+class CoffeeBulkResponse(BaseModel):
+    """Schema for bulk catalog import result"""
+    received: int = Field(..., ge=0, description="Rows in the request")
+    inserted: int = Field(..., ge=0, description="New coffees inserted")
+    updated: int = Field(..., ge=0, description="Existing coffees matched by SKU")
+    failed: int = Field(..., ge=0, description="Rows that were not written")
+    errors: List[BulkItemError] = Field(default=[], description="Per-row errors")
+    elapsed_ms: float = Field(..., ge=0, description="Time spent writing")
+    docs_per_second: float = Field(..., ge=0, description="Write throughput")
 
 
 class CoffeeSearchRequest(BaseModel):
@@ -58,6 +58,28 @@ class UserResponse(BaseModel):
         arbitrary_types_allowed = True
 
 
+class UserExportRow(BaseModel):
+    """One line of the admin export: an explicit allow-list (no IPs, devices or phone numbers)"""
+    id: str
+    email: str
+    username: str
+    first_name: str
+    last_name: str
+    company_name: Optional[str] = None
+    company_email: Optional[str] = None
+    is_active: bool
+    is_verified: bool
+    last_login: Optional[datetime] = None
+    created_at: datetime
+
+
+class UserListResponse(BaseModel):
+    users: List[UserResponse]
+    total: Optional[int] = None  # estimated, only when requested
+    size: int
+    next_cursor: Optional[str] = None  # None on the last page
+
+
 class UserUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -1,22 +1,142 @@
-from jose import jwt, jwk
-from jose.utils import base64url_decode
-import requests
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwk, jwt
+from jose.backends.base import Key
+
+from app.core.config import settings
+
 
 class AppleJWTVerifier:
+    """
+    Verifies Sign in with Apple identity tokens.
+
+    Apple's public keys are cached by kid as constructed key objects. The cache
+    honours the JWKS response's Cache-Control max-age, is refreshed in the
+    background shortly before it expires, and concurrent fetches (cold start or
+    an unknown kid after key rotation) are collapsed into a single request.
+    """
+
     APPLE_KEYS_URL = "https://appleid.apple.com/auth/keys"
+    APPLE_ISSUER = "https://appleid.apple.com"
+    ALLOWED_ALGORITHMS = ("RS256",)
+
+    def __init__(
+        self,
+        keys_url: str = APPLE_KEYS_URL,
+        default_ttl: float = 3600,
+        refresh_margin: float = 300,
+        min_refetch_interval: float = 60,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.keys_url = keys_url
+        self.default_ttl = default_ttl
+        self.refresh_margin = refresh_margin
+        # Unknown kids trigger at most one refetch per interval
+        self.min_refetch_interval = min_refetch_interval
+
+        self._client = http_client
+        self._keys: Dict[str, Key] = {}
+        self._expires_at = 0.0
+        self._last_fetch = 0.0
+        self._fetch_task: Optional[asyncio.Task] = None
+        self.fetch_count = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(5.0),
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client (called from the app lifespan)"""
+        if self._fetch_task is not None and not self._fetch_task.done():
+            self._fetch_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _ttl_from_headers(self, headers: httpx.Headers) -> float:
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in cache_control or "no-cache" in cache_control:
+            return 0.0
+        match = re.search(r"(?:s-maxage|max-age)=(\d+)", cache_control)
+        if match:
+            return float(match.group(1))
+        return self.default_ttl
 
-    @staticmethod
-    def verify_identity_token(identity_token: str, client_id: str) -> str:
-        apple_keys = requests.get(AppleJWTVerifier.APPLE_KEYS_URL).json()["keys"]
+    async def _fetch_keys(self) -> None:
+        self.fetch_count += 1
+        self._last_fetch = time.time()
+
+        response = await self._get_client().get(self.keys_url)
+        response.raise_for_status()
+
+        keys = {}
+        for key_data in response.json()["keys"]:
+            algorithm = key_data.get("alg", "RS256")
+            if algorithm not in self.ALLOWED_ALGORITHMS:
+                continue
+            keys[key_data["kid"]] = jwk.construct(key_data, algorithm=algorithm)
+
+        self._keys = keys
+        self._expires_at = time.time() + self._ttl_from_headers(response.headers)
+
+    def _start_fetch(self) -> asyncio.Task:
+        """Start a JWKS fetch, or join the one already in flight"""
+        if self._fetch_task is None or self._fetch_task.done():
+            self._fetch_task = asyncio.create_task(self._fetch_keys())
+            # Background refreshes have no waiter; keep their errors from going unretrieved
+            self._fetch_task.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
+        return self._fetch_task
+
+    async def _refresh_keys(self) -> None:
+        # shield: a cancelled caller must not cancel the fetch other callers share
+        await asyncio.shield(self._start_fetch())
+
+    async def _get_key(self, kid: str) -> Optional[Key]:
+        now = time.time()
+        if not self._keys or now >= self._expires_at:
+            await self._refresh_keys()
+        elif now >= self._expires_at - self.refresh_margin:
+            # Still valid: serve from cache and refresh in the background
+            self._start_fetch()
+
+        key = self._keys.get(kid)
+        if key is None and time.time() - self._last_fetch >= self.min_refetch_interval:
+            # Apple may have rotated its keys since the last fetch
+            await self._refresh_keys()
+            key = self._keys.get(kid)
+        return key
+
+    async def verify_identity_token(
+        self, identity_token: str, client_id: str
+    ) -> Dict[str, Any]:
+        """Verify the identity token and return its claims"""
         header = jwt.get_unverified_header(identity_token)
-        key_data = next(k for k in apple_keys if k["kid"] == header["kid"])
-        public_key = jwk.construct(key_data)
+        algorithm = header.get("alg")
+        if algorithm not in self.ALLOWED_ALGORITHMS:
+            raise ValueError(f"Unsupported signing algorithm: {algorithm}")
+
+        key = await self._get_key(header.get("kid"))
+        if key is None:
+            raise ValueError("No matching Apple public key found")
 
-        message, encoded_signature = identity_token.rsplit(".", 1)
-        decoded_signature = base64url_decode(encoded_signature.encode())
+        return jwt.decode(
+            identity_token,
+            key,
+            algorithms=[algorithm],
+            audience=client_id,
+            issuer=self.APPLE_ISSUER,
+        )
 
-        if not public_key.verify(message.encode(), decoded_signature):
-            raise ValueError("Invalid signature")
 
-        payload = jwt.decode(identity_token, public_key, algorithms=[header["alg"]], audience=client_id)
-        return payload["sub"]
+# Global instance so the key cache and HTTP pool are shared across requests
+apple_verifier = AppleJWTVerifier(keys_url=settings.APPLE_KEYS_URL)
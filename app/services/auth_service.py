@@ -3,7 +3,14 @@ from app.models.auth import RefreshToken
 from app.schemas.auth_schema import TokenResponse, UserProfile ,LoginResponse
 from app.repositories.user_repository import UserRepository 
 from app.core.security import security_manager
+from app.core.claims_cache import (
+    PROFILE_CLAIMS,
+    claims_cache,
+    is_minimal_profile,
+    user_profile_claims,
+)
 from app.services.user_service import UserService
+from app.services.last_login_buffer import last_login_buffer
 from fastapi import HTTPException, status ,Request
 from datetime import timedelta, datetime
 from typing import Any, Dict, List, Optional
@@ -11,9 +18,10 @@ from app.core.config import settings
 from app.utils.helpers import Helpers
 
 class AuthService:
-    def __init__(self) -> None:
-        self.user_repository = UserRepository()
-        self.user_service = UserService()
+    def __init__(self, user_service: Optional[UserService] = None) -> None:
+        # One UserRepository, shared with the UserService
+        self.user_service = user_service or UserService()
+        self.user_repository: UserRepository = self.user_service.user_repository
 
     async def login__user(
         self, username: str, password: str, client_info: Request
@@ -39,35 +47,28 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        # Update user's last login information
-        await self.user_repository.update_user_by_id(
-            str(authenticated_user.id), 
-            {
-                "last_login": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
+        # Update user's last login information (written behind, off the response path)
+        last_login_buffer.record(
+            str(authenticated_user.id),
+            client_ip,
+            device_info.device if device_info else None,
         )
 
         # as it's optional we can also leave it open so it will defal to ENV value from settings
 
         access_token = security_manager.create_access_token(
-            data={
-                "sub": authenticated_user.username,
-                "user_id": str(authenticated_user.id),
-                "email": authenticated_user.email,
-                "first_name": authenticated_user.first_name,
-                "last_name": authenticated_user.last_name,
-                "phone_number": authenticated_user.phone_number,
-                "company_name": authenticated_user.company_name,
-                "company_address": authenticated_user.company_address,
-                "company_phone_number": authenticated_user.company_phone_number,
-                "company_email": authenticated_user.company_email,
-                "company_website": authenticated_user.company_website,
-                "is_verified": authenticated_user.is_verified,
-                "last_ip": client_ip,
-                "last_device": device_info.device if device_info else None,
-                "login_time": datetime.utcnow().isoformat()
-            },
+            data=self._build_access_claims(
+                {
+                    "id": str(authenticated_user.id),
+                    "username": authenticated_user.username,
+                    **{
+                        field: getattr(authenticated_user, field)
+                        for field in PROFILE_CLAIMS
+                    },
+                },
+                client_ip,
+                device_info.device if device_info else None,
+            ),
             expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
         )
 
@@ -83,8 +84,9 @@ class AuthService:
 
         refresh_token_doc = RefreshToken(
             user_id=str(authenticated_user.id),
-            token=refresh_token,
-            expires_at=datetime.utcnow() + timedelta(days=7),
+            token_hash=security_manager.token_digest(refresh_token),
+            expires_at=datetime.utcnow()
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
             is_active=True,
             ip_address=client_ip,
             device_info=device_info.device,
@@ -114,14 +116,123 @@ class AuthService:
 
         return LoginResponse(
             token=access_token, 
+            refresh_token=refresh_token,
             token_type="bearer",
             expires_at=datetime.utcnow() + timedelta(days=7),
             user=user_profile
         )
 
+    def _build_access_claims(
+        self,
+        profile: Dict[str, Any],
+        client_ip: Optional[str],
+        last_device: Optional[str],
+    ) -> Dict[str, Any]:
+        """Claims for the access token, according to ACCESS_TOKEN_PROFILE"""
+        claims = {"sub": profile["username"], "user_id": profile["id"]}
+        if is_minimal_profile():
+            # Profile is hydrated server-side from the claims cache
+            return claims
+
+        claims.update({field: profile.get(field) for field in PROFILE_CLAIMS})
+        claims.update(
+            {
+                "last_ip": client_ip,
+                "last_device": last_device,
+                "login_time": datetime.utcnow().isoformat(),
+            }
+        )
+        return claims
+
+    async def get_profile_claims(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Full user profile from the claims cache, loading it on a miss"""
+        profile = claims_cache.get(user_id)
+        if profile is None:
+            user = await self.user_repository.get_public_user_by_id(user_id)
+            if not user:
+                return None
+            profile = user_profile_claims(user)
+            claims_cache.set(user_id, profile)
+        return profile
+
+    async def rotate_refresh_token(
+        self, refresh_token: str, client_info: Request
+    ) -> TokenResponse:
+        """Consume a refresh token and issue a new access/refresh token pair"""
+        payload = security_manager.decode_refresh_token(refresh_token)
+        if not payload or not payload.get("user_id"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_id = payload["user_id"]
+
+        profile = await self.get_profile_claims(user_id)
+        if not profile:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        client_ip = client_info.headers.get("x-forwarded-for") or client_info.headers.get("x-real-ip") or client_info.client.host
+        last_device = payload.get("last_device")
+
+        new_refresh_token = security_manager.create_refresh_token(
+            data={
+                "sub": profile["username"],
+                "user_id": user_id,
+                "email": profile.get("email"),
+                "last_ip": client_ip,
+                "last_device": last_device,
+            }
+        )
+        replacement = RefreshToken(
+            user_id=user_id,
+            token_hash=security_manager.token_digest(new_refresh_token),
+            expires_at=datetime.utcnow()
+            + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            is_active=True,
+            ip_address=client_ip,
+            device_info=last_device,
+        ).model_dump(exclude={"id", "revision_id"})
+
+        # Consume and reissue in one atomic round trip: the old row is replaced
+        # in place, so a token can only ever be rotated once
+        consumed = await RefreshToken.get_motor_collection().find_one_and_replace(
+            {
+                "token_hash": security_manager.token_digest(refresh_token),
+                "user_id": user_id,
+                "is_active": True,
+                "expires_at": {"$gt": datetime.utcnow()},
+            },
+            replacement,
+            projection={"_id": 1},
+        )
+        if consumed is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token is expired, revoked or already used",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        access_token = security_manager.create_access_token(
+            data=self._build_access_claims(profile, client_ip, last_device),
+            expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+        return TokenResponse(
+            access_token=access_token,
+            refresh_token=new_refresh_token,
+            token_type="bearer",
+            expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        )
+
     async def logout_user(self, refresh_token: str) -> bool:
         try:
-            await RefreshToken.find_one(RefreshToken.token == refresh_token).delete()
+            await RefreshToken.find_one(
+                RefreshToken.token_hash == security_manager.token_digest(refresh_token)
+            ).delete()
             return True
         except Exception as e:
             raise HTTPException(
@@ -131,21 +242,24 @@ class AuthService:
 
     async def verify_email(self, token: str) -> dict:
         """Verify user email using verification token"""
-        # Find user by verification token
-        user = await self.user_repository.find_one(verification_token=token)
+        # Verify and clear the token in one round trip, only if not verified yet
+        user = await self.user_repository.find_one_and_update(
+            {"verification_token": token, "is_verified": False},
+            {"$set": {"is_verified": True, "verification_token": None}},
+        )
         if not user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid or expired verification token",
+            # Rare path: tell an unknown token apart from an already verified user
+            existing_user = await self.user_repository.find_one(
+                verification_token=token
             )
-
-        if user.is_verified:
+            if not existing_user:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid or expired verification token",
+                )
             return {"message": "User already verified"}
 
-        # Update user verification status
-        user.is_verified = True
-        user.verification_token = None  # Clear the token after verification
-        await user.save()
+        claims_cache.pop(str(user.id))
 
         return {
             "message": "Email verified successfully",
@@ -154,13 +268,13 @@ class AuthService:
 
     async def resend_verification_email(self, email: str) -> dict:
         print(f"email: {email}")
-        user = await self.user_repository.email_exists(email)
+        user = await self.user_repository.get_verification_status(email)
         print(f"user: {user}")
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="User not found"
             )
-        if user.is_verified:
+        if user.get("is_verified"):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="User already verified"
             )
@@ -180,33 +294,66 @@ class AuthService:
                 detail="Invalid token"
             )
         
-        # Find the user in the database
-        user = await self.user_repository.get_user_by_username(username)
-        
-        if not user:
+        # Prefer the cached profile; tokens without user_id fall back to a lookup
+        user_id = payload.get("user_id")
+        profile = await self.get_profile_claims(user_id) if user_id else None
+        if profile is None:
+            user = await self.user_repository.get_public_user_by_username(username)
+            if user:
+                profile = user_profile_claims(user)
+                claims_cache.set(profile["id"], profile)
+
+        if not profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        
+
         # Return user data
+        return {"success": True, **profile}
+
+    async def get_token_info(self, token: str) -> dict:
+        """Token claims, hydrated from the claims cache for minimal tokens"""
+        response = security_manager.decode_token(token)
+        payload = response.get("payload")
+
+        if not payload:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+
+        claims = dict(payload)
+        if "email" not in claims and claims.get("user_id"):
+            profile = await self.get_profile_claims(claims["user_id"])
+            if profile:
+                claims.update({field: profile.get(field) for field in PROFILE_CLAIMS})
+                claims.setdefault("last_ip", profile.get("last_ip"))
+                claims.setdefault("last_device", profile.get("last_device"))
+                last_login = profile.get("last_login")
+                claims.setdefault(
+                    "login_time", last_login.isoformat() if last_login else None
+                )
+
         return {
             "success": True,
-            "id": str(user.id),
-            "username": user.username,
-            "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "last_login": user.last_login,
-            "last_ip": user.last_ip,
-            "last_device": user.last_device,
-            "is_verified": user.is_verified,
-            "phone_number": user.phone_number,
-            "company_name": user.company_name,
-            "company_address": user.company_address,
-            "company_phone_number": user.company_phone_number,
-            "company_email": user.company_email,
-            "company_website": user.company_website,
-            "created_at": user.created_at.isoformat() if user.created_at else None,
-            "updated_at": user.updated_at.isoformat() if user.updated_at else None
+            "token_info": {
+                "username": claims.get("sub"),
+                "user_id": claims.get("user_id"),
+                "email": claims.get("email"),
+                "first_name": claims.get("first_name"),
+                "last_name": claims.get("last_name"),
+                "phone_number": claims.get("phone_number"),
+                "company_name": claims.get("company_name"),
+                "company_address": claims.get("company_address"),
+                "company_phone_number": claims.get("company_phone_number"),
+                "company_email": claims.get("company_email"),
+                "company_website": claims.get("company_website"),
+                "is_verified": claims.get("is_verified"),
+                "last_ip": claims.get("last_ip"),
+                "last_device": claims.get("last_device"),
+                "login_time": claims.get("login_time"),
+                "expires_at": claims.get("exp"),
+                "issued_at": claims.get("iat")
+            }
         }
@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.core.config import settings
+from app.core.db_accounting import background_task
+from app.core.raw_documents import construct_response
+from app.core.responses import dumps
+from app.models.coffee import Coffee
+from app.repositories.coffee_repository import COFFEE_RESPONSE_FIELDS, CoffeeRepository
+from app.schemas.coffee_schema import CoffeeResponse
+
+logger = logging.getLogger("app.db")
+
+
+class CatalogSnapshot(NamedTuple):
+    version: int
+    # Hash of the content: the same catalog has the same ETag in every worker
+    etag: str
+    coffees: List[CoffeeResponse]
+    by_id: Dict[str, CoffeeResponse]
+    by_name: Dict[str, CoffeeResponse]
+    loaded_at: float
+
+
+class CatalogCache:
+    """
+    Read-through cache of the whole coffee catalog, tagged with a version that
+    only ever increases. Any change to the coffees collection bumps the
+    version (seen through a change stream, or by polling a cheap fingerprint
+    where change streams are unavailable) and the next read reloads.
+    Concurrent misses share one load. Used from the event loop only.
+    """
+
+    def __init__(self, enabled: bool, poll_interval: float, stream_retry_interval: float):
+        self.enabled = enabled
+        self.poll_interval = poll_interval
+        self.stream_retry_interval = stream_retry_interval
+        self.version = 1
+        self.mode = "stopped"
+        self._snapshot: Optional[CatalogSnapshot] = None
+        # In-flight loads by the version they load
+        self._loading: Dict[int, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_failures = 0
+        self.invalidations = 0
+        self.last_load_seconds: Optional[float] = None
+        self.last_invalidation_lag_seconds: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        """Cached reads are only safe while something is watching for changes"""
+        return self._task is not None and not self._task.done()
+
+    async def etag(self) -> Optional[str]:
+        """
+        ETag of the current snapshot (None while reads are not cached). Only a
+        load away after a change, and a hit otherwise; versions stay per process.
+        """
+        if not self.active:
+            return None
+        return (await self.get()).etag
+
+    async def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        version = self.version
+        if snapshot is not None and snapshot.version == version:
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        loading = self._loading.get(version)
+        if loading is None:
+            # Shared by every waiting request, so charged to none of them
+            loading = background_task(self._load(version))
+            loading.add_done_callback(lambda task: self._load_finished(version, task))
+            self._loading[version] = loading
+        else:
+            self.coalesced += 1
+        # shield: a cancelled request must not cancel the load other requests wait on
+        return await asyncio.shield(loading)
+
+    async def _fetch(self) -> List[CoffeeResponse]:
+        # The primary, so a reload right after a change never reads an older secondary
+        return [
+            construct_response(CoffeeResponse, document)
+            async for document in CoffeeRepository().iterate_coffees(
+                batch_size=settings.EXPORT_BATCH_SIZE, projection=COFFEE_RESPONSE_FIELDS
+            )
+        ]
+
+    async def _load(self, version: int) -> CatalogSnapshot:
+        started = time.perf_counter()
+        coffees = await self._fetch()
+        by_name: Dict[str, CoffeeResponse] = {}
+        for coffee in coffees:
+            by_name.setdefault(coffee.name, coffee)
+        snapshot = CatalogSnapshot(
+            # Tagged with the version it was started for: a change during the
+            # load leaves it outdated, so the next read loads again
+            version=version,
+            etag=f'"{hashlib.blake2b(dumps(coffees), digest_size=8).hexdigest()}"',
+            coffees=coffees,
+            by_id={coffee.id: coffee for coffee in coffees},
+            by_name=by_name,
+            loaded_at=time.time(),
+        )
+        self.last_load_seconds = time.perf_counter() - started
+        self.loads += 1
+        if self._snapshot is None or version >= self._snapshot.version:
+            self._snapshot = snapshot
+        return snapshot
+
+    def _load_finished(self, version: int, task: asyncio.Task) -> None:
+        self._loading.pop(version, None)
+        if task.cancelled() or task.exception() is not None:
+            self.load_failures += 1
+
+    def invalidate(self, changed_at: Optional[datetime] = None) -> int:
+        """Bump the version; returns the new one. changed_at feeds the staleness metric"""
+        self.version += 1
+        self.invalidations += 1
+        if changed_at is not None:
+            self.last_invalidation_lag_seconds = max(
+                (datetime.utcnow() - changed_at).total_seconds(), 0.0
+            )
+        return self.version
+
+    async def _follow_change_stream(self) -> None:
+        collection = Coffee.get_motor_collection()
+        pipeline = [{"$project": {"operationType": 1, "clusterTime": 1, "wallTime": 1}}]
+        async with collection.watch(pipeline) as stream:
+            self.mode = "change_stream"
+            # Changes made while nobody was watching
+            self.invalidate()
+            async for change in stream:
+                changed_at = change.get("wallTime")
+                if changed_at is None and "clusterTime" in change:
+                    changed_at = change["clusterTime"].as_datetime().replace(tzinfo=None)
+                self.invalidate(changed_at)
+
+    async def _fingerprint(self) -> Tuple[Any, ...]:
+        """
+        Changes whenever a coffee is inserted, updated or deleted. Every
+        CoffeeRepository write path stamps updated_at with the server clock, so
+        an edit from any worker moves the maximum; writes that bypass the
+        repository without touching updated_at are only seen by change streams.
+        """
+        collection = Coffee.get_motor_collection()
+        count = await collection.estimated_document_count()
+        newest = await collection.find_one({}, {"_id": 1}, sort=[("created_at", -1), ("_id", -1)])
+        updated = await collection.find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)])
+        return (
+            count,
+            newest and newest["_id"],
+            updated and updated.get("updated_at"),
+        )
+
+    async def _poll_for(self, seconds: float, last: Optional[Tuple[Any, ...]] = None) -> Tuple[Any, ...]:
+        """
+        Poll the fingerprint for `seconds`, invalidating on every change, and
+        return the last one seen. Starting from the previous window's last
+        fingerprint means nothing changed between windows goes unnoticed.
+        """
+        self.mode = "polling"
+        deadline = time.monotonic() + seconds
+        current = await self._fingerprint()
+        while True:
+            if last is not None and current != last:
+                self.invalidate()
+            last = current
+            if time.monotonic() >= deadline:
+                return last
+            await asyncio.sleep(self.poll_interval)
+            current = await self._fingerprint()
+
+    async def _run(self) -> None:
+        # Fingerprint at the end of the last polling window
+        last: Optional[Tuple[Any, ...]] = None
+        while True:
+            try:
+                await self._follow_change_stream()
+            except Exception as e:
+                # Standalone servers have no change streams; poll, then try the stream again.
+                # Logged when falling back, not on every retry while already polling
+                if self.mode != "polling":
+                    logger.warning(json.dumps({"event": "catalog_change_stream_unavailable", "error": str(e)}))
+            if self.mode == "change_stream":
+                # A stream that was open is lost: changes since its last event were not seen.
+                # A stream that never opened changes nothing, so retries keep the version
+                self.invalidate()
+                last = None
+            try:
+                last = await self._poll_for(self.stream_retry_interval, last)
+            except Exception as e:
+                logger.warning(json.dumps({"event": "catalog_poll_failed", "error": str(e)}))
+                self.mode = "disconnected"
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        """Start watching for catalog changes (called from the app lifespan); reads are cached from then on"""
+        if self.enabled and self._task is None:
+            self._task = background_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.mode = "stopped"
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        snapshot = self._snapshot
+        return {
+            "enabled": self.enabled,
+            "mode": self.mode,
+            "version": self.version,
+            "snapshot_version": snapshot.version if snapshot else None,
+            "documents": len(snapshot.coffees) if snapshot else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "loads": self.loads,
+            "load_failures": self.load_failures,
+            "invalidations": self.invalidations,
+            "last_load_ms": round(self.last_load_seconds * 1000, 1) if self.last_load_seconds is not None else None,
+            # How old the cached data is, and how late the last change was noticed
+            "snapshot_age_seconds": round(time.time() - snapshot.loaded_at, 1) if snapshot else None,
+            "last_invalidation_lag_ms": (
+                round(self.last_invalidation_lag_seconds * 1000, 1)
+                if self.last_invalidation_lag_seconds is not None
+                else None
+            ),
+            "max_staleness_seconds": self.poll_interval if self.mode == "polling" else None,
+        }
+
+
+catalog_cache = CatalogCache(
+    enabled=settings.CATALOG_CACHE_ENABLED,
+    poll_interval=settings.CATALOG_CACHE_POLL_SECONDS,
+    stream_retry_interval=settings.CATALOG_CACHE_STREAM_RETRY_SECONDS,
+)
@@ -0,0 +1,92 @@
+"""
+Seeds the coffee catalog from a product feed such as app/data/coffe_data.json.
+
+Products are upserted by SKU through the bulk import path, so re-running the
+loader updates prices and stock instead of duplicating coffees.
+Usage: python -m app.services.catalog_loader [path]
+"""
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.schemas.coffee_schema import CoffeeBulkRequest, CoffeeBulkResponse
+from app.services.coffee_service import CoffeeService
+
+DEFAULT_CATALOG_PATH = Path(__file__).parent.parent / "data" / "coffe_data.json"
+
+
+def _join(values: Optional[List[Any]]) -> Optional[str]:
+    return ", ".join(str(value) for value in values) if values else None
+
+
+def map_product(product: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map one feed product onto the CoffeeCreate fields. Ratings, review counts
+    and timestamps are owned by the catalog, so they are not imported.
+    """
+    altitude = product.get("altitude_masl")
+    weight_g = product.get("weight_g")
+    stock = product.get("stock") or 0
+    available = product.get("available", True) and stock > 0
+
+    coffee = {
+        "sku": product.get("sku"),
+        "name": product["name"],
+        "origin": _join(product.get("origin")),
+        "region": product.get("region"),
+        "producer_name": product.get("farm"),
+        "price": product["price"],
+        "currency": product.get("currency", "USD"),
+        "processing": _join([method.title() for method in product.get("processing") or []]),
+        "altitude": f"{altitude[0]}-{altitude[-1]} masl" if altitude else None,
+        "flavor_notes": product.get("flavor_notes") or [],
+        "harvest_year": product.get("harvest_year"),
+        "availability": "In Stock" if available else "Out of Stock",
+        "quantity_available": stock,
+        "unit": "bag" if weight_g else "unit",
+        "images": product.get("images") or [],
+        "description": product.get("description"),
+    }
+    if weight_g:
+        coffee["price_per_kg"] = round(product["price"] / (weight_g / 1000), 2)
+    return coffee
+
+
+def load_products(path: Path = DEFAULT_CATALOG_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    products = data["products"] if isinstance(data, dict) else data
+    return [map_product(product) for product in products]
+
+
+async def seed_catalog(
+    path: Path = DEFAULT_CATALOG_PATH, coffee_service: Optional[CoffeeService] = None
+) -> CoffeeBulkResponse:
+    coffee_service = coffee_service or CoffeeService()
+    request = CoffeeBulkRequest(items=load_products(path), upsert=True)
+    return await coffee_service.bulk_import(request)
+
+
+async def main():
+    from app.database import close_database, init_database
+
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CATALOG_PATH
+    await init_database()
+    try:
+        result = await seed_catalog(path)
+    finally:
+        await close_database()
+
+    print(
+        f"☕ Seeded {result.received} products from {path.name}: "
+        f"{result.inserted} inserted, {result.updated} updated, {result.failed} failed "
+        f"({result.docs_per_second:,.0f} docs/s)"
+    )
+    for error in result.errors:
+        print(f"❌ row {error.index}: {error.error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
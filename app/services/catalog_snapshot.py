@@ -0,0 +1,107 @@
+import asyncio
+import gzip
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.responses import dumps
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip and identity are offered
+    brotli = None
+
+# Preference when the client accepts several equally
+ENCODINGS = ("br", "gzip", "identity") if brotli is not None else ("gzip", "identity")
+
+
+class RenderedSnapshot(NamedTuple):
+    version: int
+    # Content-coding -> response body
+    bodies: Dict[str, bytes]
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> str:
+    """Best available content-coding for an Accept-Encoding header"""
+    if not accept_encoding:
+        return "identity"
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = "identity", 0.0
+    for coding in ENCODINGS:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class SnapshotRenderer:
+    """
+    Renders a payload once per catalog version into identity, gzip and br
+    bodies, so every request for that version only picks a buffer. Encoding
+    runs on a worker thread; concurrent renders of one version are shared.
+    """
+
+    def __init__(self, gzip_level: int, brotli_quality: int):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._rendered: Optional[RenderedSnapshot] = None
+        self._rendering: Dict[int, asyncio.Task] = {}
+
+        # Metrics
+        self.hits = 0
+        self.renders = 0
+        self.last_render_seconds: Optional[float] = None
+
+    async def render(self, version: int, content: Callable[[], Any]) -> RenderedSnapshot:
+        rendered = self._rendered
+        if rendered is not None and rendered.version == version:
+            self.hits += 1
+            return rendered
+
+        rendering = self._rendering.get(version)
+        if rendering is None:
+            rendering = asyncio.create_task(asyncio.to_thread(self._encode, version, content()))
+            rendering.add_done_callback(lambda task: self._rendering.pop(version, None))
+            self._rendering[version] = rendering
+        rendered = await asyncio.shield(rendering)
+        if self._rendered is None or version >= self._rendered.version:
+            self._rendered = rendered
+        return rendered
+
+    def _encode(self, version: int, content: Any) -> RenderedSnapshot:
+        started = time.perf_counter()
+        raw = dumps(content)
+        bodies = {"identity": raw, "gzip": gzip.compress(raw, compresslevel=self.gzip_level)}
+        if brotli is not None:
+            bodies["br"] = brotli.compress(raw, quality=self.brotli_quality)
+        self.last_render_seconds = time.perf_counter() - started
+        self.renders += 1
+        return RenderedSnapshot(version=version, bodies=bodies)
+
+    def stats(self) -> Dict[str, Any]:
+        rendered = self._rendered
+        return {
+            "version": rendered.version if rendered else None,
+            "bytes": {coding: len(body) for coding, body in rendered.bodies.items()} if rendered else {},
+            "hits": self.hits,
+            "renders": self.renders,
+            "last_render_ms": round(self.last_render_seconds * 1000, 1) if self.last_render_seconds is not None else None,
+        }
+
+
+# The full coffee listing (GET /api/coffee/)
+catalog_listing = SnapshotRenderer(
+    gzip_level=settings.CATALOG_SNAPSHOT_GZIP_LEVEL,
+    brotli_quality=settings.CATALOG_SNAPSHOT_BROTLI_QUALITY,
+)
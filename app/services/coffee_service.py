@@ -1,51 +1,168 @@
-from app.repositories.coffee_repository import CoffeeRepository
-from app.schemas.coffee_schema import CoffeeCreate, CoffeeUpdate, CoffeeResponse
+from app.repositories.coffee_repository import COFFEE_RESPONSE_FIELDS, CoffeeRepository
+from app.schemas.coffee_schema import (
+    BulkItemError,
+    CoffeeBulkRequest,
+    CoffeeBulkResponse,
+    CoffeeCreate,
+    CoffeeListResponse,
+    CoffeeResponse,
+    CoffeeSearchRequest,
+    CoffeeUpdate,
+)
 from app.models.coffee import Coffee
-from typing import List, Optional
+from app.core.config import settings
+from app.core.raw_documents import construct_response
+from app.services.catalog_cache import catalog_cache
+from app.services.catalog_snapshot import RenderedSnapshot, catalog_listing
+from typing import AsyncIterator, List, Optional
+from pydantic import ValidationError
+import asyncio
+import math
+import time
+from fastapi import HTTPException, status
+
+# get_all_coffees has always returned at most this many (find_all's default)
+ALL_COFFEES_LIMIT = 100
+
 
 class CoffeeService:
-    def __init__(self):
-        self.coffee_repository = CoffeeRepository()
+    def __init__(self, coffee_repository: Optional[CoffeeRepository] = None):
+        self.coffee_repository = coffee_repository or CoffeeRepository()
 
     async def create_coffee(self, coffee: CoffeeCreate) -> CoffeeResponse:
         """Create a new coffee"""
         created_coffee = await self.coffee_repository.create_coffee(coffee)
+        # Our own writes are visible on this instance at once, before the change stream says so
+        catalog_cache.invalidate()
         return CoffeeResponse.model_validate(created_coffee.model_dump())
 
-    async def update_coffee(self, coffee_id: str, coffee: CoffeeUpdate) -> CoffeeResponse:
+    async def update_coffee(self, coffee_id: str, coffee: CoffeeUpdate) -> Optional[CoffeeResponse]:
         """Update an existing coffee"""
         updated_coffee = await self.coffee_repository.update_coffee(coffee_id, coffee)
-        return CoffeeResponse.model_validate(updated_coffee.model_dump())
+        if updated_coffee:
+            catalog_cache.invalidate()
+            return CoffeeResponse.model_validate(updated_coffee.model_dump())
+        return None
+
+    async def bulk_import(self, request: CoffeeBulkRequest) -> CoffeeBulkResponse:
+        """Insert (or upsert by SKU) many coffees with chunked unordered bulk writes"""
+        items, positions, errors = [], [], []
+        for index, raw in enumerate(request.items):
+            try:
+                # Upserts keep only the fields sent, so existing values are not reset
+                item = CoffeeCreate.model_validate(raw).model_dump(exclude_unset=request.upsert)
+            except ValidationError as e:
+                detail = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+                errors.append(BulkItemError(index=index, error=detail))
+                continue
+            items.append(item)
+            positions.append(index)
+
+        started = time.perf_counter()
+        if request.upsert:
+            report = await self.coffee_repository.upsert_coffees_by_sku(items, chunk_size=settings.BULK_WRITE_CHUNK_SIZE)
+        else:
+            report = await self.coffee_repository.create_coffees(items, chunk_size=settings.BULK_WRITE_CHUNK_SIZE)
+        elapsed = time.perf_counter() - started
+        catalog_cache.invalidate()
+
+        # Repository errors are indexed within the validated rows; map them back to the request
+        errors.extend(BulkItemError(index=positions[error["index"]], error=error["error"]) for error in report["errors"])
+        errors.sort(key=lambda error: error.index)
+        written = report["inserted"] + report["upserted"] + report["matched"]
+        return CoffeeBulkResponse(
+            received=len(request.items),
+            inserted=report["inserted"] + report["upserted"],
+            updated=report["matched"],
+            failed=len(errors),
+            errors=errors,
+            elapsed_ms=round(elapsed * 1000, 2),
+            docs_per_second=round(written / elapsed, 1) if elapsed > 0 else 0.0,
+        )
 
     async def delete_coffee(self, coffee_id: str) -> bool:
         """Delete a coffee by ID"""
-        return await self.coffee_repository.delete_coffee(coffee_id)
+        deleted = await self.coffee_repository.delete_coffee(coffee_id)
+        if deleted:
+            catalog_cache.invalidate()
+        return deleted
 
     async def get_coffee_by_id(self, coffee_id: str) -> Optional[CoffeeResponse]:
         """Get a coffee by ID"""
-        coffee = await self.coffee_repository.get_coffee_by_id(coffee_id)
+        if catalog_cache.active:
+            # Cache keys are canonical (lowercase) ObjectId strings
+            return (await catalog_cache.get()).by_id.get(coffee_id.lower())
+        coffee = await self.coffee_repository.get_coffee_by_id(coffee_id, projection=COFFEE_RESPONSE_FIELDS)
         if coffee:
-            return CoffeeResponse.model_validate(coffee.model_dump())
+            return construct_response(CoffeeResponse, coffee)
         return None
 
     async def get_coffee_by_name(self, coffee_name: str) -> Optional[CoffeeResponse]:
         """Get a coffee by name"""
-        coffee = await self.coffee_repository.get_coffee_by_name(coffee_name)
+        if catalog_cache.active:
+            return (await catalog_cache.get()).by_name.get(coffee_name)
+        coffee = await self.coffee_repository.get_coffee_by_name(coffee_name, projection=COFFEE_RESPONSE_FIELDS)
         if coffee:
-            return CoffeeResponse.model_validate(coffee.model_dump())
+            return construct_response(CoffeeResponse, coffee)
         return None
 
     async def get_all_coffees(self) -> List[CoffeeResponse]:
         """Get all coffees"""
-        coffees = await self.coffee_repository.get_all_coffees()
-        return [CoffeeResponse.model_validate(coffee.model_dump()) for coffee in coffees]
+        if catalog_cache.active:
+            return (await catalog_cache.get()).coffees[:ALL_COFFEES_LIMIT]
+        coffees = await self.coffee_repository.get_all_coffees(projection=COFFEE_RESPONSE_FIELDS)
+        return [construct_response(CoffeeResponse, coffee) for coffee in coffees]
+
+    async def get_all_coffees_rendered(self) -> RenderedSnapshot:
+        """The get_all_coffees body, encoded and compressed once per catalog version (needs an active catalog cache)"""
+        snapshot = await catalog_cache.get()
+        return await catalog_listing.render(snapshot.version, lambda: snapshot.coffees[:ALL_COFFEES_LIMIT])
+
+    async def list_coffees(self, limit: int = 20, cursor: Optional[str] = None, include_total: bool = False) -> CoffeeListResponse:
+        """Get one page of coffees, newest first, using keyset pagination"""
+        try:
+            coffees, next_cursor = await self.coffee_repository.get_coffees_page(
+                limit=limit, cursor=cursor, projection=COFFEE_RESPONSE_FIELDS
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        total = await self.coffee_repository.count_coffees() if include_total else None
+        # Constructed rows pass through: instances are not revalidated
+        return CoffeeListResponse(
+            coffees=[construct_response(CoffeeResponse, coffee) for coffee in coffees],
+            total=total,
+            size=limit,
+            next_cursor=next_cursor,
+        )
+
+    async def search_coffees(self, search: CoffeeSearchRequest) -> CoffeeListResponse:
+        """One page of the coffees matching every filter in the request, with the total match count"""
+        coffees, total = await asyncio.gather(
+            self.coffee_repository.search_coffees(search, projection=COFFEE_RESPONSE_FIELDS),
+            self.coffee_repository.count_search_matches(search),
+        )
+        return CoffeeListResponse(
+            coffees=[construct_response(CoffeeResponse, coffee) for coffee in coffees],
+            total=total,
+            page=search.page,
+            size=search.size,
+            pages=max(1, math.ceil(total / search.size)),
+        )
+
+    async def export_coffees(self) -> AsyncIterator[bytes]:
+        """Stream every coffee as NDJSON, one line per document"""
+        async for coffee in self.coffee_repository.iterate_coffees(
+            batch_size=settings.EXPORT_BATCH_SIZE, projection=COFFEE_RESPONSE_FIELDS
+        ):
+            row = construct_response(CoffeeResponse, coffee)
+            yield row.model_dump_json().encode() + b"\n"
 
     async def get_coffees_by_origin(self, origin: str) -> List[CoffeeResponse]:
         """Get coffees by origin"""
-        coffees = await self.coffee_repository.get_coffees_by_origin(origin)
-        return [CoffeeResponse.model_validate(coffee.model_dump()) for coffee in coffees]
+        coffees = await self.coffee_repository.get_coffees_by_origin(origin, projection=COFFEE_RESPONSE_FIELDS)
+        return [construct_response(CoffeeResponse, coffee) for coffee in coffees]
 
     async def get_coffees_by_region(self, region: str) -> List[CoffeeResponse]:
         """Get coffees by region"""
-        coffees = await self.coffee_repository.get_coffees_by_region(region)
-        return [CoffeeResponse.model_validate(coffee.model_dump()) for coffee in coffees]
+        coffees = await self.coffee_repository.get_coffees_by_region(region, projection=COFFEE_RESPONSE_FIELDS)
+        return [construct_response(CoffeeResponse, coffee) for coffee in coffees]
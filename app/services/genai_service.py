@@ -1,45 +1,67 @@
  # app/services/genai_service.py
 from fastapi import HTTPException , status
 from app.core.config import settings
+from app.core.providers import LazyProvider, register
 from app.schemas.genai_schema import GenaiRequest, GenaiResponse
-from google import genai
-from google.genai.errors import ClientError
 from typing import List
 import json
 from  pathlib import Path 
 
+COFFEE_DATA_PATH = Path(__file__).parent.parent / "data" / "coffe_data.json"
+
+
+def _create_client():
+    # google.genai takes over a second to import, so it is imported here, not at module load
+    from google import genai
+
+    return genai.Client(api_key=settings.GOOGLE_API_KEY)
+
+
+def _build_context() -> str:
+    # Load coffee data from JSON file
+    with COFFEE_DATA_PATH.open() as f:
+        coffee_data_json = json.load(f)
+
+    # Format coffee data for context
+    coffee_data = json.dumps(coffee_data_json, indent=2)
+
+    # Updated context with coffee data
+    return (
+        "You are a helpful coffee expert assistant for Rostila Coffee. "
+        "you are create and trained by John Bekele .Lead devloper for the project "
+        "You have access to our complete coffee inventory and can help customers with: "
+        "coffee recommendations, flavor profiles, pricing, availability, shipping information, "
+        "and general coffee knowledge. "
+        f"\n\n{coffee_data}\n\n"
+        "Always respond ONLY in JSON format. "
+        "Do NOT ask for more information. "
+        "if client insiste to specifice answer say plase reach out to my developer John Bekele for more information"
+        "Use this format: "
+        "{'message': '<personalized message>'"
+    )
+
+
+# Shared by every request; created on first use or by the startup warm-up
+genai_client = register(
+    LazyProvider("genai_client", _create_client), warm_up=bool(settings.GOOGLE_API_KEY)
+)
+genai_context = register(LazyProvider("genai_context", _build_context))
+
 
 class GenaiService:
     def __init__(self):
         if not settings.GOOGLE_API_KEY:
             raise ValueError("Google API key not configured")
-        self.client = genai.Client(api_key=settings.GOOGLE_API_KEY)
-        
-        # Load coffee data from JSON file
-        self.path = Path(__file__).parent.parent / "data" / "coffe_data.json"
-        with self.path.open() as f:
-            coffee_data_json = json.load(f)
-        
-        # Format coffee data for context
-        self.coffee_data = json.dumps(coffee_data_json, indent=2)
-
-        # Updated context with coffee data
-        self.context = (
-            "You are a helpful coffee expert assistant for Rostila Coffee. "
-            "you are create and trained by John Bekele .Lead devloper for the project "
-            "You have access to our complete coffee inventory and can help customers with: "
-            "coffee recommendations, flavor profiles, pricing, availability, shipping information, "
-            "and general coffee knowledge. "
-            f"\n\n{self.coffee_data}\n\n"
-            "Always respond ONLY in JSON format. "
-            "Do NOT ask for more information. "
-            "if client insiste to specifice answer say plase reach out to my developer John Bekele for more information"
-            "Use this format: "
-            "{'message': '<personalized message>'"
-        )
+
+    @property
+    def client(self):
+        return genai_client.get()
+
+    @property
+    def context(self) -> str:
+        return genai_context.get()
 
     def generate_response(self, request: GenaiRequest) -> GenaiResponse:
-        print(f"request: {self.coffee_data}")
         try:
             full_prompt = f"{self.context}\n\nUser: {request.prompt}\nUsername: {request.username}"
             response = self.client.models.generate_content(
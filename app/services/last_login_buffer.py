@@ -0,0 +1,201 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.claims_cache import claims_cache
+from app.core.config import settings
+from app.core.db_accounting import background_task
+from app.models.users import User
+
+# A user's update that the server rejects this many times is dropped
+MAX_WRITE_ATTEMPTS = 3
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for login tracking (last_login, last_ip, last_device).
+
+    Logins only record into memory; repeated logins of the same user are
+    coalesced, and the buffer is written as one unordered bulk_write every
+    flush_interval seconds, when max_pending users are waiting, and on shutdown.
+    One flush runs at a time; after a failed one, flushes back off (doubling
+    up to max_backoff) and the buffer holds at most max_buffered users,
+    dropping the oldest logins beyond that.
+    """
+
+    def __init__(self, flush_interval: float, max_pending: int, max_buffered: int, max_backoff: float):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_buffered = max_buffered
+        self.max_backoff = max_backoff
+        # Oldest login first
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # Rejected writes per user, until MAX_WRITE_ATTEMPTS
+        self._attempts: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._flushing = False
+        self._backoff = 0.0
+        self._retry_at = 0.0
+
+        # Metrics
+        self.recorded = 0
+        self.flushes = 0
+        self.written = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    def record(
+        self,
+        user_id: str,
+        ip_address: Optional[str],
+        device: Optional[str],
+        login_time: Optional[datetime] = None,
+    ) -> None:
+        """Queue a login; a later login of the same user replaces this one"""
+        login_time = login_time or datetime.utcnow()
+        # Moved to the end, so the buffer stays in login order
+        self._pending.pop(user_id, None)
+        self._pending[user_id] = {
+            "last_login": login_time,
+            "last_ip": ip_address,
+            "last_device": device,
+            "updated_at": login_time,
+        }
+        self.recorded += 1
+        self._trim()
+
+        if len(self._pending) >= self.max_pending and not self._flushing and not self._backing_off():
+            # Started by whichever login filled the buffer, but not part of that request
+            task = background_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self, force: bool = False) -> int:
+        """
+        Write everything buffered so far; returns the number of users written.
+        Skipped while another flush runs or, unless forced, while backing off.
+        """
+        if not self._pending or self._flushing or (self._backing_off() and not force):
+            return 0
+
+        # Swap the buffer first so logins arriving during the write go to the next batch
+        self._flushing = True
+        batch, self._pending = self._pending, {}
+        user_ids = list(batch)
+        operations = [
+            UpdateOne({"_id": PydanticObjectId(user_id)}, {"$set": batch[user_id]})
+            for user_id in user_ids
+        ]
+
+        rejected: Dict[str, Dict[str, Any]] = {}
+        try:
+            await User.get_motor_collection().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: every operation not reported here was written
+            for error in e.details.get("writeErrors", []):
+                user_id = user_ids[error["index"]]
+                rejected[user_id] = batch[user_id]
+            print(f"Failed to write {len(rejected)} of {len(batch)} last-login updates: {e}")
+        except asyncio.CancelledError:
+            # Shutdown mid-write: keep the batch for drain (repeating a $set is harmless)
+            self._requeue(batch)
+            raise
+        except Exception as e:
+            self.failed_flushes += 1
+            self._backoff = min(max(self._backoff * 2, self.flush_interval), self.max_backoff)
+            self._retry_at = time.monotonic() + self._backoff
+            print(f"Failed to flush {len(batch)} last-login updates (retry in {self._backoff:.1f}s): {e}")
+            self._requeue(batch)
+            return 0
+        finally:
+            self._flushing = False
+
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        if rejected:
+            self.failed_flushes += 1
+            self._requeue(rejected, count_attempt=True)
+        written = [user_id for user_id in user_ids if user_id not in rejected]
+        self.flushes += 1
+        self.written += len(written)
+        for user_id in written:
+            self._attempts.pop(user_id, None)
+            claims_cache.pop(user_id)
+        return len(written)
+
+    def _backing_off(self) -> bool:
+        return time.monotonic() < self._retry_at
+
+    def _requeue(self, entries: Dict[str, Dict[str, Any]], count_attempt: bool = False) -> None:
+        """Put unwritten updates back ahead of newer logins, unless that user logged in again meanwhile"""
+        kept: Dict[str, Dict[str, Any]] = {}
+        for user_id, fields in entries.items():
+            if user_id in self._pending:
+                continue
+            if count_attempt:
+                attempts = self._attempts.get(user_id, 0) + 1
+                if attempts >= MAX_WRITE_ATTEMPTS:
+                    self._attempts.pop(user_id, None)
+                    self.dropped += 1
+                    continue
+                self._attempts[user_id] = attempts
+            kept[user_id] = fields
+        self._pending = {**kept, **self._pending}
+        self._trim()
+
+    def _trim(self) -> None:
+        """Enforce max_buffered by dropping the oldest logins"""
+        while len(self._pending) > self.max_buffered:
+            user_id = next(iter(self._pending))
+            del self._pending[user_id]
+            self._attempts.pop(user_id, None)
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush (called from the app lifespan)"""
+        if self._task is None:
+            self._task = background_task(self._run())
+
+    async def drain(self) -> None:
+        """Stop the periodic flush and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        # Last chance to write: ignores the backoff
+        await self.flush(force=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "written": self.written,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+            "backoff_seconds": self._backoff,
+        }
+
+
+last_login_buffer = LastLoginBuffer(
+    flush_interval=settings.LAST_LOGIN_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.LAST_LOGIN_FLUSH_MAX_PENDING,
+    max_buffered=settings.LAST_LOGIN_BUFFER_MAX_USERS,
+    max_backoff=settings.LAST_LOGIN_FLUSH_MAX_BACKOFF_SECONDS,
+)
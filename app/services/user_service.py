@@ -1,20 +1,37 @@
 from app.repositories.user_repository import UserRepository
-from app.schemas.user_schema import UserCreate, UserResponse
+from app.schemas.user_schema import UserCreate, UserExportRow, UserResponse, UserListResponse
 from fastapi import HTTPException, status
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
 from app.core.security import security_manager
-from app.models.users import User
+from app.core.claims_cache import claims_cache
+from app.models.users import User, UserAuthView
+from app.models.auth import RefreshToken
 from app.services.email_service import EmailService
 from app.core.config import settings
+from app.core.raw_documents import construct_response, response_projection
+
+# Public reads fetch exactly the UserResponse fields as raw BSON and build
+# the response without validating a read model first
+USER_RESPONSE_FIELDS = response_projection(UserResponse)
+# The export reads only its allow-listed columns
+USER_EXPORT_FIELDS = response_projection(UserExportRow)
 
 
 class UserService:
-    def __init__(self) -> None:
-        self.user_repository = UserRepository()
+    def __init__(
+        self,
+        user_repository: Optional[UserRepository] = None,
+        email_service: Optional[EmailService] = None,
+    ) -> None:
+        self.user_repository = user_repository or UserRepository()
+        self.email_service = email_service or EmailService()
 
     async def create_user(self, user_data: UserCreate, client_ip: str = None, user_agent: str = None) -> UserResponse:
-        existing_user = await self.user_repository.email_exists(user_data.email)
-        username_exists = await self.user_repository.username_exists(user_data.username)
+        conflicts = await self.user_repository.find_identity_conflicts(
+            user_data.email, user_data.username
+        )
+        existing_user = conflicts["email"]
+        username_exists = conflicts["username"]
 
         # Case 1: Email exists
         if existing_user:
@@ -24,10 +41,17 @@ class UserService:
                     detail="Account already exists",
                 )
             else:
+                # The conflict check only fetched identity fields; the resend needs the profile and token
+                existing_user = await self.user_repository.get_user_for_verification(str(existing_user.id))
+                if not existing_user:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Account changed during signup, please retry",
+                    )
                 # Resend verification link
                 try:
                     if settings.SMTP_HOST and settings.SMTP_USER and settings.SMTP_PASSWORD:
-                        email_service = EmailService()
+                        email_service = self.email_service
                         verification_link = f"{settings.BACKEND_URL}/api/auth/verify-email?token={existing_user.verification_token}"
                         body = email_service.get_template("email_verification")
                         body = body.replace("[Verification Link]", verification_link)
@@ -72,13 +96,13 @@ class UserService:
             )
 
         # Case 3: Fresh signup
-        hashed_password = security_manager.get_password_hash(user_data.password)
+        hashed_password = await security_manager.get_password_hash_async(user_data.password)
         user = await self.user_repository.create_user(user_data, hashed_password, client_ip)
 
         try:
             # Check if email configuration is available
             if settings.SMTP_HOST and settings.SMTP_USER and settings.SMTP_PASSWORD:
-                email_service = EmailService()
+                email_service = self.email_service
                 verification_link = f"{settings.BACKEND_URL}/api/auth/verify-email?token={user.verification_token}"
                 body = email_service.get_template("email_verification")
                 body = body.replace("[Verification Link]", verification_link)
@@ -115,21 +139,21 @@ class UserService:
             created_at=user.created_at,
         )
 
-    async def authenticate_user(self, username: str, password: str) -> Optional[User]:
+    async def authenticate_user(
+        self, username: str, password: str
+    ) -> Optional[UserAuthView]:
         """Authenticate user by username or email"""
-        # Try to find user by username first
-        user = await self.user_repository.username_exists(username)
-
-        # If not found by username, try by email
-        if not user:
-            user = await self.user_repository.email_exists(username)
+        # Single $or lookup, projected to the fields login needs
+        user = await self.user_repository.get_user_for_login(username)
 
         # If user still not found
         if not user:
             return None
 
         # Verify password
-        if not security_manager.verify_password(password, user.hashed_password):
+        if not await security_manager.verify_password_async(
+            password, user.hashed_password
+        ):
             return None
 
         # Check if user is active
@@ -140,142 +164,104 @@ class UserService:
 
     async def get_user_by_id(self, user_id: str) -> UserResponse:
         """Get user by ID"""
-        user = await self.user_repository.find_by_ID(user_id)
+        user = await self.user_repository.get_public_user_by_id(
+            user_id, projection=USER_RESPONSE_FIELDS
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        return UserResponse(
-            id=str(user.id),
-            email=user.email,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            phone_number=user.phone_number,
-            company_name=user.company_name,
-            company_address=user.company_address,
-            company_phone_number=user.company_phone_number,
-            company_email=user.company_email,
-            company_website=user.company_website,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            last_login=user.last_login,
-            last_ip=user.last_ip,
-            last_device=user.last_device,
-            created_at=user.created_at,
-        )
+        return construct_response(UserResponse, user)
 
     async def get_user_by_email(self, email: str) -> UserResponse:
         """Get user by email"""
-        user = await self.user_repository.email_exists(email)
+        user = await self.user_repository.get_public_user_by_email(
+            email, projection=USER_RESPONSE_FIELDS
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        return UserResponse(
-            id=str(user.id),
-            email=user.email,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            phone_number=user.phone_number,
-            company_name=user.company_name,
-            company_address=user.company_address,
-            company_phone_number=user.company_phone_number,
-            company_email=user.company_email,
-            company_website=user.company_website,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            last_login=user.last_login,
-            last_ip=user.last_ip,
-            last_device=user.last_device,
-            created_at=user.created_at,
-        )
+        return construct_response(UserResponse, user)
 
     async def get_user_by_username(self, username: str) -> UserResponse:
         """Get user by username"""
-        user = await self.user_repository.username_exists(username)
+        user = await self.user_repository.get_public_user_by_username(
+            username, projection=USER_RESPONSE_FIELDS
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        return UserResponse(
-            id=str(user.id),
-            email=user.email,
-            username=user.username,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            phone_number=user.phone_number,
-            company_name=user.company_name,
-            company_address=user.company_address,
-            company_phone_number=user.company_phone_number,
-            company_email=user.company_email,
-            company_website=user.company_website,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            last_login=user.last_login,
-            last_ip=user.last_ip,
-            last_device=user.last_device,
-            created_at=user.created_at,
-        )
+        return construct_response(UserResponse, user)
 
     async def get_all_users(
         self, skip: int = 0, limit: int = 100
     ) -> List[UserResponse]:
         """Get all users with pagination"""
-        users = await self.user_repository.get_all_users(skip=skip, limit=limit)
-        return [
-            UserResponse(
-                id=str(user.id),
-                email=user.email,
-                username=user.username,
-                first_name=user.first_name,
-                last_name=user.last_name,
-                phone_number=user.phone_number,
-                company_name=user.company_name,
-                company_address=user.company_address,
-                company_phone_number=user.company_phone_number,
-                company_email=user.company_email,
-                company_website=user.company_website,
-                is_active=user.is_active,
-                is_verified=user.is_verified,
-                last_login=user.last_login,
-                last_ip=user.last_ip,
-                last_device=user.last_device,
-                created_at=user.created_at,
+        users = await self.user_repository.get_all_users(
+            skip=skip, limit=limit, projection=USER_RESPONSE_FIELDS
+        )
+        return [construct_response(UserResponse, user) for user in users]
+
+    async def list_users(
+        self, limit: int = 20, cursor: Optional[str] = None, include_total: bool = False
+    ) -> UserListResponse:
+        """Get one page of users, newest first, using keyset pagination"""
+        try:
+            users, next_cursor = await self.user_repository.get_users_page(
+                limit=limit, cursor=cursor, projection=USER_RESPONSE_FIELDS
             )
-            for user in users
-        ]
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+            )
+        total = (
+            await self.user_repository.estimated_count() if include_total else None
+        )
+        return UserListResponse(
+            users=[construct_response(UserResponse, user) for user in users],
+            total=total,
+            size=limit,
+            next_cursor=next_cursor,
+        )
+
+    async def export_users(self) -> AsyncIterator[bytes]:
+        """Stream every user as NDJSON, one line per document (UserExportRow columns only)"""
+        async for user in self.user_repository.iterate_public_users(
+            batch_size=settings.EXPORT_BATCH_SIZE, projection=USER_EXPORT_FIELDS
+        ):
+            row = construct_response(UserExportRow, user)
+            yield row.model_dump_json().encode() + b"\n"
 
     async def update_user(
         self, user_id: str, update_data: Dict[str, Any]
     ) -> UserResponse:
         """Update user information"""
-        user = await self.user_repository.find_by_ID(user_id)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-            )
-
         # Remove password from update_data
         if "password" in update_data:
             update_data.pop("password")
 
-        # Update user
+        # Update user (single find_one_and_update; None means no such user)
         try:
-            updated_user = await self.user_repository.update_user_by_id(
+            updated_user = await self.user_repository.update_one(
                 user_id, update_data
             )
-
         except:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update user",
             )
 
+        if not updated_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        claims_cache.pop(user_id)
+
         return UserResponse(
             id=str(updated_user.id),
             email=updated_user.email,
@@ -298,15 +284,18 @@ class UserService:
 
     async def deactivate_user(self, user_id: str) -> UserResponse:
         """Deactivate user instead of deleting"""
-        user = await self.user_repository.find_by_ID(user_id)
-        if not user:
+        updated_user = await self.user_repository.update_one(
+            user_id, {"is_active": False}
+        )
+        if not updated_user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        updated_user = await self.user_repository.update_user_by_id(
-            user_id, {"is_active": False}
-        )
+        # Deactivated users must not keep riding on cached token verifications
+        security_manager.revoke_user_tokens(user_id)
+        claims_cache.pop(user_id)
+        await self.revoke_user_refresh_tokens(user_id)
 
         return UserResponse(
             id=str(updated_user.id),
@@ -330,15 +319,27 @@ class UserService:
 
     async def change_password(self, user_id: str, new_password: str) -> bool:
         """Change user password"""
-        user = await self.user_repository.find_by_ID(user_id)
-        if not user:
+        # Check first: an unknown user must not take a bcrypt slot before its 404
+        if not await self.user_repository.user_id_exists(user_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
-
-        hashed_password = security_manager.get_password_hash(new_password)
-        await self.user_repository.update_user_by_id(
+        hashed_password = await security_manager.get_password_hash_async(new_password)
+        updated_user = await self.user_repository.update_one(
             user_id, {"hashed_password": hashed_password}
         )
+        # Deleted while hashing
+        if not updated_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        security_manager.revoke_user_tokens(user_id)
+        # Sessions issued with the old password can no longer be refreshed
+        await self.revoke_user_refresh_tokens(user_id)
 
         return True
+
+    async def revoke_user_refresh_tokens(self, user_id: str) -> int:
+        """Delete every refresh token issued to the user"""
+        result = await RefreshToken.find(RefreshToken.user_id == user_id).delete()
+        return result.deleted_count if result else 0
@@ -0,0 +1,179 @@
+"""
+AppleJWTVerifier against a local JWKS stand-in (no network access needed).
+
+Run with: python -m app.test.apple_jwks_test  (or pytest app/test/apple_jwks_test.py)
+"""
+import asyncio
+import time
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.services.apple_auth_service import AppleJWTVerifier
+
+CLIENT_ID = "com.rosti.app"
+KEYS_URL = "https://jwks.local/auth/keys"
+
+
+def make_signing_key(kid: str):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+    public_jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_pem, public_jwk
+
+
+def make_identity_token(private_pem: str, kid: str, sub: str = "001234.apple") -> str:
+    claims = {
+        "iss": AppleJWTVerifier.APPLE_ISSUER,
+        "aud": CLIENT_ID,
+        "sub": sub,
+        "iat": int(time.time()),
+        "exp": int(time.time()) + 600,
+    }
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+class JWKSStandIn:
+    """Serves a mutable key set and counts requests"""
+
+    def __init__(self, keys, cache_control="max-age=3600", delay=0.0):
+        self.keys = keys
+        self.cache_control = cache_control
+        self.delay = delay
+        self.requests = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return httpx.Response(
+            200,
+            json={"keys": self.keys},
+            headers={"Cache-Control": self.cache_control},
+        )
+
+    def verifier(self, **kwargs) -> AppleJWTVerifier:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+        return AppleJWTVerifier(keys_url=KEYS_URL, http_client=client, **kwargs)
+
+
+def test_verifies_and_caches_keys():
+    async def scenario():
+        private_pem, public_jwk = make_signing_key("kid-1")
+        stand_in = JWKSStandIn([public_jwk])
+        verifier = stand_in.verifier()
+
+        token = make_identity_token(private_pem, "kid-1")
+        for _ in range(5):
+            claims = await verifier.verify_identity_token(token, CLIENT_ID)
+            assert claims["sub"] == "001234.apple"
+
+        assert stand_in.requests == 1
+        await verifier.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_unknown_kid_fetches_are_collapsed():
+    async def scenario():
+        old_pem, old_jwk = make_signing_key("kid-old")
+        new_pem, new_jwk = make_signing_key("kid-new")
+        stand_in = JWKSStandIn([old_jwk], delay=0.05)
+        verifier = stand_in.verifier(min_refetch_interval=0)
+
+        await verifier.verify_identity_token(
+            make_identity_token(old_pem, "kid-old"), CLIENT_ID
+        )
+        assert stand_in.requests == 1
+
+        # Apple rotates its keys; many logins arrive with the new kid at once
+        stand_in.keys = [old_jwk, new_jwk]
+        token = make_identity_token(new_pem, "kid-new")
+        results = await asyncio.gather(
+            *(verifier.verify_identity_token(token, CLIENT_ID) for _ in range(20))
+        )
+
+        assert all(claims["sub"] == "001234.apple" for claims in results)
+        assert stand_in.requests == 2
+        await verifier.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_honours_cache_control_max_age():
+    async def scenario():
+        private_pem, public_jwk = make_signing_key("kid-1")
+        stand_in = JWKSStandIn([public_jwk], cache_control="public, max-age=0")
+        verifier = stand_in.verifier()
+
+        token = make_identity_token(private_pem, "kid-1")
+        await verifier.verify_identity_token(token, CLIENT_ID)
+        await verifier.verify_identity_token(token, CLIENT_ID)
+
+        # max-age=0 means every verification must refetch the key set
+        assert stand_in.requests == 2
+        await verifier.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_rejects_wrong_audience_and_unknown_kid():
+    async def scenario():
+        private_pem, public_jwk = make_signing_key("kid-1")
+        stand_in = JWKSStandIn([public_jwk])
+        verifier = stand_in.verifier()
+
+        token = make_identity_token(private_pem, "kid-1")
+        try:
+            await verifier.verify_identity_token(token, "com.someone.else")
+            raise AssertionError("wrong audience was accepted")
+        except jwt.JWTError:
+            pass
+
+        try:
+            await verifier.verify_identity_token(
+                make_identity_token(private_pem, "kid-unknown"), CLIENT_ID
+            )
+            raise AssertionError("unknown kid was accepted")
+        except ValueError:
+            pass
+
+        # The unknown kid was inside min_refetch_interval, so no extra fetch
+        assert stand_in.requests == 1
+        await verifier.aclose()
+
+    asyncio.run(scenario())
+
+
+def main():
+    print("🍎 Apple JWKS verifier tests")
+    tests = [
+        test_verifies_and_caches_keys,
+        test_concurrent_unknown_kid_fetches_are_collapsed,
+        test_honours_cache_control_max_age,
+        test_rejects_wrong_audience_and_unknown_kid,
+    ]
+    all_passed = True
+    for test in tests:
+        try:
+            test()
+            print(f"✅ PASS {test.__name__}")
+        except Exception as e:
+            all_passed = False
+            print(f"❌ FAIL {test.__name__}: {e!r}")
+    print(f"\nOverall: {'✅ ALL TESTS PASSED' if all_passed else '❌ SOME TESTS FAILED'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Catalog import throughput in docs/sec: one insert per coffee vs. chunked
+unordered bulk writes (insert and upsert-by-SKU).
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Usage: python -m app.test.bulk_import_bench [documents]
+"""
+import asyncio
+import sys
+import time
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.schemas.coffee_schema import CoffeeBulkRequest, CoffeeCreate
+from app.services.catalog_loader import load_products
+from app.services.coffee_service import CoffeeService
+
+SCRATCH_DATABASE = "rostila_bulk_import_bench"
+
+
+def price_list(documents: int):
+    # The sample feed, repeated with unique SKUs until it has enough lots
+    products = load_products()
+    return [
+        {**products[i % len(products)], "sku": f"LOT-{i:06d}"}
+        for i in range(documents)
+    ]
+
+
+async def measure(label: str, operation, documents: int):
+    await Coffee.get_motor_collection().delete_many({})
+    started = time.perf_counter()
+    await operation()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34}{documents / elapsed:>12,.0f} docs/s{elapsed:>10.2f} s")
+
+
+async def one_by_one(service: CoffeeService, items):
+    for item in items:
+        await service.create_coffee(CoffeeCreate(**item))
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    client_kwargs = {}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+    service = CoffeeService()
+    items = price_list(documents)
+
+    try:
+        print(f"📦 Bulk import benchmark ({documents} coffees)")
+        await measure("one insert per coffee", lambda: one_by_one(service, items), documents)
+        await measure(
+            f"bulk insert ({settings.BULK_WRITE_CHUNK_SIZE}/chunk)",
+            lambda: service.bulk_import(CoffeeBulkRequest(items=items)),
+            documents,
+        )
+        await measure(
+            f"bulk upsert by SKU ({settings.BULK_WRITE_CHUNK_SIZE}/chunk)",
+            lambda: service.bulk_import(CoffeeBulkRequest(items=items, upsert=True)),
+            documents,
+        )
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
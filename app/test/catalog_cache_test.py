@@ -0,0 +1,168 @@
+"""
+Tests for the catalog cache's versioning, single-flight loading and
+polling fallback, with the database fetch replaced by an in-memory catalog
+(no MongoDB needed).
+
+Run with: python -m app.test.catalog_cache_test
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from app.core.raw_documents import construct_response
+from app.schemas.coffee_schema import CoffeeResponse
+from app.services.catalog_cache import CatalogCache
+
+
+def coffee(coffee_id: str, name: str) -> CoffeeResponse:
+    return construct_response(
+        CoffeeResponse, {"_id": coffee_id, "name": name, "price": 5.0, "created_at": datetime.utcnow()}
+    )
+
+
+class FakeCatalog(CatalogCache):
+    """Serves `rows` after a short delay, counting database fetches"""
+
+    def __init__(self, rows):
+        super().__init__(enabled=True, poll_interval=0.05, stream_retry_interval=1)
+        self.rows = rows
+        self.fetches = 0
+
+    async def _fetch(self):
+        self.fetches += 1
+        await asyncio.sleep(0.05)
+        return list(self.rows)
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = FakeCatalog([coffee("a1", "Sidamo"), coffee("b2", "Guji")])
+    snapshots = await asyncio.gather(*[cache.get() for _ in range(50)])
+    assert cache.fetches == 1, cache.fetches
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert cache.stats()["coalesced"] == 49
+    assert snapshots[0].by_id["b2"].name == "Guji" and snapshots[0].by_name["Sidamo"].id == "a1"
+    print("✅ 50 concurrent misses, 1 load")
+
+
+async def test_hits_until_invalidated():
+    cache = FakeCatalog([coffee("a1", "Sidamo")])
+    first = await cache.get()
+    assert await cache.get() is first and cache.hits == 1
+
+    cache.rows.append(coffee("c3", "Harrar"))
+    version = cache.invalidate(changed_at=datetime.utcnow() - timedelta(milliseconds=250))
+    reloaded = await cache.get()
+    assert reloaded.version == version > first.version
+    assert len(reloaded.coffees) == 2 and cache.fetches == 2
+    assert cache.stats()["last_invalidation_lag_ms"] >= 250
+    print(f"✅ version {first.version} -> {reloaded.version} after a change")
+
+
+async def test_etag_follows_content_not_version():
+    rows = [coffee("a1", "Sidamo"), coffee("b2", "Guji")]
+    # Two workers over the same catalog, at different local versions
+    first, second = FakeCatalog(rows), FakeCatalog(rows)
+    second.invalidate()
+    second.invalidate()
+    tagged = await first.get()
+    assert tagged.etag == (await second.get()).etag and tagged.version != second.version
+
+    first.rows = [rows[0], coffee("b2", "Guji Natural")]
+    first.invalidate()
+    assert (await first.get()).etag != tagged.etag
+    print(f"✅ same catalog, same ETag {tagged.etag} across workers; an edit changes it")
+
+
+async def test_change_during_load_is_not_missed():
+    cache = FakeCatalog([coffee("a1", "Sidamo")])
+    loading = asyncio.create_task(cache.get())
+    await asyncio.sleep(0.01)
+    # The catalog changes while the first load is still reading
+    cache.rows.append(coffee("c3", "Harrar"))
+    cache.invalidate()
+    stale = await loading
+    fresh = await cache.get()
+    assert stale.version < fresh.version and len(fresh.coffees) == 2
+    print("✅ a change during a load triggers another load")
+
+
+async def test_failed_load_is_retried():
+    cache = FakeCatalog([coffee("a1", "Sidamo")])
+    fetch = cache._fetch
+
+    async def failing():
+        raise RuntimeError("primary unavailable")
+
+    cache._fetch = failing
+    try:
+        await cache.get()
+        raise AssertionError("load error was swallowed")
+    except RuntimeError:
+        pass
+    cache._fetch = fetch
+    assert len((await cache.get()).coffees) == 1
+    assert cache.stats()["load_failures"] == 1
+    print("✅ a failed load is reported and retried")
+
+
+class StandaloneCatalog(FakeCatalog):
+    """No change streams; the fingerprint is whatever the test sets"""
+
+    def __init__(self, rows, stream_fails_after: int = 0):
+        super().__init__(rows)
+        self.stream_retry_interval = 0.1
+        self.fingerprint = (1,)
+        self.stream_attempts = 0
+        # Attempts that open the stream (then lose it) before it fails outright
+        self.stream_fails_after = stream_fails_after
+
+    async def _follow_change_stream(self):
+        self.stream_attempts += 1
+        if self.stream_attempts <= self.stream_fails_after:
+            self.mode = "change_stream"
+            await asyncio.sleep(0.02)
+            raise ConnectionError("stream lost")
+        raise RuntimeError("The $changeStream stage is only supported on replica sets")
+
+    async def _fingerprint(self):
+        return self.fingerprint
+
+
+async def test_stream_retries_keep_the_version():
+    cache = StandaloneCatalog([coffee("a1", "Sidamo")])
+    cache.start()
+    await asyncio.sleep(0.05)
+    version = cache.version
+    await asyncio.sleep(0.45)
+    assert cache.stream_attempts >= 4 and cache.version == version, (cache.stream_attempts, cache.version)
+
+    # A change between polling windows is still seen, once
+    cache.fingerprint = (2,)
+    await asyncio.sleep(0.15)
+    await cache.stop()
+    assert cache.version == version + 1, cache.version
+    print(f"✅ {cache.stream_attempts} failed stream retries, version bumped only by the change")
+
+
+async def test_lost_stream_invalidates():
+    cache = StandaloneCatalog([coffee("a1", "Sidamo")], stream_fails_after=1)
+    cache.start()
+    await asyncio.sleep(0.05)
+    await cache.stop()
+    assert cache.invalidations == 1, cache.invalidations
+    print("✅ losing an open change stream invalidates")
+
+
+async def main():
+    print("🗂️  Catalog cache tests")
+    await test_concurrent_misses_share_one_load()
+    await test_hits_until_invalidated()
+    await test_etag_follows_content_not_version()
+    await test_change_during_load_is_not_missed()
+    await test_failed_load_is_retried()
+    await test_stream_retries_keep_the_version()
+    await test_lost_stream_invalidates()
+    print("✅ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
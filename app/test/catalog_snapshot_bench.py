@@ -0,0 +1,93 @@
+"""
+Bytes on the wire and CPU per request for the full coffee listing:
+encoding (and compressing) on every request vs. picking a buffer from the
+precompressed per-version snapshot. br is measured when brotli is installed.
+
+No MongoDB needed: both routes serve the same in-memory listing.
+Usage: python -m app.test.catalog_snapshot_bench [documents] [requests]
+"""
+import asyncio
+import gzip
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI, Request, Response
+
+from app.core.config import settings
+from app.core.responses import dumps
+from app.services.catalog_snapshot import ENCODINGS, SnapshotRenderer, brotli, negotiate_encoding
+from app.test.serialization_bench import coffees
+
+# Typical on-the-fly settings (Starlette's GZipMiddleware level, a fast brotli quality)
+ON_THE_FLY_GZIP_LEVEL = 9
+ON_THE_FLY_BROTLI_QUALITY = 4
+
+
+def bench_app(listing) -> FastAPI:
+    app = FastAPI()
+    renderer = SnapshotRenderer(
+        gzip_level=settings.CATALOG_SNAPSHOT_GZIP_LEVEL,
+        brotli_quality=settings.CATALOG_SNAPSHOT_BROTLI_QUALITY,
+    )
+
+    @app.get("/on-the-fly")
+    async def on_the_fly(request: Request):
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        body = dumps(listing)
+        headers = {}
+        if encoding == "gzip":
+            body = gzip.compress(body, compresslevel=ON_THE_FLY_GZIP_LEVEL)
+        elif encoding == "br":
+            body = brotli.compress(body, quality=ON_THE_FLY_BROTLI_QUALITY)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @app.get("/snapshot")
+    async def snapshot(request: Request):
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        rendered = await renderer.render(1, lambda: listing)
+        headers = {"Content-Encoding": encoding} if encoding != "identity" else {}
+        return Response(content=rendered.bodies[encoding], media_type="application/json", headers=headers)
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, encoding: str, requests: int):
+    """Compressed bytes and CPU milliseconds per request"""
+    headers = {"Accept-Encoding": encoding}
+    # Content-Length is the encoded size; .content would be decoded by httpx
+    wire = int((await client.get(path, headers=headers)).headers["content-length"])
+    started = time.process_time()
+    for _ in range(requests):
+        response = await client.get(path, headers=headers)
+        assert response.status_code == 200
+    return wire, (time.process_time() - started) / requests * 1000
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    listing = coffees(documents)
+    transport = httpx.ASGITransport(app=bench_app(listing))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"📦 Catalog snapshot benchmark ({documents} coffees, {requests} requests per row)")
+        if brotli is None:
+            print("⚠️  brotli not installed, skipping br")
+        print(
+            f"{'encoding':<10}{'on-the-fly B':>14}{'snapshot B':>12}"
+            f"{'on-the-fly ms':>15}{'snapshot ms':>13}{'speedup':>9}"
+        )
+        for encoding in reversed(ENCODINGS):
+            wire, on_the_fly = await measure(client, "/on-the-fly", encoding, requests)
+            snapshot_wire, snapshot = await measure(client, "/snapshot", encoding, requests)
+            print(
+                f"{encoding:<10}{wire:>14,}{snapshot_wire:>12,}"
+                f"{on_the_fly:>15.3f}{snapshot:>13.3f}{on_the_fly / snapshot:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
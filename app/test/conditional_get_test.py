@@ -0,0 +1,114 @@
+"""
+Tests for ETag / If-None-Match handling on a throwaway app, and for the coffee
+routes over a fake service (no MongoDB needed).
+
+Run with: python -m app.test.conditional_get_test
+"""
+import asyncio
+from datetime import datetime
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.conditional import if_none_match, not_modified, tagged_json
+from app.core.dependencies import get_coffee_service
+from app.routers import coffee as coffee_router
+from app.schemas.coffee_schema import CoffeeResponse
+
+PROFILE = {"id": "6650c0ffee", "username": "abebe", "last_login": None}
+CATALOG_ETAG = '"a1b2c3d4-7"'
+
+app = FastAPI()
+loads = {"count": 0}
+
+
+@app.get("/profile")
+@app.post("/profile")
+async def profile(request: Request):
+    return tagged_json(request, PROFILE, "private, no-cache")
+
+
+@app.get("/catalog")
+async def catalog(request: Request):
+    # Versioned: a current client never reaches the load
+    if if_none_match(request, CATALOG_ETAG):
+        return not_modified(CATALOG_ETAG, "public, max-age=60")
+    loads["count"] += 1
+    return tagged_json(request, [PROFILE], "public, max-age=60", CATALOG_ETAG)
+
+
+class FakeCoffeeService:
+    """One known coffee; every other id is a miss"""
+
+    KNOWN = CoffeeResponse(id="6650c0ffee0000000000abcd", name="Sidamo", price=5.0, created_at=datetime(2024, 5, 1))
+
+    async def get_coffee_by_id(self, coffee_id: str):
+        return self.KNOWN if coffee_id == self.KNOWN.id else None
+
+
+# The real coffee routes over the fake service
+coffee_app = FastAPI()
+coffee_app.include_router(coffee_router.router, prefix="/api/coffee")
+coffee_app.dependency_overrides[get_coffee_service] = FakeCoffeeService
+
+
+async def test_content_hash_round_trip(client: httpx.AsyncClient):
+    first = await client.get("/profile")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "private, no-cache"
+    again = await client.get("/profile", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    print(f"✅ content-hash ETag {etag} answers 304")
+
+
+async def test_if_none_match_lists_and_weak_tags(client: httpx.AsyncClient):
+    for header in (f'"other", {CATALOG_ETAG}', f"W/{CATALOG_ETAG}", "*"):
+        response = await client.get("/catalog", headers={"If-None-Match": header})
+        assert response.status_code == 304, header
+    assert (await client.get("/catalog", headers={"If-None-Match": '"a1b2c3d4-6"'})).status_code == 200
+    print("✅ tag lists, weak tags and * are matched; an older version is not")
+
+
+async def test_versioned_304_skips_the_load(client: httpx.AsyncClient):
+    before = loads["count"]
+    for _ in range(5):
+        await client.get("/catalog", headers={"If-None-Match": CATALOG_ETAG})
+    assert loads["count"] == before
+    print("✅ versioned 304s never load the catalog")
+
+
+async def test_unsafe_methods_get_the_body(client: httpx.AsyncClient):
+    etag = (await client.get("/profile")).headers["etag"]
+    response = await client.post("/profile", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json() == PROFILE
+    print("✅ POST is never answered with 304")
+
+
+async def test_missing_coffee_is_not_cached():
+    transport = httpx.ASGITransport(app=coffee_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        found = await client.get(f"/api/coffee/{FakeCoffeeService.KNOWN.id}")
+        assert found.status_code == 200 and found.json()["name"] == "Sidamo"
+        assert found.headers["cache-control"].startswith("public") and "etag" in found.headers
+
+        for coffee_id in ("6650c0ffee0000000000ffff", "not-an-id"):
+            missing = await client.get(f"/api/coffee/{coffee_id}")
+            assert missing.status_code == 404, (coffee_id, missing.status_code)
+            assert "etag" not in missing.headers and "cache-control" not in missing.headers, missing.headers
+    print("✅ unknown coffee ids are 404 without public cache headers")
+
+
+async def main():
+    print("🏷️  Conditional GET tests")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await test_content_hash_round_trip(client)
+        await test_if_none_match_lists_and_weak_tags(client)
+        await test_versioned_304_skips_the_load(client)
+        await test_unsafe_methods_get_the_body(client)
+    await test_missing_coffee_is_not_cached()
+    print("✅ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""
+Tests for per-request Mongo command accounting. Commands are replayed through
+Motor's own executor hand-off, so no MongoDB is needed.
+
+Run with: python -m app.test.db_accounting_test
+"""
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from motor.frameworks import asyncio as motor_asyncio
+
+from app.core.db_accounting import (
+    CommandAccounting,
+    DbAccountingMiddleware,
+    background_task,
+    current_request_db,
+    filter_shape,
+)
+
+listener = CommandAccounting(slow_threshold_ms=50)
+_request_ids = iter(range(1, 1_000_000))
+
+
+def run_command(name: str, command: dict, duration_ms: float):
+    """What PyMongo does on a Motor executor thread for one command"""
+    request_id = next(_request_ids)
+    event = SimpleNamespace(
+        connection_id=("localhost", 27017),
+        request_id=request_id,
+        command_name=name,
+        command={name: "users", **command},
+        duration_micros=int(duration_ms * 1000),
+    )
+    listener.started(event)
+    listener.succeeded(event)
+
+
+app = FastAPI()
+app.add_middleware(DbAccountingMiddleware)
+
+
+@app.get("/login")
+async def login():
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        motor_asyncio.run_on_executor(
+            loop, run_command, "find", {"filter": {"$or": [{"email": "a@b.c"}, {"username": "a"}]}}, 3
+        ),
+        motor_asyncio.run_on_executor(
+            loop, run_command, "update", {"updates": [{"q": {"_id": 1}, "u": {"$set": {"x": 1}}}]}, 60
+        ),
+    )
+    return {"commands": current_request_db.get().commands}
+
+
+@app.get("/catalog")
+async def catalog():
+    loop = asyncio.get_running_loop()
+
+    async def shared_load():
+        await motor_asyncio.run_on_executor(loop, run_command, "find", {"filter": {}}, 5)
+        return current_request_db.get()
+
+    # A load other requests also wait on: not charged to the one that started it
+    seen_by_load = await background_task(shared_load())
+    await motor_asyncio.run_on_executor(loop, run_command, "find", {"filter": {"_id": 1}}, 1)
+    return {"commands": current_request_db.get().commands, "load_context": seen_by_load}
+
+
+def test_filter_shape_is_redacted():
+    shape = filter_shape(
+        "find",
+        {"find": "users", "filter": {"email": "a@b.c", "created_at": {"$lt": 5}, "_id": {"$in": [1, 2, 3]}}},
+    )
+    assert shape == {"email": "?", "created_at": {"$lt": "?"}, "_id": {"$in": ["?"]}}, shape
+    assert filter_shape("update", {"updates": [{"q": {"token_hash": "secret"}}]}) == [{"token_hash": "?"}]
+    print("✅ filter shapes keep fields and operators, drop values")
+
+
+async def test_server_timing_header():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/login")
+
+    timing = response.headers["server-timing"]
+    assert response.json() == {"commands": 2}
+    assert 'db;dur=63.00;desc="2 commands"' in timing, timing
+    assert 'db-slowest;dur=60.00;desc="update"' in timing, timing
+    assert listener.slow_commands == 1
+    # Nothing leaks into code running outside the request
+    assert current_request_db.get() is None
+    print(f"✅ Server-Timing: {timing}")
+
+
+async def test_background_tasks_are_not_charged():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/catalog")
+
+    assert response.json() == {"commands": 1, "load_context": None}, response.json()
+    assert 'desc="1 commands"' in response.headers["server-timing"]
+    print("✅ a background task started in a request runs outside its accounting")
+
+
+def main():
+    print("⏱️  DB accounting tests")
+    test_filter_shape_is_redacted()
+    asyncio.run(test_server_timing_header())
+    asyncio.run(test_background_tasks_are_not_charged())
+    print("✅ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Per-request cost of resolving each router's service dependency: building
+the service (and its repositories) on every request, as the routers used to,
+vs. fetching the app-scoped instance from the ServiceContainer.
+
+Each route only resolves its dependency, so no MongoDB is needed. The genai
+row is skipped without GOOGLE_API_KEY (GenaiService refuses to start).
+Usage: python -m app.test.dependency_bench [requests]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from app.core import dependencies
+from app.core.config import settings
+from app.core.container import ServiceContainer
+from app.services.auth_service import AuthService
+from app.services.coffee_service import CoffeeService
+from app.services.email_service import EmailService
+from app.services.genai_service import GenaiService
+from app.services.user_service import UserService
+
+# Router name -> (per-request factory, container dependency)
+ROUTERS = {
+    "auth": (AuthService, dependencies.get_auth_service),
+    "users": (UserService, dependencies.get_user_service),
+    "coffee": (CoffeeService, dependencies.get_coffee_service),
+    "email": (EmailService, dependencies.get_email_service),
+    "genai": (GenaiService, dependencies.get_genai_service),
+}
+
+
+def bench_app(routers) -> FastAPI:
+    app = FastAPI()
+    app.state.services = ServiceContainer()
+    for name, (factory, dependency) in routers.items():
+        # Sync factories run on the threadpool, like the old def get_*_service()
+        def per_request(factory=factory):
+            return factory()
+
+        async def handler(service=Depends(per_request)):
+            return {"ok": True}
+
+        async def shared_handler(service=Depends(dependency)):
+            return {"ok": True}
+
+        app.add_api_route(f"/per-request/{name}", handler)
+        app.add_api_route(f"/container/{name}", shared_handler)
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int):
+    """Mean latency and mean peak traced memory per request"""
+    await client.get(path)
+    peaks = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(requests):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        response = await client.get(path)
+        assert response.status_code == 200, response.text
+        peaks += tracemalloc.get_traced_memory()[1] - baseline
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+    return elapsed / requests, peaks / requests
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    routers = dict(ROUTERS)
+    if not settings.GOOGLE_API_KEY:
+        print("⚠️  GOOGLE_API_KEY not set, skipping genai")
+        routers.pop("genai")
+
+    transport = httpx.ASGITransport(app=bench_app(routers))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"🧩 Dependency benchmark ({requests} requests per route)")
+        print(f"{'router':<8}{'per-request µs':>16}{'container µs':>14}{'per-request B':>15}{'container B':>13}")
+        for name in routers:
+            old_latency, old_bytes = await measure(client, f"/per-request/{name}", requests)
+            new_latency, new_bytes = await measure(client, f"/container/{name}", requests)
+            print(
+                f"{name:<8}{old_latency * 1e6:>16.0f}{new_latency * 1e6:>14.0f}"
+                f"{old_bytes:>15,.0f}{new_bytes:>13,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
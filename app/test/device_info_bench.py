@@ -0,0 +1,52 @@
+"""
+User-agent parse cost with and without the DeviceInfo cache.
+
+Usage: python -m app.test.device_info_bench [logins]
+"""
+import random
+import sys
+import time
+
+from app.utils import helpers
+from app.utils.helpers import Helpers
+
+# Our traffic comes from a handful of app/OS builds
+USER_AGENTS = [
+    "Rostila/2.4.1 (iPhone; iOS 17.5; Scale/3.00)",
+    "Rostila/2.4.1 (iPhone; iOS 17.4.1; Scale/3.00)",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 14; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/126.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 Edg/126.0.0.0",
+    "okhttp/4.12.0",
+]
+
+
+def run(label: str, get_device_info, user_agents):
+    started = time.perf_counter()
+    for user_agent in user_agents:
+        get_device_info(user_agent)
+    elapsed = time.perf_counter() - started
+    per_call = elapsed / len(user_agents) * 1e6
+    print(f"{label:<28}{per_call:>10.1f} µs/login")
+    return per_call
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(7)
+    user_agents = [random.choice(USER_AGENTS) for _ in range(logins)]
+
+    print("📱 Device info parse benchmark")
+    uncached = run("parse every login", helpers._parse_device_info, user_agents)
+    cached = run("bounded LRU cache", Helpers.get_device_info, user_agents)
+    print(f"\nspeed-up: {uncached / cached:.0f}x")
+    print(f"cache: {Helpers.device_info_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
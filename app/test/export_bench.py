@@ -0,0 +1,102 @@
+"""
+Coffee export: building the whole list vs. streaming NDJSON off the cursor.
+Reports time to first byte, total time and peak memory.
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Usage: python -m app.test.export_bench [documents]
+"""
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.services.coffee_service import CoffeeService
+
+SCRATCH_DATABASE = "rostila_export_bench"
+
+
+async def seed(documents: int):
+    now = datetime.utcnow()
+    batch = 5000
+    for start in range(0, documents, batch):
+        await Coffee.get_motor_collection().insert_many(
+            [
+                {
+                    "name": f"Coffee {i}",
+                    "origin": "Yirgacheffe",
+                    "region": "Sidama",
+                    "price": 4.5,
+                    "description": "Floral, tea-like body with notes of jasmine and lemon.",
+                    "flavor_notes": ["jasmine", "lemon", "bergamot"],
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(start, min(start + batch, documents))
+            ]
+        )
+
+
+async def list_export(service: CoffeeService):
+    # What an export used to cost: every response model first, then one JSON body
+    coffees = await service.get_all_coffees()
+    yield json.dumps([coffee.model_dump(mode="json") for coffee in coffees]).encode()
+
+
+async def measure(label: str, chunks):
+    tracemalloc.start()
+    started = time.perf_counter()
+    first_byte = None
+    size = 0
+    async for chunk in chunks:
+        if first_byte is None:
+            first_byte = time.perf_counter() - started
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<22}{first_byte * 1e3:>12.1f}{elapsed * 1e3:>12.1f}"
+        f"{peak / 2**20:>12.1f}{size / 2**20:>10.1f}"
+    )
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    client_kwargs = {}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+    service = CoffeeService()
+    # get_all_coffees stops at the repository's default page size
+    service.coffee_repository.get_all_coffees = lambda: service.coffee_repository.find_all(
+        limit=documents
+    )
+
+    try:
+        await seed(documents)
+        print(f"📤 Export benchmark ({documents} coffees)")
+        print(f"{'':<22}{'first ms':>12}{'total ms':>12}{'peak MiB':>12}{'MiB out':>10}")
+        await measure("full list", list_export(service))
+        await measure("NDJSON stream", service.export_coffees())
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
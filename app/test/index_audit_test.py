@@ -0,0 +1,96 @@
+"""
+Tests for the index audit's plan analysis, on recorded explain() output
+(no MongoDB needed). Run the audit itself against a database with:
+    python -m app.core.index_audit
+
+Run with: python -m app.test.index_audit_test
+"""
+from app.core.index_audit import QueryShape, analyze_explain, query_shapes
+from app.models.coffee import Coffee
+from app.models.users import User
+
+IXSCAN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "LIMIT",
+            "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "email_1"}},
+        }
+    },
+    "executionStats": {"nReturned": 1, "totalDocsExamined": 1, "totalKeysExamined": 1},
+}
+COLLSCAN = {
+    "queryPlanner": {"winningPlan": {"stage": "COLLSCAN", "direction": "forward"}},
+    "executionStats": {"nReturned": 1, "totalDocsExamined": 5000, "totalKeysExamined": 0},
+}
+OR_PLAN = {
+    "queryPlanner": {
+        "winningPlan": {
+            "stage": "SUBPLAN",
+            "inputStage": {
+                "stage": "FETCH",
+                "inputStage": {
+                    "stage": "OR",
+                    "inputStages": [
+                        {"stage": "IXSCAN", "indexName": "username_1"},
+                        {"stage": "IXSCAN", "indexName": "email_1"},
+                    ],
+                },
+            },
+        }
+    },
+    "executionStats": {"nReturned": 1, "totalDocsExamined": 1},
+}
+BLOCKING_SORT = {
+    "queryPlanner": {
+        "winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}},
+    },
+    "executionStats": {"nReturned": 20, "totalDocsExamined": 20},
+}
+
+
+def test_index_scan_passes():
+    result = analyze_explain(QueryShape("email", User, {"email": "x"}), IXSCAN)
+    assert result["problems"] == [], result
+    assert result["plan"] == "LIMIT <- FETCH <- IXSCAN"
+    print("✅ IXSCAN plan is clean")
+
+
+def test_collscan_and_ratio_flagged():
+    result = analyze_explain(QueryShape("token", User, {"verification_token": "t"}), COLLSCAN)
+    assert "COLLSCAN" in result["problems"]
+    assert "examined/returned 5000x" in result["problems"], result
+    print(f"✅ flagged: {result['problems']}")
+
+
+def test_or_branches_walked():
+    result = analyze_explain(QueryShape("login", User, {}), OR_PLAN)
+    assert result["plan"].count("IXSCAN") == 2 and not result["problems"], result
+    print("✅ $or branches are walked")
+
+
+def test_blocking_sort_and_allowed_scan():
+    listing = QueryShape("all", Coffee, {}, allow_collscan=True)
+    assert analyze_explain(listing, COLLSCAN)["problems"] == ["examined/returned 5000x"]
+    assert "in-memory SORT" in analyze_explain(listing, BLOCKING_SORT)["problems"]
+    print("✅ full listings may scan; blocking sorts are still flagged")
+
+
+def test_every_repository_model_is_covered():
+    covered = {shape.model.__name__ for shape in query_shapes()}
+    assert covered == {"User", "RefreshToken", "PasswordResetToken", "Coffee"}, covered
+    assert any("verification_token" in shape.filter for shape in query_shapes())
+    print(f"✅ {len(query_shapes())} query shapes over {len(covered)} collections")
+
+
+def main():
+    print("🔎 Index audit tests")
+    test_index_scan_passes()
+    test_collscan_and_ratio_flagged()
+    test_or_branches_walked()
+    test_blocking_sort_and_allowed_scan()
+    test_every_repository_model_is_covered()
+    print("✅ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    main()
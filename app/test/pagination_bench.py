@@ -0,0 +1,100 @@
+"""
+Per-page latency by page depth: skip/limit vs. keyset (cursor) pagination.
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Usage: python -m app.test.pagination_bench [documents] [page_size]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.repositories.coffee_repository import CoffeeRepository
+
+SCRATCH_DATABASE = "rostila_pagination_bench"
+
+
+async def seed(documents: int):
+    started = datetime.utcnow()
+    await Coffee.get_motor_collection().insert_many(
+        [
+            {
+                "name": f"Coffee {i}",
+                "origin": "Yirgacheffe",
+                "region": "Sidama",
+                "price": 4.5,
+                # A handful of documents share each timestamp, so ties on _id matter
+                "created_at": started - timedelta(seconds=i // 4),
+                "updated_at": started,
+            }
+            for i in range(documents)
+        ]
+    )
+
+
+async def timed(operation) -> float:
+    # Best of 3, so a single scheduler hiccup does not decide the result
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        await operation()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    client_kwargs = {}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+    repository = CoffeeRepository()
+
+    try:
+        await seed(documents)
+
+        # Walk every page once, remembering the cursor that starts each one
+        cursors = [None]
+        cursor = None
+        while True:
+            _, cursor = await repository.get_coffees_page(limit=page_size, cursor=cursor)
+            if cursor is None:
+                break
+            cursors.append(cursor)
+
+        print(f"📄 Pagination benchmark ({documents} coffees, {page_size} per page)")
+        print(f"{'page':>8}{'skip ms':>12}{'cursor ms':>12}")
+        pages = len(cursors)
+        for page in sorted({0, pages // 10, pages // 2, pages - 1}):
+            skip_time = await timed(
+                lambda: Coffee.find()
+                .sort([("created_at", -1), ("_id", -1)])
+                .skip(page * page_size)
+                .limit(page_size)
+                .to_list()
+            )
+            cursor_time = await timed(
+                lambda: repository.get_coffees_page(limit=page_size, cursor=cursors[page])
+            )
+            print(f"{page + 1:>8}{skip_time * 1e3:>12.2f}{cursor_time * 1e3:>12.2f}")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
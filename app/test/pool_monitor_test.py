@@ -0,0 +1,83 @@
+"""
+Tests for the CMAP pool monitor, driven with synthetic PyMongo pool events
+from several threads (no MongoDB needed).
+
+Run with: python -m app.test.pool_monitor_test
+"""
+import threading
+import time
+
+from pymongo import monitoring
+
+from app.core.pool_monitor import PoolMonitor
+
+ADDRESS = ("localhost", 27017)
+
+
+def checkout(monitor: PoolMonitor, connection_id: int, wait: float):
+    monitor.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    time.sleep(wait)
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id))
+
+
+def test_pool_size_and_in_use():
+    monitor = PoolMonitor()
+    monitor.pool_created(monitoring.PoolCreatedEvent(ADDRESS, {"maxPoolSize": 10}))
+    for connection_id in (1, 2, 3):
+        monitor.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, connection_id))
+        checkout(monitor, connection_id, 0)
+    monitor.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 2))
+    monitor.connection_closed(monitoring.ConnectionClosedEvent(ADDRESS, 3, "idle"))
+
+    stats = monitor.stats()
+    assert stats["max_pool_size"] == 10
+    assert stats["pool_size"] == 2
+    assert stats["in_use"] == 2 and stats["max_in_use"] == 3
+    assert stats["checkouts"] == 3
+    print("✅ pool size and in-use count follow connection events")
+
+
+def test_wait_time_per_thread():
+    monitor = PoolMonitor()
+    # Overlapping checkouts on different threads must not share a start time
+    threads = [
+        threading.Thread(target=checkout, args=(monitor, i, wait))
+        for i, wait in enumerate((0.05, 0.0, 0.02))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = monitor.stats()
+    assert stats["checkouts"] == 3
+    assert 45 <= stats["wait_ms"]["max"] < 500, stats
+    assert stats["wait_ms"]["avg"] < stats["wait_ms"]["max"]
+    print(f"✅ checkout wait timed per thread: {stats['wait_ms']}")
+
+
+def test_timeouts():
+    monitor = PoolMonitor()
+    for reason in (
+        monitoring.ConnectionCheckOutFailedReason.TIMEOUT,
+        monitoring.ConnectionCheckOutFailedReason.CONN_ERROR,
+    ):
+        monitor.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        monitor.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(ADDRESS, reason))
+
+    stats = monitor.stats()
+    assert stats["checkout_failures"] == 2 and stats["timeouts"] == 1
+    assert stats["checkouts"] == 0 and stats["in_use"] == 0
+    print("✅ wait-queue timeouts counted separately from other failures")
+
+
+def main():
+    print("🏊 Pool monitor tests")
+    test_pool_size_and_in_use()
+    test_wait_time_per_thread()
+    test_timeouts()
+    print("✅ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Documents/sec and memory per document when listing users:
+full Beanie documents vs. a slim read model vs. raw projected dicts.
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Usage: python -m app.test.projection_bench [documents]
+"""
+import asyncio
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User, UserPublicView
+from app.repositories.user_repository import UserRepository
+
+SCRATCH_DATABASE = "rostila_projection_bench"
+
+LISTING_FIELDS = {"email": 1, "username": 1, "first_name": 1, "last_name": 1}
+
+
+async def seed(documents: int):
+    now = datetime.utcnow()
+    await User.get_motor_collection().insert_many(
+        [
+            {
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "hashed_password": "$2b$12$" + "x" * 53,
+                "first_name": "Abebe",
+                "last_name": "Bekele",
+                "phone_number": "+251911000000",
+                "company_name": "Rostila Coffee Export PLC",
+                "company_address": "Bole Sub-city, Woreda 03, Addis Ababa, Ethiopia",
+                "company_phone_number": "+251116000000",
+                "company_email": "export@rostila.example.com",
+                "company_website": "https://rostila.example.com",
+                "is_active": True,
+                "is_verified": True,
+                "verification_token": "t" * 43,
+                "last_login": now,
+                "last_ip": "196.188.10.20",
+                "last_device": "iPhone",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(documents)
+        ]
+    )
+
+
+async def measure(label: str, load, documents: int):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = await load()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(rows) == documents
+    print(
+        f"{label:<34}{documents / elapsed:>12,.0f} docs/s"
+        f"{peak / documents:>10,.0f} B/doc"
+    )
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    client_kwargs = {}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+    repository = UserRepository()
+
+    try:
+        await seed(documents)
+        print(f"📦 Projection benchmark ({documents} users)")
+        await measure(
+            "full User documents",
+            lambda: repository.find_all(limit=documents),
+            documents,
+        )
+        await measure(
+            "UserPublicView read model",
+            lambda: repository.find_all(limit=documents, projection=UserPublicView),
+            documents,
+        )
+        await measure(
+            "raw dicts (listing fields)",
+            lambda: repository.find_all(limit=documents, projection=LISTING_FIELDS),
+            documents,
+        )
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
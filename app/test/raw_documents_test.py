@@ -0,0 +1,67 @@
+"""
+Tests for building responses from raw BSON documents (no MongoDB needed).
+
+Run with: python -m app.test.raw_documents_test
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from pydantic import ValidationError
+
+from app.core.raw_documents import construct_response, response_projection
+from app.schemas.coffee_schema import CoffeeResponse
+
+CREATED = datetime(2024, 5, 1, 8, 30)
+
+
+def stored_coffee(**overrides):
+    document = {
+        "_id": ObjectId(),
+        "name": "Yirgacheffe",
+        "origin": "Ethiopia",
+        "price": 12.5,
+        "created_at": CREATED,
+    }
+    document.update(overrides)
+    return document
+
+
+def test_complete_document_takes_the_raw_path():
+    document = stored_coffee()
+    coffee_id = str(document["_id"])
+    response = construct_response(CoffeeResponse, document)
+    assert response.id == coffee_id and response.created_at == CREATED
+    # Optional fields the document lacks still render, with their defaults
+    assert response.rating is None and "updated_at" in response.model_dump()
+    print("✅ complete documents are constructed with defaults for optional fields")
+
+
+def test_missing_required_field_is_validated():
+    document = stored_coffee()
+    del document["created_at"]
+    try:
+        construct_response(CoffeeResponse, document)
+    except ValidationError as e:
+        assert [error["loc"] for error in e.errors()] == [("created_at",)], e.errors()
+    else:
+        raise AssertionError("a document without created_at rendered without it")
+    print("✅ a document missing a required field is rejected, not rendered without it")
+
+
+def test_projection_covers_required_fields():
+    projection = response_projection(CoffeeResponse)
+    required = {name for name, field in CoffeeResponse.model_fields.items() if field.is_required()}
+    assert required - {"id"} <= projection.keys(), projection
+    print("✅ the response projection fetches every required field")
+
+
+def main():
+    print("🧱 Raw document response tests")
+    test_complete_document_takes_the_raw_path()
+    test_missing_required_field_is_validated()
+    test_projection_covers_required_fields()
+    print("✅ ALL TESTS PASSED")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Coffee listing cost end to end (fetch, build CoffeeResponse, encode for the
+response body): validated Beanie documents vs. the raw-BSON fast path that
+projects the response fields and constructs the response without validation.
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Usage: python -m app.test.raw_read_bench [sizes...]   (default: 1000 10000)
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.raw_documents import construct_response, response_projection
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.repositories.coffee_repository import CoffeeRepository
+from app.schemas.coffee_schema import CoffeeResponse
+
+SCRATCH_DATABASE = "rostila_raw_read_bench"
+
+RESPONSE_FIELDS = response_projection(CoffeeResponse)
+
+
+async def seed(documents: int):
+    now = datetime.utcnow()
+    await Coffee.get_motor_collection().delete_many({})
+    await Coffee.get_motor_collection().insert_many(
+        [
+            Coffee(
+                name=f"Yirgacheffe Grade 1 #{i}",
+                origin="Ethiopia",
+                region="Gedeo",
+                sku=f"YIR-{i:06d}",
+                producer_name="Rostila Coffee Export PLC",
+                price=6.75,
+                price_per_kg=13.5,
+                processing="Washed",
+                altitude="1900-2200 m",
+                flavor_notes=["jasmine", "bergamot", "lemon", "honey"],
+                cupping_score=88.5,
+                harvest_year=2024,
+                quantity_available=120,
+                images=["https://rostila.example.com/img/yirgacheffe.jpg"],
+                certifications=["Organic", "Fair Trade"],
+                description="Floral, tea-like washed lot from smallholders around Yirgacheffe.",
+                created_at=now,
+                updated_at=now,
+            ).model_dump(by_alias=True, exclude={"id"})
+            for i in range(documents)
+        ]
+    )
+
+
+async def validated(repository: CoffeeRepository, documents: int):
+    coffees = await repository.find_all(limit=documents)
+    return jsonable_encoder([CoffeeResponse.model_validate(coffee.model_dump()) for coffee in coffees])
+
+
+async def raw(repository: CoffeeRepository, documents: int):
+    coffees = await repository.find_all(limit=documents, projection=RESPONSE_FIELDS)
+    return jsonable_encoder([construct_response(CoffeeResponse, coffee) for coffee in coffees])
+
+
+async def measure(label: str, load, repository: CoffeeRepository, documents: int) -> float:
+    started = time.perf_counter()
+    body = await load(repository, documents)
+    elapsed = time.perf_counter() - started
+    assert len(body) == documents
+    print(f"{label:<30}{elapsed * 1000:>10,.0f} ms{documents / elapsed:>12,.0f} docs/s")
+    return elapsed
+
+
+async def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    client_kwargs = {}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+    repository = CoffeeRepository()
+
+    try:
+        for documents in sizes:
+            await seed(documents)
+            # Same bytes either way, or the comparison means nothing
+            assert await validated(repository, documents) == await raw(repository, documents)
+
+            print(f"☕ Listing {documents} coffees")
+            slow = await measure("validated documents", validated, repository, documents)
+            fast = await measure("raw BSON fast path", raw, repository, documents)
+            print(f"{'speedup':<30}{slow / fast:>10.1f}x\n")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+"""
+Checks read-preference routing: catalog reads are sent as secondaryPreferred
+with the max-staleness bound, auth reads go to the primary.
+
+Needs a replica set; a single-node one is enough as a local stand-in, e.g.
+    mongod --replSet rs0 --dbpath /tmp/rs0 && mongosh --eval "rs.initiate()"
+    MONGODB_URL="mongodb://localhost:27017/?replicaSet=rs0" python -m app.test.read_preference_test
+Runs in a scratch database that is dropped afterwards.
+"""
+import asyncio
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.repositories.coffee_repository import CoffeeRepository
+from app.repositories.user_repository import UserRepository
+
+SCRATCH_DATABASE = "rostila_read_preference_test"
+
+
+class ReadPreferenceRecorder(monitoring.CommandListener):
+    """Remembers the $readPreference sent with each read command"""
+
+    def __init__(self):
+        self.sent = []
+
+    def started(self, event):
+        if event.command_name in ("find", "count", "aggregate"):
+            self.sent.append(event.command.get("$readPreference", {"mode": "primary"}))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def routed_as(recorder: ReadPreferenceRecorder, operation):
+    recorder.sent.clear()
+    await operation()
+    return recorder.sent
+
+
+async def main():
+    recorder = ReadPreferenceRecorder()
+    client_kwargs = {"event_listeners": [recorder]}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+
+    hello = await client.admin.command("hello")
+    if "setName" not in hello and hello.get("msg") != "isdbgrid":
+        print("❌ MONGODB_URL is a standalone server; read preferences need a replica set")
+        client.close()
+        return
+
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+    coffees = CoffeeRepository()
+    users = UserRepository()
+    coffee = await Coffee(name="Yirgacheffe", price=4.5, origin="Ethiopia").insert()
+    await User(
+        email="reads@example.com",
+        username="reads",
+        hashed_password="x",
+        first_name="Read",
+        last_name="Pref",
+    ).insert()
+
+    expected = {
+        "mode": settings.CATALOG_READ_PREFERENCE,
+        "maxStalenessSeconds": settings.CATALOG_MAX_STALENESS_SECONDS,
+    }
+    print("🧭 Read-preference routing")
+    try:
+        catalog_reads = {
+            "get_all_coffees": lambda: coffees.get_all_coffees(),
+            "get_coffee_by_id": lambda: coffees.get_coffee_by_id(str(coffee.id)),
+            "get_coffee_by_name": lambda: coffees.get_coffee_by_name("Yirgacheffe"),
+            "get_coffees_by_origin": lambda: coffees.get_coffees_by_origin("Ethiopia"),
+            "get_coffees_page": lambda: coffees.get_coffees_page(limit=10),
+        }
+        for name, operation in catalog_reads.items():
+            sent = await routed_as(recorder, operation)
+            assert sent and all(pref == expected for pref in sent), (name, sent)
+            print(f"✅ {name:<24}{sent[0]}")
+
+        auth_reads = {
+            "get_user_for_login": lambda: users.get_user_for_login("reads"),
+            "get_verification_status": lambda: users.get_verification_status("reads@example.com"),
+            "find_identity_conflicts": lambda: users.find_identity_conflicts("a@b.c", "reads"),
+        }
+        for name, operation in auth_reads.items():
+            sent = await routed_as(recorder, operation)
+            assert sent and all(pref["mode"] == "primary" for pref in sent), (name, sent)
+            print(f"✅ {name:<24}primary")
+
+        print("✅ ALL TESTS PASSED")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+"""
+Counts MongoDB round trips for the login and signup lookups.
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Run with: python -m app.test.round_trip_test
+"""
+import asyncio
+from collections import Counter
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.repositories.user_repository import UserRepository
+
+SCRATCH_DATABASE = "rostila_round_trip_test"
+
+
+class RoundTripCounter(monitoring.CommandListener):
+    """Counts commands sent to the server, by command name, and keeps find projections"""
+
+    def __init__(self):
+        self.commands = Counter()
+        self.projections = []
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+        if event.command_name == "find":
+            self.projections.append(event.command.get("projection"))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.commands.clear()
+        self.projections.clear()
+
+    @property
+    def total(self):
+        return sum(self.commands.values())
+
+
+async def measure(counter: RoundTripCounter, label: str, operation):
+    counter.reset()
+    await operation()
+    print(f"{label:<45}{counter.total:>3} round trip(s)  {dict(counter.commands)}")
+    return counter.total
+
+
+async def main():
+    counter = RoundTripCounter()
+    client_kwargs = {"event_listeners": [counter]}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+
+    repository = UserRepository()
+    user = User(
+        email="roundtrip@example.com",
+        username="roundtrip",
+        hashed_password="x",
+        first_name="Round",
+        last_name="Trip",
+    )
+    await user.insert()
+
+    print("🔁 MongoDB round trips per lookup")
+    try:
+        # Login with an email address: the old path misses on username first
+        before_login = await measure(
+            counter,
+            "login lookup (before: username, then email)",
+            lambda: _old_login_lookup(repository, user.email),
+        )
+        after_login = await measure(
+            counter,
+            "login lookup (after: single $or)",
+            lambda: repository.get_user_for_login(user.email),
+        )
+
+        before_signup = await measure(
+            counter,
+            "signup check (before: email, then username)",
+            lambda: _old_signup_check(repository, "new@example.com", "newuser"),
+        )
+        after_signup = await measure(
+            counter,
+            "signup check (after: single $or)",
+            lambda: repository.find_identity_conflicts("new@example.com", "newuser"),
+        )
+
+        # The signup check compares identities only; it must not load credentials
+        signup_fields = set(counter.projections[0] or {})
+
+        print(f"\nlogin:  {before_login} -> {after_login}")
+        print(f"signup: {before_signup} -> {after_signup}, fields {sorted(signup_fields)}")
+        assert after_login == 1 and after_signup == 1
+        assert signup_fields and signup_fields <= {"_id", "email", "username", "is_verified"}, signup_fields
+        print("✅ ALL TESTS PASSED")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+
+
+async def _old_login_lookup(repository: UserRepository, identifier: str):
+    user = await repository.username_exists(identifier)
+    if not user:
+        user = await repository.email_exists(identifier)
+    return user
+
+
+async def _old_signup_check(repository: UserRepository, email: str, username: str):
+    await repository.email_exists(email)
+    await repository.username_exists(username)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,214 @@
+"""
+Query-plan test for coffee search: explains the query every common filter +
+sort combination compiles to. Each designed combination must be won by the
+index built for it, read in sort order (no COLLSCAN, no in-memory SORT),
+examining at most MAX_KEYS_PER_RETURNED index keys per returned coffee.
+Combinations outside the designed indexes are reported, not failed; the run
+exits non-zero if a designed one fails. Also checks the returned page
+against the seed.
+
+Needs a reachable MongoDB (MONGODB_URL); runs in a scratch database that is
+dropped afterwards.
+Run with: python -m app.test.search_plan_test
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import certifi
+import motor.motor_asyncio
+from beanie import init_beanie
+
+from app.core.config import settings
+from app.core.index_audit import QueryShape, analyze_explain
+from app.models.auth import PasswordResetToken, RefreshToken
+from app.models.coffee import Coffee
+from app.models.users import User
+from app.repositories.coffee_repository import CoffeeRepository
+from app.schemas.coffee_schema import CoffeeSearchRequest
+from app.services.coffee_service import CoffeeService
+
+SCRATCH_DATABASE = "rostila_search_plan_test"
+DOCUMENTS = 3000
+
+ORIGINS = ["Ethiopia", "Kenya", "Colombia", "Brazil", "Guatemala"]
+REGIONS = ["Sidama", "Guji", "Nyeri", "Huila", "Cerrado", "Antigua"]
+PROCESSING = ["Washed", "Natural", "Honey"]
+AVAILABILITY = ["In Stock", "Limited", "Out of Stock"]
+
+PRICE_RANGE = {"min_price": 5.0, "max_price": 12.0}
+CHEAPEST = {"sort_by": "price", "sort_order": "asc"}
+
+# A designed plan reads only the keys it returns (plus the one that ends the scan)
+MAX_KEYS_PER_RETURNED = 1.5
+
+NEWEST = "created_at_-1__id_-1"
+ORIGIN_NEWEST = "origin_1_created_at_-1__id_-1"
+ORIGIN_PRICE = "origin_1_price_1__id_1"
+AVAILABILITY_PRICE = "availability_1_price_1__id_1"
+FEATURED_NEWEST = "is_featured_1_created_at_-1__id_-1"
+PRICE = "price_1__id_1"
+RATING = "rating_-1__id_-1"
+
+# (label, search request fields, index that must win; None: outside the designed indexes)
+COMBINATIONS = [
+    ("no filters, newest", {}, NEWEST),
+    ("origin, newest", {"origin": "Ethiopia"}, ORIGIN_NEWEST),
+    ("origin, cheapest", {"origin": "Kenya", **CHEAPEST}, ORIGIN_PRICE),
+    ("origin + price range, cheapest", {"origin": "Kenya", **PRICE_RANGE, **CHEAPEST}, ORIGIN_PRICE),
+    ("price range, cheapest", {**PRICE_RANGE, **CHEAPEST}, PRICE),
+    ("price range, priciest", {**PRICE_RANGE, "sort_by": "price"}, PRICE),
+    ("min rating, best rated", {"min_rating": 4.0, "sort_by": "rating"}, RATING),
+    ("availability, cheapest", {"availability": "In Stock", **CHEAPEST}, AVAILABILITY_PRICE),
+    ("availability + price range, cheapest", {"availability": "In Stock", **PRICE_RANGE, **CHEAPEST}, AVAILABILITY_PRICE),
+    ("featured, newest", {"is_featured": True}, FEATURED_NEWEST),
+    # Featured coffees are few; origin is checked on the featured entries
+    ("featured + origin, newest", {"is_featured": True, "origin": "Ethiopia"}, FEATURED_NEWEST),
+    # Outside the designed indexes: reported only. The filters are read off
+    # the sort index (origin prefix, or none), so keys examined grow with
+    # how selective the unindexed fields are
+    ("origin + region, newest", {"origin": "Ethiopia", "region": "Sidama"}, None),
+    ("verified + processing, newest", {"is_verified": True, "processing": "Natural"}, None),
+    ("min rating, newest", {"min_rating": 3.0}, None),
+    ("text query, newest", {"query": "berry"}, None),
+    ("no filters, by cupping score", {"sort_by": "cupping_score"}, None),
+]
+
+
+def seed_documents() -> List[Dict[str, Any]]:
+    started = datetime.utcnow()
+    return [
+        {
+            "name": f"Coffee {i}",
+            "origin": ORIGINS[i % len(ORIGINS)],
+            "region": REGIONS[i % len(REGIONS)],
+            "processing": PROCESSING[i % len(PROCESSING)],
+            "availability": AVAILABILITY[i % len(AVAILABILITY)],
+            "is_featured": i % 25 == 0,
+            "is_verified": i % 3 == 0,
+            "price": round(3 + (i * 37 % 200) / 10, 2),
+            "rating": (i * 7 % 50) / 10,
+            "cupping_score": 80 + i % 10,
+            "flavor_notes": ["berry", "floral"] if i % 10 == 0 else ["chocolate"],
+            "currency": "USD",
+            "created_at": started - timedelta(minutes=i),
+        }
+        for i in range(DOCUMENTS)
+    ]
+
+
+def index_names(plan: Dict[str, Any]) -> List[str]:
+    names = [plan["indexName"]] if "indexName" in plan else []
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            names += index_names(plan[key])
+    for child in plan.get("inputStages", []):
+        names += index_names(child)
+    return names
+
+
+async def test_query_plans() -> int:
+    failures = 0
+    for label, fields, expected_index in COMBINATIONS:
+        search = CoffeeSearchRequest(**fields)
+        shape = QueryShape(
+            label,
+            Coffee,
+            CoffeeRepository.search_filter(search),
+            CoffeeRepository.search_sort(search),
+            limit=search.size,
+        )
+        cursor = Coffee.get_motor_collection().find(shape.filter).sort(shape.sort).limit(shape.limit)
+        explained = await cursor.explain()
+        result = analyze_explain(shape, explained)
+        used = index_names(explained["queryPlanner"]["winningPlan"])
+        stats = explained["executionStats"]
+        keys_per_returned = stats["totalKeysExamined"] / max(stats["nReturned"], 1)
+
+        blocking = [problem for problem in result["problems"] if problem in ("COLLSCAN", "in-memory SORT")]
+        if expected_index is not None:
+            if used != [expected_index]:
+                blocking.append(f"expected {expected_index}")
+            if keys_per_returned > MAX_KEYS_PER_RETURNED:
+                blocking.append(f"{keys_per_returned:.1f} keys/returned > {MAX_KEYS_PER_RETURNED}")
+        if expected_index is None:
+            mark = "ℹ️ "
+        elif blocking:
+            mark = "❌"
+            failures += 1
+        else:
+            mark = "✅"
+        print(
+            f"{mark} {label:<40}{result['plan']}  [{', '.join(used) or '-'}]  "
+            f"{keys_per_returned:.1f} keys/returned{'  ' + ', '.join(blocking) if blocking else ''}"
+        )
+    return failures
+
+
+def expected_page(documents: List[Dict[str, Any]], search: CoffeeSearchRequest) -> Tuple[List[str], int]:
+    def matches(document: Dict[str, Any]) -> bool:
+        for field in CoffeeRepository.SEARCH_EQUALITY_FIELDS:
+            value = getattr(search, field)
+            if value is not None and document[field] != value:
+                return False
+        if search.min_price is not None and document["price"] < search.min_price:
+            return False
+        if search.max_price is not None and document["price"] > search.max_price:
+            return False
+        return search.min_rating is None or document["rating"] >= search.min_rating
+
+    rows = sorted(
+        (document for document in documents if matches(document)),
+        key=lambda document: (document[search.sort_by], document["_id"]),
+        reverse=search.sort_order == "desc",
+    )
+    start = (search.page - 1) * search.size
+    return [str(document["_id"]) for document in rows[start : start + search.size]], len(rows)
+
+
+async def test_results_match_seed(documents: List[Dict[str, Any]]):
+    service = CoffeeService()
+    for fields in (
+        {"origin": "Kenya", **PRICE_RANGE, **CHEAPEST, "page": 2},
+        {"availability": "Limited", "min_rating": 2.5, "sort_by": "rating", "size": 50},
+        {"is_featured": True, "page": 3, "size": 10},
+    ):
+        search = CoffeeSearchRequest(**fields)
+        response = await service.search_coffees(search)
+        ids, total = expected_page(documents, search)
+        assert [coffee.id for coffee in response.coffees] == ids, fields
+        assert response.total == total and response.page == search.page, response
+        assert response.pages == max(1, -(-total // search.size)), response
+    print("✅ search pages match the seed (filters, sort, paging, total)")
+
+
+async def main() -> int:
+    client_kwargs = {}
+    if settings.mongodb_url.startswith("mongodb+srv"):
+        client_kwargs["tlsCAFile"] = certifi.where()
+    client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url, **client_kwargs)
+    await init_beanie(
+        database=client[SCRATCH_DATABASE],
+        document_models=[User, RefreshToken, PasswordResetToken, Coffee],
+    )
+
+    try:
+        documents = seed_documents()
+        await Coffee.get_motor_collection().insert_many(documents)
+
+        print(f"🔎 Coffee search query plans ({DOCUMENTS} coffees)")
+        failures = await test_query_plans()
+        await test_results_match_seed(documents)
+        if failures:
+            print(f"❌ {failures} designed combination(s) not served by their index")
+        else:
+            print("✅ ALL TESTS PASSED")
+    finally:
+        await client.drop_database(SCRATCH_DATABASE)
+        client.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,120 @@
+"""
+Route-level JSON rendering cost for coffee and user listings: FastAPI's
+default path (jsonable_encoder + json.dumps) vs. returning FastJSONResponse
+(orjson, no encoder pass). Both routes serve the same in-memory payload, so
+only serialization differs; the bodies are checked to be byte-identical.
+
+No MongoDB needed.
+Usage: python -m app.test.serialization_bench [documents] [requests]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+import httpx
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.raw_documents import construct_response
+from app.core.responses import FastJSONResponse
+from app.schemas.coffee_schema import CoffeeResponse
+from app.schemas.user_schema import UserResponse
+
+
+def coffees(documents: int):
+    now = datetime.utcnow()
+    return [
+        construct_response(
+            CoffeeResponse,
+            {
+                "_id": ObjectId(),
+                "name": f"Yirgacheffe Grade 1 #{i}",
+                "origin": "Ethiopia",
+                "region": "Gedeo",
+                "sku": f"YIR-{i:06d}",
+                "producer_name": "Rostila Coffee Export PLC",
+                "price": 6.75,
+                "currency": "USD",
+                "processing": "Washed",
+                "flavor_notes": ["jasmine", "bergamot", "lemon", "honey"],
+                "cupping_score": 88.5,
+                "availability": "In Stock",
+                "quantity_available": 120,
+                "unit": "kg",
+                "images": ["https://rostila.example.com/img/yirgacheffe.jpg"],
+                "certifications": ["Organic", "Fair Trade"],
+                "min_order_quantity": 1,
+                "is_featured": False,
+                "is_verified": True,
+                "rating": 4.5,
+                "reviews_count": 12,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+        for i in range(documents)
+    ]
+
+
+def users(documents: int):
+    now = datetime.utcnow()
+    return [
+        construct_response(
+            UserResponse,
+            {
+                "_id": ObjectId(),
+                "email": f"user{i}@example.com",
+                "username": f"user{i}",
+                "first_name": "Abebe",
+                "last_name": "Bekele",
+                "company_name": "Rostila Coffee Export PLC",
+                "is_active": True,
+                "is_verified": True,
+                "last_login": now,
+                "created_at": now,
+            },
+        )
+        for i in range(documents)
+    ]
+
+
+def bench_app(payloads):
+    app = FastAPI()
+    for name, payload in payloads.items():
+        # Default rendering, as before FastJSONResponse became the app default
+        app.add_api_route(f"/default/{name}", lambda payload=payload: payload, response_class=JSONResponse)
+        app.add_api_route(f"/fast/{name}", lambda payload=payload: FastJSONResponse(payload))
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        assert response.status_code == 200
+    return (time.perf_counter() - started) / requests
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    payloads = {"coffees": coffees(documents), "users": users(documents)}
+    transport = httpx.ASGITransport(app=bench_app(payloads))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"🧾 Serialization benchmark ({documents} documents, {requests} requests per route)")
+        print(f"{'listing':<10}{'default ms':>12}{'orjson ms':>12}{'speedup':>10}")
+        for name in payloads:
+            default_body = (await client.get(f"/default/{name}")).content
+            fast_body = (await client.get(f"/fast/{name}")).content
+            assert default_body == fast_body, f"{name}: bodies differ"
+
+            slow = await measure(client, f"/default/{name}", requests)
+            fast = await measure(client, f"/fast/{name}", requests)
+            print(f"{name:<10}{slow * 1000:>12.1f}{fast * 1000:>12.1f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
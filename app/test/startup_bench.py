@@ -0,0 +1,88 @@
+"""
+Cold-start regression gate: import time of app.main and time to first
+request (import + lifespan startup + one request), each in a fresh process.
+
+Startup connects to MONGODB_URL, so run it against the database the app
+normally uses. The stats endpoint is queried with a bench INTERNAL_API_TOKEN.
+Exits 1 when a target is missed.
+Usage: python -m app.test.startup_bench [runs] [max_import_ms] [max_first_request_ms]
+"""
+import json
+import os
+import subprocess
+import sys
+
+# Runs in a fresh interpreter so nothing is imported or cached yet
+CHILD = """
+import asyncio, json, os, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get(
+                "/api/internal/stats", headers={"Authorization": "Bearer " + os.environ["INTERNAL_API_TOKEN"]}
+            )
+        answered = time.perf_counter()
+        return ready, answered, response.status_code
+
+ready, answered, status = asyncio.run(first_request())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+    "status": status,
+}))
+"""
+
+
+def run_once() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "INTERNAL_API_TOKEN": "startup-bench"},
+    ).stdout
+    # The app prints during startup; the measurement is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    max_import_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 1500
+    max_first_request_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 3000
+
+    print(f"🚀 Startup benchmark ({runs} fresh processes)")
+    print(f"{'run':>4}{'import ms':>12}{'startup ms':>12}{'first req ms':>14}")
+    results = []
+    for run in range(1, runs + 1):
+        result = run_once()
+        assert result["status"] == 200, result
+        results.append(result)
+        print(
+            f"{run:>4}{result['import_ms']:>12.0f}{result['startup_ms']:>12.0f}"
+            f"{result['first_request_ms']:>14.0f}"
+        )
+
+    # Best run: cold start cost without scheduler noise
+    best_import = min(result["import_ms"] for result in results)
+    best_first = min(result["first_request_ms"] for result in results)
+    print(f"\nimport:        {best_import:.0f} ms (target {max_import_ms:.0f})")
+    print(f"first request: {best_first:.0f} ms (target {max_first_request_ms:.0f})")
+
+    if best_import > max_import_ms or best_first > max_first_request_ms:
+        print("❌ startup regression")
+        return 1
+    print("✅ within targets")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
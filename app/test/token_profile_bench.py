@@ -0,0 +1,94 @@
+"""
+Access-token size and decode cost: "full" vs "minimal" claims profile.
+
+Usage: python -m app.test.token_profile_bench [iterations]
+"""
+import sys
+import time
+from datetime import timedelta
+from types import SimpleNamespace
+
+from jose import jwt
+
+from app.core.claims_cache import user_profile_claims
+from app.core.config import settings
+from app.core.security import security_manager
+from app.schemas.auth_schema import DeviceInfo
+from app.services.auth_service import AuthService
+
+USER = SimpleNamespace(
+    id="66f1c0ffee0000000000abcd",
+    username="abebe",
+    email="abebe.bekele@example.com",
+    first_name="Abebe",
+    last_name="Bekele",
+    phone_number="+251911000000",
+    company_name="Rostila Coffee Export PLC",
+    company_address="Bole Sub-city, Woreda 03, House 1234, Addis Ababa, Ethiopia",
+    company_phone_number="+251116000000",
+    company_email="export@rostila.example.com",
+    company_website="https://rostila.example.com",
+    is_verified=True,
+    last_login=None,
+    last_ip=None,
+    last_device=None,
+    created_at=None,
+    updated_at=None,
+)
+DEVICE = DeviceInfo(
+    os="iOS",
+    os_version="17.5",
+    browser="Mobile Safari",
+    browser_version="17.5",
+    device="iPhone",
+    is_mobile=True,
+    is_tablet=False,
+    is_pc=False,
+)
+
+
+def measure(profile: str, iterations: int):
+    settings.ACCESS_TOKEN_PROFILE = profile
+    claims = AuthService._build_access_claims(
+        None, user_profile_claims(USER), "196.188.10.20", DEVICE.device
+    )
+    token = security_manager.create_access_token(
+        data=claims, expires_delta=timedelta(minutes=30)
+    )
+    header = f"Authorization: Bearer {token}"
+
+    # Best of 5 rounds, so warm-up and scheduler noise do not decide the result
+    per_decode = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            # Uncached decode: this is the cost every cache miss pays
+            jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        per_decode = min(per_decode, (time.perf_counter() - started) / iterations)
+
+    return len(header.encode()), per_decode
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    original_profile = settings.ACCESS_TOKEN_PROFILE
+
+    print("🔑 Access-token profile benchmark")
+    print(f"{'profile':<10}{'header bytes':>14}{'decode µs':>12}")
+    results = {}
+    for profile in ("full", "minimal"):
+        size, per_decode = measure(profile, iterations)
+        results[profile] = (size, per_decode)
+        print(f"{profile:<10}{size:>14}{per_decode * 1e6:>12.1f}")
+
+    full_size, full_decode = results["full"]
+    slim_size, slim_decode = results["minimal"]
+    print(f"\nheader size: {(slim_size / full_size - 1) * 100:+.0f}%")
+    print(f"decode time: {(slim_decode / full_decode - 1) * 100:+.0f}%")
+    print(f"(best of 5 rounds of {iterations} decodes)")
+
+    settings.ACCESS_TOKEN_PROFILE = original_profile
+
+
+if __name__ == "__main__":
+    main()
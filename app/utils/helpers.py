@@ -1,18 +1,56 @@
 # Helper functions
+from functools import lru_cache
 from app.schemas.auth_schema import DeviceInfo
-from user_agents import parse
+from app.core.providers import LazyProvider, register
+
+# Real user agents are a few hundred characters; anything longer is not worth
+# a cache slot and may be crafted to churn the cache
+MAX_CACHED_USER_AGENT_LENGTH = 512
+DEVICE_INFO_CACHE_SIZE = 1024
+
+
+def _load_user_agent_parser():
+    # user_agents compiles its regex tables on import (~0.25 s); warmed up at startup
+    from user_agents import parse
+
+    return parse
+
+
+user_agent_parser = register(LazyProvider("user_agent_parser", _load_user_agent_parser))
+
+
+def _parse_device_info(user_agent: str) -> DeviceInfo:
+    user_agent = user_agent_parser.get()(user_agent)
+    return DeviceInfo(
+        os=user_agent.os.family,
+        os_version=user_agent.os.version_string,
+        browser=user_agent.browser.family,
+        browser_version=user_agent.browser.version_string,
+        device=user_agent.device.family,
+        is_mobile=user_agent.is_mobile,
+        is_tablet=user_agent.is_tablet,
+        is_pc=user_agent.is_pc,
+    )
+
+
+_cached_device_info = lru_cache(maxsize=DEVICE_INFO_CACHE_SIZE)(_parse_device_info)
+
 
 class Helpers:
     @staticmethod
     def get_device_info(user_agent: str) -> DeviceInfo:
-        user_agent = parse(user_agent)
-        return DeviceInfo(
-            os=user_agent.os.family,
-            os_version=user_agent.os.version_string,
-            browser=user_agent.browser.family,
-            browser_version=user_agent.browser.version_string,
-            device=user_agent.device.family,
-            is_mobile=user_agent.is_mobile,
-            is_tablet=user_agent.is_tablet,
-            is_pc=user_agent.is_pc,
-        )
\ No newline at end of file
+        if len(user_agent) > MAX_CACHED_USER_AGENT_LENGTH:
+            return _parse_device_info(user_agent)
+        return _cached_device_info(user_agent)
+
+    @staticmethod
+    def device_info_cache_stats() -> dict:
+        info = _cached_device_info.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "max_size": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_ratio": round(info.hits / lookups, 4) if lookups else 0.0,
+        }